@@ -0,0 +1,91 @@
+"""
+Process-wide LLM HTTP client and agent pool, shared across requests.
+
+Building OpenAI clients and crewAI agents per onboarding meant a new
+connection pool (and TLS handshake) for every request. Instead, one
+keep-alive httpx client sized from Settings backs every LLM call, and
+built agents are checked out of AgentPool for a run and returned after.
+"""
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+from backend.config import settings
+from backend.utils.logger import logger
+
+_client_lock = threading.Lock()
+_http_client = None
+
+
+def get_http_client():
+    """The shared httpx client, created on first use."""
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_keepalive_connections,
+                    keepalive_expiry=settings.openai_keepalive_expiry
+                ),
+                timeout=settings.openai_timeout
+            )
+            logger.debug(
+                f"LLM HTTP client: {settings.openai_max_connections} connections, "
+                f"{settings.openai_max_keepalive_connections} keep-alive"
+            )
+        return _http_client
+
+
+def close_llm_clients():
+    """Close pooled connections (on shutdown)."""
+    global _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+class AgentPool:
+    """
+    Idle agents by role. An agent serves one crew at a time: Crew.kickoff
+    binds the crew and its step callback onto the agent, so concurrent
+    jobs each check out their own and the pool grows to peak concurrency.
+    """
+
+    def __init__(self):
+        self._idle: Dict[str, List[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.reused = 0
+
+    def acquire(self, role: str, factory: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (agent, reused), building one with factory if none is idle."""
+        with self._lock:
+            if self._idle[role]:
+                self.reused += 1
+                return self._idle[role].pop(), True
+        agent = factory()
+        with self._lock:
+            self.built += 1
+        return agent, False
+
+    def release(self, role: str, agent: Any):
+        # kickoff only sets step_callback when unset; clear it so the next
+        # crew's callback applies instead of this one's
+        agent.crew = None
+        agent.step_callback = None
+        with self._lock:
+            self._idle[role].append(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "built": self.built,
+                "reused": self.reused,
+                "idle": {role: len(agents) for role, agents in self._idle.items()},
+            }
+
+
+agent_pool = AgentPool()
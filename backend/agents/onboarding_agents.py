@@ -1,30 +1,229 @@
+import json
+import threading
+import time
+from functools import lru_cache
 from crewai import Agent
-from langchain_openai import ChatOpenAI
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+from openai import OpenAI
+from agents.llm_pool import get_http_client
 from tools.policy_search import PolicySearchTool
-from crewai_tools import FileWriterTool
 from backend.config import settings
 from backend.utils.logger import logger
 from backend.utils.exceptions import ConfigurationError
+from backend.utils.llm_cache import LLMResponseCache, llm_cache
+from backend.utils.metrics import llm_cost, llm_request_duration, llm_requests, llm_tokens
+from backend.utils.progress import emit
+from backend.utils.rate_limit import SharedRateLimiter, llm_rate_limiter
+from backend.utils.tracing import span
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _forward_stream_chunk(source, event):
+    """Forwards streamed LLM tokens to the running job's progress stream."""
+    # crewAI delivers chunk events synchronously on the calling thread, so
+    # the job's progress context is still current here
+    if event.chunk:
+        emit("token", text=event.chunk)
+
+def _estimate_tokens(prompt_chars: int) -> int:
+    # ~4 characters per token, plus the most the completion can use
+    return prompt_chars // 4 + settings.openai_max_tokens
+
+class OnboardingLLM(BaseLLM):
+    """
+    crewAI LLM over the OpenAI chat completions API.
+
+    crewAI rebuilds any LLM that is not a BaseLLM from its model name and
+    sampling settings, dropping the client's callbacks, rate limiter and
+    cache, so the work around each request happens here, in the call crewAI
+    actually makes. Calls draw from the request and token budget shared by
+    every worker process; the token charge is estimated up front and settled
+    from the usage the API reports. With a cache, identical requests are
+    answered from the persistent LLMResponseCache and never reach the limiter.
+    Every call is counted in the LLM request, token and cost metrics and gets
+    an "llm" span in the running job's trace. Streamed responses are
+    published chunk by chunk as crewAI LLMStreamChunkEvents.
+    """
+    
+    def __init__(self, model: str, api_key: str, base_url: str = None, temperature: float = None,
+                 max_tokens: int = None, timeout: float = None, max_retries: int = 2, http_client=None,
+                 stream: bool = False, limiter: SharedRateLimiter = None, cache: LLMResponseCache = None,
+                 cache_model: str = None):
+        super().__init__(model=model, temperature=temperature, api_key=api_key, base_url=base_url)
+        self.max_tokens = max_tokens
+        self.stream = stream
+        self.limiter = limiter
+        self.cache = cache
+        self.cache_model = cache_model or model
+        self.client = OpenAI(
+            api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries, http_client=http_client
+        )
+    
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        messages = self._format_messages(messages)
+        self._emit_call_started_event(
+            messages=messages, tools=tools, callbacks=callbacks,
+            available_functions=available_functions, from_task=from_task, from_agent=from_agent
+        )
+        prompt_chars = sum(len(str(message.get('content') or '')) for message in messages)
+        try:
+            with span("llm", model=self.model, prompt_chars=prompt_chars) as trace_span:
+                key = self._cache_key(messages) if self.cache is not None else None
+                text = self.cache.get(key) if key else None
+                cached = text is not None
+                prompt_tokens = completion_tokens = 0
+                if cached:
+                    llm_requests.inc(model=self.model, source="cache")
+                else:
+                    start = time.perf_counter()
+                    text, prompt_tokens, completion_tokens = self._request(
+                        messages, prompt_chars, from_task, from_agent
+                    )
+                    self._record(time.perf_counter() - start, prompt_tokens, completion_tokens)
+                    if key:
+                        # Without reported usage, estimate ~4 characters per token
+                        tokens = prompt_tokens + completion_tokens or (prompt_chars + len(text)) // 4
+                        self.cache.put(key, self.cache_model, text, tokens)
+                trace_span.set(
+                    cached=cached,
+                    response_chars=len(text),
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens
+                )
+        except Exception as e:
+            llm_requests.inc(model=self.model, source="error")
+            self._emit_call_failed_event(error=str(e), from_task=from_task, from_agent=from_agent)
+            raise
+        self._emit_call_completed_event(
+            response=text, call_type=LLMCallType.LLM_CALL,
+            from_task=from_task, from_agent=from_agent, messages=messages
+        )
+        return text
+    
+    def _cache_key(self, messages) -> str:
+        # Keyed on the messages crewAI sends plus everything else that shapes the answer
+        prompt = "\n".join(f"{message['role']}: {message.get('content') or ''}" for message in messages)
+        params = json.dumps({"max_tokens": self.max_tokens, "stop": sorted(self.stop)})
+        return self.cache.make_key(self.cache_model, self.temperature, prompt, params)
+    
+    def _request(self, messages, prompt_chars: int, from_task=None, from_agent=None):
+        """Send the request; returns the text and its prompt and completion tokens (0 if unreported)."""
+        charged = 0
+        if self.limiter is not None:
+            estimate = _estimate_tokens(prompt_chars)
+            self.limiter.acquire(tokens=estimate)
+            # The limiter clamps a single charge to what the call's lane can be admitted with
+            charged = self.limiter.token_charge(estimate)
+        
+        params = {"model": self.model, "messages": messages}
+        if self.temperature is not None:
+            params["temperature"] = self.temperature
+        if self.max_tokens is not None:
+            params["max_tokens"] = self.max_tokens
+        if self.stop:
+            # The API takes at most four; the rest are applied to the text below
+            params["stop"] = self.stop[:4]
+        if self.stream:
+            parts = []
+            usage = None
+            # Usage arrives in a final chunk without choices
+            for chunk in self.client.chat.completions.create(
+                **params, stream=True, stream_options={"include_usage": True}
+            ):
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    self._emit_stream_chunk_event(
+                        chunk=chunk.choices[0].delta.content, from_task=from_task, from_agent=from_agent
+                    )
+            text = self._apply_stop_words("".join(parts))
+        else:
+            response = self.client.chat.completions.create(**params)
+            text = self._apply_stop_words(response.choices[0].message.content or '')
+            usage = response.usage
+        if usage is None:
+            # Some compatible servers report no usage; the estimate stands
+            return text, 0, 0
+        self._track_token_usage_internal({
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        })
+        if charged:
+            self.limiter.refund_tokens(charged - usage.prompt_tokens - usage.completion_tokens)
+        return text, usage.prompt_tokens, usage.completion_tokens
+    
+    def _record(self, seconds: float, prompt_tokens: int, completion_tokens: int):
+        """Latency, billed tokens and estimated cost of a call that reached the API."""
+        llm_requests.inc(model=self.model, source="api")
+        llm_request_duration.observe(seconds, model=self.model)
+        llm_tokens.inc(prompt_tokens, model=self.model, kind="prompt")
+        llm_tokens.inc(completion_tokens, model=self.model, kind="completion")
+        llm_cost.inc(
+            (prompt_tokens * settings.openai_input_cost_per_1m
+             + completion_tokens * settings.openai_output_cost_per_1m) / 1_000_000,
+            model=self.model
+        )
+
+def _cache_model_id() -> str:
+    # Responses from another endpoint (e.g. the local stand-in server) must
+    # never be served in place of the real API's
+    if settings.openai_base_url:
+        return f"{settings.openai_model}@{settings.openai_base_url}"
+    return settings.openai_model
+
+_llm_lock = threading.Lock()
+_llm = None
 
 def get_llm():
+    """
+    The process-wide OnboardingLLM. It is stateless between calls, so every
+    agent shares it and its pooled keep-alive connections. Responses go
+    through the persistent LLM cache unless it is disabled, and cache misses
+    draw from the request and token budget shared by every worker process.
+    """
+    global _llm
     if not settings.openai_api_key:
         raise ConfigurationError("OPENAI_API_KEY not found in environment variables. Please add it to your .env file.")
     
-    logger.debug(f"Initializing LLM with model: {settings.openai_model}")
+    with _llm_lock:
+        if _llm is None:
+            logger.debug(f"Initializing LLM with model: {settings.openai_model}")
+            _llm = OnboardingLLM(
+                model=settings.openai_model,
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                temperature=settings.openai_temperature,
+                max_tokens=settings.openai_max_tokens,
+                timeout=settings.openai_timeout,
+                max_retries=settings.openai_max_retries,
+                http_client=get_http_client(),
+                # Tokens reach the right job through the progress context
+                stream=True,
+                limiter=llm_rate_limiter,
+                cache=llm_cache if settings.llm_cache_enabled else None,
+                cache_model=_cache_model_id()
+            )
     
-    llm = ChatOpenAI(
-        api_key=settings.openai_api_key,
-        model=settings.openai_model,
-        temperature=settings.openai_temperature,
-        max_tokens=settings.openai_max_tokens,
-        timeout=settings.openai_timeout,
-        max_retries=settings.openai_max_retries
-    )
-    
-    return llm
+    return _llm
+
+def set_llm(llm):
+    """
+    Replace the shared LLM client (benchmarks, offline runs). Call before
+    the first agent is built; pooled agents keep the client they were built with.
+    """
+    global _llm
+    with _llm_lock:
+        _llm = llm
 
-policy_search_tool = PolicySearchTool()
-file_writer_tool = FileWriterTool()
+@lru_cache(maxsize=None)
+def policy_search_tool():
+    """Shared PolicySearchTool, built on first agent creation rather than at import."""
+    return PolicySearchTool()
 
 class OnboardingAgents:
     """Factory class for creating specialized onboarding agents"""
@@ -54,7 +253,7 @@ class OnboardingAgents:
                 'you never make up policies or guess. You are meticulous about compliance '
                 'and always flag regulatory requirements.'
             ),
-            tools=[policy_search_tool],
+            tools=[policy_search_tool()],
             llm=get_llm(),
             verbose=False,
             allow_delegation=False,
@@ -83,7 +282,8 @@ class OnboardingAgents:
                 'You always include specific action items with clear owners and deadlines. '
                 'You understand Workday\'s culture of integrity, innovation, and putting employees first.'
             ),
-            tools=[file_writer_tool],
+            # No tools: the package is the final answer, stored by OnboardingCrew
+            tools=[],
             llm=get_llm(),
             verbose=False,
             allow_delegation=False,
@@ -1,28 +1,52 @@
 import os
+import re
+import math
 import sys
+import gzip
+import json
+import time
+import uuid
+import asyncio
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional, Union
 from datetime import date
-import contextlib
-import io
 
 # Add parent directory to path so backend can be imported as a module
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from backend.utils.logger import logger, setup_logger
+from backend.utils.logger import log_context, log_queue_stats, logger, setup_logger
 from backend.config import settings
-from backend.main import OnboardingCrew
+from backend.warmup import start_warmup, warmup_state
+from agents.llm_pool import close_llm_clients
+from tools.knowledge_base import knowledge_base_cache_stats
 from backend.utils.exceptions import (
     OnboardingError,
     KnowledgeBaseError,
     ConfigurationError,
-    ProcessingError
+    ProcessingError,
+    QueueFullError
 )
-from backend.utils.file_cleanup import cleanup_old_files
+from backend.utils.file_cleanup import output_index, start_cleanup_worker
+from backend.utils.job_queue import Job, JobManager, JobStatus
+from backend.utils.llm_cache import bypassing_llm_cache, llm_cache
+from backend.utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    Counter,
+    Gauge,
+    cache_metrics,
+    http_request_duration,
+    http_requests,
+    registry as metrics_registry
+)
+from backend.utils.output_store import output_store
+from backend.utils.rate_limit import LANES, llm_rate_limiter
+from backend.utils.research_cache import research_cache
+from backend.utils.stdio import silence_output
+from backend.utils.tracing import get_trace, span
 
 setup_logger()
 
@@ -42,6 +66,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+REQUEST_ID_HEADER = "X-Request-ID"
+
+def _request_id(request: Request) -> str:
+    """The caller's X-Request-ID if it is sane, else a fresh one."""
+    supplied = request.headers.get(REQUEST_ID_HEADER, "")
+    if 0 < len(supplied) <= 128 and supplied.isascii() and supplied.isprintable():
+        return supplied
+    return uuid.uuid4().hex
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time responses per route template, not raw path."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        # Unmatched paths share one label so scanners cannot blow up cardinality
+        path = getattr(route, "path", "unmatched")
+        http_requests.inc(method=request.method, route=path, status=status)
+        http_request_duration.observe(time.perf_counter() - start, method=request.method, route=path)
+
+# Registered last so it wraps everything above: the ID is bound for all logging
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Bind a request ID to every log line and job this request produces; echo it back."""
+    request_id = _request_id(request)
+    with log_context(request_id=request_id):
+        response = await call_next(request)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
 class EmployeeProfile(BaseModel):
     name: str = Field(..., min_length=1, description="Employee name")
     role: str = Field(..., min_length=1, description="Employee role")
@@ -50,13 +109,146 @@ class EmployeeProfile(BaseModel):
     work_arrangement: str = Field(..., description="Work arrangement: remote, hybrid, or in_office")
     employment_type: str = Field(..., description="Employment type: full_time or part_time")
     start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    pipeline_mode: Optional[Literal["agent", "direct"]] = Field(
+        None,
+        description="Research pipeline: agent (LLM researcher) or direct (retrieval only). Defaults to server setting."
+    )
+    use_cache: bool = Field(
+        True,
+        description="Reuse cached research briefs and LLM responses. Set false to force fresh generation."
+    )
 
 class OnboardingResponse(BaseModel):
     success: bool
     message: str
     execution_time: float
-    output_file: str
+    output_id: str = Field(..., description="Content hash ID; download from /api/output/{output_id}")
+    output_file: str = Field(..., description="Suggested filename for the download")
     package_content: Optional[str] = None
+    research_cached: bool = False
+    pipeline_mode: Optional[str] = None
+
+class BatchOnboardingRequest(BaseModel):
+    employees: List[EmployeeProfile] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_size,
+        description="Employee profiles to onboard"
+    )
+    pipeline_mode: Optional[Literal["agent", "direct"]] = Field(
+        None,
+        description="Research pipeline for the whole batch. Defaults to server setting."
+    )
+    use_cache: bool = Field(
+        True,
+        description="Reuse cached research briefs and LLM responses for the whole batch."
+    )
+
+class BatchEmployeeResult(BaseModel):
+    name: str
+    status: str
+    group: str
+    output_id: Optional[str] = None
+    output_file: Optional[str] = None
+    execution_time: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchOnboardingResponse(BaseModel):
+    success: bool
+    message: str
+    total: int
+    succeeded: int
+    failed: int
+    groups: int
+    execution_time: float
+    employees: List[BatchEmployeeResult]
+
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    request_id: Optional[str] = None
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Union[OnboardingResponse, BatchOnboardingResponse]] = None
+    error: Optional[str] = None
+
+job_manager = JobManager()
+_cleanup_stop = None
+
+def _queue_metrics():
+    stats = job_manager.stats()
+    jobs = Gauge("onboardai_jobs", "Jobs in the queue by state", ("state",))
+    jobs.set(stats["queued"], state="queued")
+    jobs.set(stats["running"], state="running")
+    workers = Gauge("onboardai_job_workers", "Worker threads running jobs")
+    workers.set(stats["max_workers"])
+    capacity = Gauge("onboardai_job_queue_capacity", "Jobs accepted before submissions get 429")
+    capacity.set(stats["capacity"])
+    return [jobs, workers, capacity]
+
+def _log_metrics():
+    stats = log_queue_stats()
+    queued = Gauge("onboardai_log_queue_records", "Log records waiting for the background writer")
+    queued.set(stats["queued"])
+    dropped = Counter("onboardai_log_records_dropped_total", "Log records dropped because the log queue was full")
+    dropped.inc(stats["dropped"])
+    return [queued, dropped]
+
+def _retention_metrics():
+    stats = output_index.stats()
+    indexed = Gauge("onboardai_output_files_indexed", "Generated output files tracked for retention")
+    indexed.set(stats["indexed"])
+    backlog = Gauge("onboardai_retention_backlog_files", "Output files past retention and not yet deleted")
+    backlog.set(stats["backlog"])
+    lag = Gauge("onboardai_retention_lag_seconds", "How long ago the oldest undeleted file expired")
+    lag.set(stats["lag_seconds"])
+    last_run = Gauge("onboardai_retention_last_run_timestamp_seconds", "Unix time of the last retention batch")
+    last_run.set(stats["last_run_at"] or 0)
+    return [indexed, backlog, lag, last_run]
+
+def _rate_limit_metrics():
+    if llm_rate_limiter is None:
+        return []
+    # In-process counters only; bucket levels live in SQLite (see /api/rate-limit/stats)
+    acquired = Counter("onboardai_llm_rate_limit_acquired_total", "LLM calls admitted by the shared rate limiter", ("lane",))
+    waited = Counter("onboardai_llm_rate_limit_wait_seconds_total", "Time LLM calls spent waiting for rate budget", ("lane",))
+    for lane in LANES:
+        acquired.inc(llm_rate_limiter.acquired[lane], lane=lane)
+        waited.inc(llm_rate_limiter.waited_seconds[lane], lane=lane)
+    rejected = Counter(
+        "onboardai_llm_rate_limit_rejected_total", "Interactive LLM calls refused because the wait was too long"
+    )
+    rejected.inc(llm_rate_limiter.rejected)
+    return [acquired, waited, rejected]
+
+def _cache_metrics():
+    # Read the in-process counters only; the caches' stats() would query SQLite
+    counters = {
+        "research_brief": (research_cache.hits, research_cache.misses),
+        "llm_response": (llm_cache.hits, llm_cache.misses),
+    }
+    kb_stats = knowledge_base_cache_stats()
+    if kb_stats is not None:
+        for name in ("query_embeddings", "search_results"):
+            counters[f"kb_{name}"] = (kb_stats[name]["hits"], kb_stats[name]["misses"])
+    return cache_metrics(counters)
+
+metrics_registry.add_collector(_queue_metrics)
+metrics_registry.add_collector(_cache_metrics)
+metrics_registry.add_collector(_log_metrics)
+metrics_registry.add_collector(_retention_metrics)
+metrics_registry.add_collector(_rate_limit_metrics)
+
+SSE_POLL_INTERVAL = 0.2
+SSE_HEARTBEAT_INTERVAL = 15.0
 
 @app.get("/api/health")
 async def health_check():
@@ -70,31 +262,42 @@ async def health_check():
         "status": status,
         "knowledge_base": "ready" if kb_exists else "not_found",
         "api_key_configured": api_key_set,
+        "queue": job_manager.stats(),
         "version": settings.api_version
     }
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the embedding model and knowledge base are warmed up"""
+    warmup = warmup_state.to_dict()
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content={"ready": False, "warmup": warmup})
+    return {"ready": True, "warmup": warmup}
+
 
 @app.get("/api/metrics")
 async def metrics():
-    """Basic metrics endpoint"""
-    try:
-        deleted_files = cleanup_old_files()
-        return {
-            "files_cleaned": deleted_files,
-            "retention_days": settings.file_retention_days
-        }
-    except Exception as e:
-        logger.error(f"Error getting metrics: {e}", exc_info=True)
-        return {"error": "Failed to retrieve metrics"}
-
-@app.post("/api/onboard", response_model=OnboardingResponse)
-async def onboard_employee(request: Request, profile: EmployeeProfile):
-    """
-    Submit employee profile and start onboarding process.
-    Returns the generated onboarding package content.
-    """
-    logger.info(f"Onboarding request received for {profile.name}")
-    
+    """Prometheus text-format metrics. Read-only: scraping never does cleanup or I/O."""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss statistics for the application caches"""
+    return {
+        "research_brief": research_cache.stats(),
+        "llm_response": llm_cache.stats(),
+        "knowledge_base_search": knowledge_base_cache_stats()
+    }
+
+@app.get("/api/rate-limit/stats")
+async def rate_limit_stats():
+    """Shared LLM request/token bucket levels and this worker's admissions per lane"""
+    if llm_rate_limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_rate_limiter.stats()}
+
+def check_onboarding_ready():
+    """Reject onboarding requests that cannot succeed."""
     if not os.path.exists(settings.persist_directory):
         logger.error("Knowledge base not found")
         raise HTTPException(
@@ -108,65 +311,298 @@ async def onboard_employee(request: Request, profile: EmployeeProfile):
             status_code=500,
             detail="OpenAI API key not configured. Please add OPENAI_API_KEY to .env file."
         )
+
+def check_llm_budget():
+    """
+    Refuse new interactive work that the shared LLM budget could not start
+    within LLM_RATE_LIMIT_MAX_WAIT_SECONDS, telling the client when to retry.
+    """
+    if llm_rate_limiter is None:
+        return
+    backlog = llm_rate_limiter.backlog_seconds()
+    if backlog > settings.llm_rate_limit_max_wait_seconds:
+        retry_after = max(1, math.ceil(backlog - settings.llm_rate_limit_max_wait_seconds))
+        logger.warning(f"LLM rate budget backlog {backlog:.1f}s; asking client to retry in {retry_after}s")
+        raise HTTPException(
+            status_code=429,
+            detail=f"OpenAI rate budget exhausted; retry in about {retry_after}s",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+def run_onboarding_job(
+    job: Job, employee_profile: dict, pipeline_mode: Optional[str] = None, use_cache: bool = True
+) -> dict:
+    """Worker-side body of an onboarding job."""
+    # The crew stack (crewai, openai) is imported on first use, not at startup
+    from backend.main import OnboardingCrew
+    
+    with silence_output(), bypassing_llm_cache(not use_cache):
+        with span("setup"):
+            onboarding_crew = OnboardingCrew(employee_profile, use_cache=use_cache, pipeline_mode=pipeline_mode)
+        result = onboarding_crew.run()
+    
+    logger.info(f"Onboarding package created successfully for {employee_profile['name']}")
+    
+    return OnboardingResponse(
+        success=True,
+        message=f"Onboarding package created successfully for {employee_profile['name']}",
+        execution_time=result['execution_time'],
+        output_id=result['output_id'],
+        output_file=result['output_file'],
+        package_content=result['package_content'],
+        research_cached=result['research_cached'],
+        pipeline_mode=result['pipeline_mode']
+    ).dict()
+
+def run_batch_job(
+    job: Job, employee_profiles: List[dict], pipeline_mode: Optional[str] = None, use_cache: bool = True
+) -> dict:
+    """Worker-side body of a batch onboarding job."""
+    from backend.batch import run_batch
+    
+    with bypassing_llm_cache(not use_cache):
+        result = run_batch(employee_profiles, pipeline_mode=pipeline_mode, use_cache=use_cache)
+    return BatchOnboardingResponse(**result).dict()
+
+@app.post("/api/onboard", response_model=JobSubmittedResponse, status_code=202)
+async def onboard_employee(request: Request, profile: EmployeeProfile):
+    """
+    Submit employee profile and start onboarding process.
+    Returns a job ID immediately; poll /api/jobs/{job_id} for the package.
+    """
+    logger.info(f"Onboarding request received for {profile.name}")
+    
+    check_onboarding_ready()
+    check_llm_budget()
+    
+    employee_profile = profile.dict(exclude={'pipeline_mode', 'use_cache'})
     
     try:
-        employee_profile = profile.dict()
-        
-        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
-            onboarding_crew = OnboardingCrew(employee_profile)
-            result = onboarding_crew.run()
-        
-        output_file_path = os.path.join(settings.outputs_directory, result['output_file'])
-        package_content = None
-        
-        if os.path.exists(output_file_path):
-            with open(output_file_path, 'r', encoding='utf-8') as f:
-                package_content = f.read()
-        
-        logger.info(f"Onboarding package created successfully for {profile.name}")
-        
-        return OnboardingResponse(
-            success=True,
-            message=f"Onboarding package created successfully for {profile.name}",
-            execution_time=result['execution_time'],
-            output_file=result['output_file'],
-            package_content=package_content
-        )
-        
-    except OnboardingError as e:
-        logger.error(f"Onboarding error: {e.message}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=e.message
+        job = job_manager.submit(
+            lambda job: run_onboarding_job(job, employee_profile, profile.pipeline_mode, profile.use_cache),
+            kind="onboarding",
+            description=profile.name
         )
-    except Exception as e:
-        logger.error(f"Unexpected error during onboarding: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail="An unexpected error occurred. Please try again later."
+    except QueueFullError as e:
+        logger.warning(f"Rejected onboarding for {profile.name}: {e.message}")
+        raise HTTPException(status_code=429, detail=e.message)
+    
+    return JobSubmittedResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.id}",
+        events_url=f"/api/onboard/{job.id}/events"
+    )
+
+@app.post("/api/onboard/batch", response_model=JobSubmittedResponse, status_code=202)
+async def onboard_batch(request: Request, batch: BatchOnboardingRequest):
+    """
+    Submit a cohort of employee profiles as a single job.
+    Policy research runs once per location/department/work-arrangement group;
+    the job result lists the status of every employee.
+    """
+    logger.info(f"Batch onboarding request received for {len(batch.employees)} employees")
+    
+    check_onboarding_ready()
+    
+    employee_profiles = [profile.dict(exclude={'pipeline_mode', 'use_cache'}) for profile in batch.employees]
+    
+    try:
+        job = job_manager.submit(
+            lambda job: run_batch_job(job, employee_profiles, batch.pipeline_mode, batch.use_cache),
+            kind="batch",
+            description=f"{len(employee_profiles)} employees"
         )
+    except QueueFullError as e:
+        logger.warning(f"Rejected batch onboarding: {e.message}")
+        raise HTTPException(status_code=429, detail=e.message)
+    
+    return JobSubmittedResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.id}",
+        events_url=f"/api/onboard/{job.id}/events"
+    )
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Get the status and, once finished, the result of a job"""
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobStatusResponse(**job.to_dict())
+
+@app.get("/api/jobs/{job_id}/trace")
+def get_job_trace(job_id: str):
+    """
+    Span tree for a job: crew, tasks, agent steps, LLM calls, tool and
+    knowledge base operations with durations, token counts and payload
+    sizes. Available while the job runs and after it has been pruned,
+    for as long as the trace file still holds it. Sync so the file
+    scan runs in the threadpool.
+    """
+    trace = get_trace(job_id)
+    
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    
+    return trace
 
-@app.get("/api/output/{filename}")
-async def download_output(filename: str):
-    """Download the generated onboarding package file"""
-    if ".." in filename or "/" in filename or "\\" in filename:
-        logger.warning(f"Invalid filename attempted: {filename}")
-        raise HTTPException(status_code=400, detail="Invalid filename")
+@app.get("/api/onboard/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream a job's progress as Server-Sent Events.
+    
+    Replays events already published, then follows the job live until it
+    finishes. Honors Last-Event-ID so reconnecting clients resume in place,
+    and stops as soon as the client disconnects.
+    """
+    job = job_manager.get(job_id)
     
-    output_path = os.path.join(settings.outputs_directory, filename)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    if not os.path.exists(output_path):
-        logger.warning(f"File not found: {filename}")
-        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        last_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_id = 0
     
-    logger.info(f"File download requested: {filename}")
+    async def event_stream():
+        nonlocal last_id
+        idle = 0.0
+        while True:
+            if await request.is_disconnected():
+                logger.info(f"Event stream for job {job_id} closed by client")
+                return
+            
+            events = job.events_since(last_id)
+            for event in events:
+                last_id = event["id"]
+                payload = json.dumps(event["data"], default=str)
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {payload}\n\n"
+                if event["event"] == "job" and event["data"].get("status") in JobStatus.FINISHED:
+                    return
+            
+            if events:
+                idle = 0.0
+                continue
+            
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            idle += SSE_POLL_INTERVAL
+            if idle >= SSE_HEARTBEAT_INTERVAL:
+                idle = 0.0
+                yield ": keep-alive\n\n"
     
-    return FileResponse(
-        path=output_path,
-        filename=filename,
-        media_type="text/markdown"
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+BYTE_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def _byte_range(range_header: str, length: int) -> Optional[tuple]:
+    """
+    Inclusive (start, end) of a single "bytes=" range, or None to send the
+    whole body (malformed or multi-range headers are ignored, as HTTP
+    allows). Raises ValueError when the range cannot be satisfied.
+    """
+    match = BYTE_RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or length == 0:
+            raise ValueError("empty suffix range")
+        return max(length - suffix, 0), length - 1
+    start, end = int(first), int(last) if last else None
+    if end is not None and end < start:
+        return None
+    if start >= length:
+        raise ValueError("range starts past the end")
+    return start, length - 1 if end is None else min(end, length - 1)
+
+@app.get("/api/output/{output_id}")
+def download_output(output_id: str, request: Request):
+    """
+    Download a generated onboarding package by its content ID.
+    
+    Stored packages are gzip-compressed and immutable, so clients that accept
+    gzip get the stored bytes untouched (Content-Encoding: gzip) and the ID
+    is a strong ETag. Supports If-None-Match and single byte ranges.
+    """
+    if not output_store.is_valid_id(output_id):
+        logger.warning(f"Invalid output ID requested: {output_id[:100]}")
+        raise HTTPException(status_code=400, detail="Invalid output ID")
+    
+    gzip_encoded = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    # Each content coding is its own representation with its own validator
+    etag = f'"{output_id}-gzip"' if gzip_encoded else f'"{output_id}"'
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+    if gzip_encoded:
+        headers["Content-Encoding"] = "gzip"
+    
+    path = output_store.locate(output_id)
+    if path is None:
+        logger.warning(f"Output not found: {output_id}")
+        raise HTTPException(status_code=404, detail="Output not found")
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        with open(path, 'rb') as f:
+            body = f.read()
+    except FileNotFoundError:
+        # Expired between the lookup and the read
+        raise HTTPException(status_code=404, detail="Output not found")
+    if not gzip_encoded:
+        body = gzip.decompress(body)
+    
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Disposition"] = f'attachment; filename="{output_id}.md"'
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = _byte_range(range_header, len(body))
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(body)}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return Response(body[start:end + 1], status_code=206, media_type="text/markdown", headers=headers)
+    
+    logger.info(f"Output download requested: {output_id}")
+    return Response(body, media_type="text/markdown", headers=headers)
+
 
 @app.exception_handler(OnboardingError)
 async def onboarding_error_handler(request: Request, exc: OnboardingError):
@@ -185,7 +621,25 @@ async def startup_event():
     logger.info(f"Debug mode: {settings.debug}")
     logger.info(f"CORS origins: {settings.cors_origins_list}")
     
+    logger.info(
+        f"Job queue: {job_manager.max_workers} workers, capacity {job_manager.capacity}"
+    )
+    
     os.makedirs(settings.outputs_directory, exist_ok=True)
+    
+    global _cleanup_stop
+    _cleanup_stop = start_cleanup_worker()
+    
+    start_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background workers and pooled LLM connections on shutdown."""
+    if _cleanup_stop is not None:
+        _cleanup_stop.set()
+    job_manager.shutdown()
+    close_llm_clients()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,139 @@
+"""Batch onboarding: research once per policy group, write packages concurrently."""
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from tasks.onboarding_tasks import OnboardingTasks
+from backend.main import OnboardingCrew
+from backend.config import settings
+from backend.utils.logger import logger
+from backend.utils.exceptions import OnboardingError
+from backend.utils.progress import emit
+from backend.utils.rate_limit import BATCH, rate_limit_lane
+from backend.utils.stdio import silence_output
+
+
+def group_profiles(employee_profiles):
+    """Group profile indices by their policy facets, preserving input order."""
+    groups = OrderedDict()
+    for index, profile in enumerate(employee_profiles):
+        facets = OnboardingTasks.policy_facets(profile)
+        groups.setdefault(facets, []).append(index)
+    return groups
+
+
+def _in_context(executor, fn, *args):
+    """Submit fn to the executor carrying over the caller's context variables."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _research_group(representative, pipeline_mode, use_cache):
+    with silence_output():
+        return OnboardingCrew.research(representative, use_cache=use_cache, pipeline_mode=pipeline_mode)
+
+
+def _write_package(employee_profile, research_brief, pipeline_mode, use_cache):
+    with silence_output():
+        return OnboardingCrew(
+            employee_profile, research_brief=research_brief, use_cache=use_cache, pipeline_mode=pipeline_mode
+        ).run()
+
+
+def _error_message(error):
+    if isinstance(error, OnboardingError):
+        return error.message
+    return "An unexpected error occurred"
+
+
+def run_batch(employee_profiles, max_workers=None, pipeline_mode=None, use_cache=True):
+    """
+    Onboard a cohort of employees.
+
+    Profiles are grouped by OnboardingTasks.policy_facets; the researcher
+    runs once per group and every writer in the group reuses its brief.
+    Research and writing share one worker pool. Their LLM calls draw from
+    the shared rate budget in the batch lane, behind interactive onboardings.
+
+    Returns:
+        Aggregate result with one status entry per employee, in input order.
+    """
+    start_time = datetime.now()
+    pipeline_mode = OnboardingCrew.resolve_pipeline_mode(pipeline_mode)
+    groups = group_profiles(employee_profiles)
+    results = [None] * len(employee_profiles)
+
+    logger.info(
+        f"Starting batch onboarding for {len(employee_profiles)} employees in {len(groups)} policy groups"
+    )
+    emit("batch", status="started", employees=len(employee_profiles), groups=len(groups))
+
+    def record(index, group_label, status, result=None, error=None):
+        profile = employee_profiles[index]
+        results[index] = {
+            "name": profile['name'],
+            "status": status,
+            "group": group_label,
+            "output_id": result['output_id'] if result else None,
+            "output_file": result['output_file'] if result else None,
+            "execution_time": result['execution_time'] if result else None,
+            "error": error,
+        }
+        emit("employee", index=index, **results[index])
+
+    # Workers inherit the lane through _in_context
+    with rate_limit_lane(BATCH), ThreadPoolExecutor(
+        max_workers=max_workers or settings.batch_max_concurrency,
+        thread_name_prefix="onboarding-batch"
+    ) as executor:
+        research_futures = {
+            _in_context(
+                executor, _research_group, employee_profiles[indices[0]], pipeline_mode, use_cache
+            ): (facets, indices)
+            for facets, indices in groups.items()
+        }
+        write_futures = {}
+
+        for future in as_completed(research_futures):
+            facets, indices = research_futures[future]
+            group_label = "/".join(facets)
+            try:
+                research_brief = future.result()
+            except Exception as e:
+                logger.error(f"Research failed for group {group_label}: {e}")
+                for index in indices:
+                    record(index, group_label, "failed", error=_error_message(e))
+                continue
+
+            emit("group", group=group_label, status="researched", employees=len(indices))
+            for index in indices:
+                write_future = _in_context(
+                    executor, _write_package, employee_profiles[index], research_brief, pipeline_mode, use_cache
+                )
+                write_futures[write_future] = (index, group_label)
+
+        for future in as_completed(write_futures):
+            index, group_label = write_futures[future]
+            try:
+                record(index, group_label, "completed", result=future.result())
+            except Exception as e:
+                logger.error(f"Onboarding failed for {employee_profiles[index]['name']}: {e}")
+                record(index, group_label, "failed", error=_error_message(e))
+
+    execution_time = (datetime.now() - start_time).total_seconds()
+    succeeded = sum(1 for r in results if r["status"] == "completed")
+
+    logger.info(
+        f"Batch onboarding finished in {execution_time:.2f}s: "
+        f"{succeeded}/{len(results)} succeeded"
+    )
+
+    return {
+        "success": succeeded == len(results),
+        "message": f"Created {succeeded} of {len(results)} onboarding packages",
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "groups": len(groups),
+        "execution_time": execution_time,
+        "employees": results,
+    }
@@ -0,0 +1,32 @@
+"""Canned crewAI-style answers shared by the stub LLM and the fake OpenAI server."""
+
+RESEARCH_ANSWER = """Thought: I now know the final answer
+Final Answer: Policy summary
+- Universal policies: Code of Conduct, information security, data privacy
+- Location/department-specific requirements as retrieved
+- Benefits enrollment 30-day deadline
+- System access requirements: SSO, 2FA
+"""
+
+PACKAGE_ANSWER = """Thought: I now know the final answer
+Final Answer: # Welcome Email
+Welcome to Workday! Your first day starts at 9 AM.
+
+# Day 1 Checklist
+- 9 AM IT setup
+- 10 AM HR orientation
+
+# Week 1 Checklist
+- Complete I-9 and direct deposit
+
+# 30-Day Checklist
+- BENEFITS ENROLLMENT DEADLINE (Day 30)
+
+# Policy Summaries
+- Code of Conduct, vacation/PTO, benefits
+"""
+
+
+def canned_answer(prompt: str) -> str:
+    """The writer's package for writer prompts, a policy brief for anything else."""
+    return PACKAGE_ANSWER if "onboarding package" in prompt else RESEARCH_ANSWER
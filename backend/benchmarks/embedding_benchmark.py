@@ -0,0 +1,188 @@
+"""
+PyTorch fp32 vs ONNX int8 embeddings: throughput, memory and agreement.
+
+Run from backend/ (export the ONNX model first):
+
+    python -m tools.embeddings --export
+    python -m benchmarks.embedding_benchmark [--texts 1000] [--k 5] [--json]
+
+Each backend runs in its own interpreter so load time and peak RSS are
+measured in isolation. The corpus is chunks of the PDFs in pdf_directory
+(synthetic sentences if there are none). Agreement is reported as the
+mean cosine similarity between the two backends' vectors for the same
+text, and as top-k overlap of nearest-neighbour retrieval for a fixed set
+of policy queries.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+from backend.config import settings
+from tools.embeddings import EMBEDDING_BACKENDS, load_embedding_model
+from tools.pdf_extraction import chunk_pages, iter_pages
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERIES = [
+    "Code of Conduct",
+    "information security training",
+    "data privacy requirements",
+    "benefits enrollment deadline",
+    "vacation and paid time off policy",
+    "California meal breaks",
+    "Texas hybrid work requirements",
+    "New York commuter benefits",
+    "GitHub access and 2FA requirements",
+    "CRM access and customer data handling",
+    "background checks",
+    "I-9 employment eligibility verification",
+]
+
+
+def load_corpus(limit: int) -> List[str]:
+    """Chunks of the configured PDFs, or synthetic policy sentences."""
+    texts = []
+    pdf_directory = settings.pdf_directory
+    if os.path.isdir(pdf_directory):
+        for pdf_file in sorted(os.listdir(pdf_directory)):
+            if not pdf_file.endswith('.pdf'):
+                continue
+            for chunk in chunk_pages(iter_pages(os.path.join(pdf_directory, pdf_file))):
+                texts.append(chunk.text)
+                if len(texts) >= limit:
+                    return texts
+    while len(texts) < limit:
+        n = len(texts)
+        texts.append(
+            f"Policy {n}: employees must complete {QUERIES[n % len(QUERIES)].lower()} "
+            f"within {n % 30 + 1} days of their start date and confirm with their manager."
+        )
+    return texts
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def worker(backend: str, input_path: str, output_path: str):
+    """Child process: load one backend, embed corpus and queries, report stats."""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    rss_before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    model.encode(payload["texts"][:8])
+    start = time.perf_counter()
+    corpus = model.encode(payload["texts"], batch_size=payload["batch_size"])
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in payload["queries"]:
+        model.encode(query)
+    query_ms = (time.perf_counter() - start) * 1000 / len(payload["queries"])
+
+    queries = model.encode(payload["queries"])
+    np.savez(output_path, corpus=corpus, queries=queries)
+    print(json.dumps({
+        "backend": backend,
+        "load_s": load_seconds,
+        "texts_per_s": len(payload["texts"]) / encode_seconds,
+        "query_ms": query_ms,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": rss_before,
+    }))
+
+
+def run_backend(backend: str, input_path: str, workdir: str) -> Dict:
+    output_path = os.path.join(workdir, f"{backend}.npz")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.dirname(BACKEND_DIR), BACKEND_DIR, env.get("PYTHONPATH")])
+    )
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.embedding_benchmark",
+         "--worker", backend, "--input", input_path, "--output", output_path],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    stats = json.loads(completed.stdout.strip().splitlines()[-1])
+    with np.load(output_path) as data:
+        stats["corpus"], stats["queries"] = data["corpus"], data["queries"]
+    return stats
+
+
+def agreement(reference: Dict, candidate: Dict, k: int) -> Dict:
+    cosine = np.sum(reference["corpus"] * candidate["corpus"], axis=1)
+    overlaps, top1 = [], []
+    for ref_query, cand_query in zip(reference["queries"], candidate["queries"]):
+        ref_top = np.argsort(-(reference["corpus"] @ ref_query))[:k]
+        cand_top = np.argsort(-(candidate["corpus"] @ cand_query))[:k]
+        overlaps.append(len(set(ref_top) & set(cand_top)) / k)
+        top1.append(ref_top[0] == cand_top[0])
+    return {
+        "mean_cosine": float(np.mean(cosine)),
+        "min_cosine": float(np.min(cosine)),
+        f"overlap@{k}": float(np.mean(overlaps)),
+        "top1_agreement": float(np.mean(top1)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument("--texts", type=int, default=1000, help="Corpus size")
+    parser.add_argument("--batch-size", type=int, default=settings.ingest_embed_batch_size)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.input, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.json")
+        with open(input_path, 'w', encoding='utf-8') as f:
+            json.dump({"texts": load_corpus(args.texts), "queries": QUERIES, "batch_size": args.batch_size}, f)
+        results = {backend: run_backend(backend, input_path, workdir) for backend in EMBEDDING_BACKENDS}
+
+    reference, candidate = results["torch"], results["onnx-int8"]
+    report = {
+        "texts": len(reference["corpus"]),
+        "backends": [
+            {key: value for key, value in stats.items() if key not in ("corpus", "queries")}
+            for stats in results.values()
+        ],
+        "agreement": agreement(reference, candidate, args.k),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['texts']} texts, batch size {args.batch_size}")
+    print(f"{'backend':<10} {'load s':>7} {'texts/s':>9} {'query ms':>9} {'peak RSS MB':>12}")
+    for row in report["backends"]:
+        print(
+            f"{row['backend']:<10} {row['load_s']:>7.2f} {row['texts_per_s']:>9.1f} "
+            f"{row['query_ms']:>9.2f} {row['peak_rss_mb']:>12.0f}"
+        )
+    print("Agreement (onnx-int8 vs torch): " + ", ".join(
+        f"{name} {value:.3f}" for name, value in report["agreement"].items()
+    ))
+
+
+if __name__ == "__main__":
+    main()
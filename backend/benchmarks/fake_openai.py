@@ -0,0 +1,249 @@
+"""
+Local OpenAI-compatible chat completions server for load testing.
+
+    python -m benchmarks.fake_openai --port 8100 --latency lognormal:0.8,0.5 --tokens-per-s 60
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python api.py
+
+Serves POST /v1/chat/completions (streaming and non-streaming) with a
+canned crewAI-style answer, so onboardings complete without network
+access or spend:
+
+  --latency        time to first token, sampled per request:
+                   fixed:S | uniform:LO,HI | normal:MEAN,STD |
+                   lognormal:MEDIAN,SIGMA | exponential:MEAN (seconds)
+  --tokens-per-s   output throughput; streamed tokens are paced at this
+                   rate and non-streaming responses wait for all of them
+  --error-429      fraction of requests rejected with 429 + Retry-After
+  --error-5xx      fraction of requests failing with 500/502/503
+
+GET /stats reports request, error, token and concurrency counters.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from benchmarks.canned_responses import canned_answer
+
+# Roughly one token per word or punctuation run, keeping the whitespace
+_TOKEN = re.compile(r"\s*\S+")
+
+
+def parse_distribution(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Sampler for a latency spec like 'lognormal:0.8,0.5'; never negative."""
+    kind, _, raw = spec.partition(":")
+    try:
+        params = [float(value) for value in raw.split(",")] if raw else []
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution parameters: {spec}") from None
+
+    samplers = {
+        "fixed": (1, lambda p: p[0]),
+        "uniform": (2, lambda p: rng.uniform(p[0], p[1])),
+        "normal": (2, lambda p: rng.gauss(p[0], p[1])),
+        "lognormal": (2, lambda p: rng.lognormvariate(math.log(p[0]), p[1])),
+        "exponential": (1, lambda p: rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution '{kind}'. Expected one of: {', '.join(samplers)}")
+    arity, sample = samplers[kind]
+    if len(params) != arity:
+        raise ValueError(f"'{kind}' takes {arity} parameter(s), got {len(params)}: {spec}")
+    return lambda: max(0.0, sample(params))
+
+
+class FakeOpenAIStats:
+    """Counters exposed on /stats."""
+
+    def __init__(self):
+        self.requests = 0
+        self.streamed = 0
+        self.errors_429 = 0
+        self.errors_5xx = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors_429": self.errors_429,
+            "errors_5xx": self.errors_5xx,
+            "completion_tokens": self.completion_tokens,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests_per_s": self.requests / elapsed,
+        }
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content)
+    return "\n".join(parts)
+
+
+def _error(status_code: int, message: str, error_type: str, headers: Dict[str, str] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers
+    )
+
+
+def create_app(
+    latency: str = "fixed:0",
+    tokens_per_s: float = 0.0,
+    error_429: float = 0.0,
+    error_5xx: float = 0.0,
+    retry_after_s: int = 1,
+    seed: int = None,
+) -> FastAPI:
+    """Build the stand-in server; tokens_per_s=0 sends all tokens at once."""
+    rng = random.Random(seed)
+    first_token_delay = parse_distribution(latency, rng)
+    stats = FakeOpenAIStats()
+    app = FastAPI(title="Fake OpenAI")
+    app.state.stats = stats
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.to_dict()
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "fake"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats.requests += 1
+
+        roll = rng.random()
+        if roll < error_429:
+            stats.errors_429 += 1
+            return _error(
+                429, "Rate limit reached for requests (injected)", "requests",
+                headers={"retry-after": str(retry_after_s)}
+            )
+        if roll < error_429 + error_5xx:
+            stats.errors_5xx += 1
+            return _error(rng.choice((500, 502, 503)), "The server had an error (injected)", "server_error")
+
+        prompt = _prompt_text(body.get("messages", []))
+        tokens = _TOKEN.findall(canned_answer(prompt))
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+        finish_reason = "stop"
+        if max_tokens and len(tokens) > max_tokens:
+            tokens, finish_reason = tokens[:max_tokens], "length"
+
+        model = body.get("model", "gpt-4o-mini")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(tokens),
+            "total_tokens": len(prompt) // 4 + len(tokens),
+        }
+        token_delay = 1 / tokens_per_s if tokens_per_s > 0 else 0.0
+
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+        if not body.get("stream"):
+            try:
+                await asyncio.sleep(first_token_delay() + token_delay * len(tokens))
+            finally:
+                stats.in_flight -= 1
+            stats.completion_tokens += len(tokens)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            }
+
+        stats.streamed += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def event(choices: List[Dict[str, Any]], **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def chunk(delta: Dict[str, Any], finish: str = None) -> str:
+            return event([{"index": 0, "delta": delta, "finish_reason": finish}])
+
+        async def stream():
+            try:
+                await asyncio.sleep(first_token_delay())
+                yield chunk({"role": "assistant", "content": ""})
+                for token in tokens:
+                    yield chunk({"content": token})
+                    stats.completion_tokens += 1
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                yield chunk({}, finish_reason)
+                if include_usage:
+                    yield event([], usage=usage)
+                yield "data: [DONE]\n\n"
+            finally:
+                stats.in_flight -= 1
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5", help="Time-to-first-token distribution (seconds)")
+    parser.add_argument("--tokens-per-s", type=float, default=60.0, help="Output tokens per second (0 = instant)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with a 5xx")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        latency=args.latency,
+        tokens_per_s=args.tokens_per_s,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        retry_after_s=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Fake OpenAI listening on http://{args.host}:{args.port}/v1")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Load generator for /api/onboard.
+
+Start the stand-in LLM and point the API at it, then drive onboardings:
+
+    python -m benchmarks.fake_openai --latency lognormal:0.8,0.5 --tokens-per-s 60 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python api.py &
+    python -m benchmarks.load_generator --requests 50 --concurrency 8
+    python -m benchmarks.load_generator --requests 100 --rate 2 --json
+
+Closed loop (--concurrency N): N clients each submit a job and wait for
+it to finish before submitting the next. Open loop (--rate R): jobs
+arrive as a Poisson process at R per second regardless of completions,
+which is what exposes queueing and 429 rejections.
+
+Reports throughput, end-to-end latency percentiles (client view, submit
+to finished), queue wait and service time (from the job's timestamps),
+rejected submissions, and queue occupancy sampled from /api/health.
+Profiles come from data/employee_profiles.json, cycled. Caches are
+bypassed unless --use-cache is given, so every job reaches the LLM.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_PATH = os.path.join(BACKEND_DIR, "data", "employee_profiles.json")
+# JobStatus.FINISHED
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def summarize(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "p99": float(np.percentile(samples, 99)),
+        "max": float(np.max(samples)),
+    }
+
+
+class LoadGenerator:
+    """Submits onboardings and follows each job to completion."""
+
+    def __init__(self, client: httpx.AsyncClient, profiles: List[Dict], args: argparse.Namespace):
+        self.client = client
+        self.profiles = profiles
+        self.args = args
+        self.results: List[Dict[str, Any]] = []
+        self.queue_samples: List[Dict[str, int]] = []
+        self._submitted = 0
+
+    def _next_profile(self) -> Dict:
+        profile = dict(self.profiles[self._submitted % len(self.profiles)])
+        self._submitted += 1
+        profile["use_cache"] = self.args.use_cache
+        if self.args.pipeline_mode:
+            profile["pipeline_mode"] = self.args.pipeline_mode
+        return profile
+
+    async def one(self):
+        """Submit one onboarding and poll it until it reaches a terminal status."""
+        profile = self._next_profile()
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"submit_status": None, "status": None}
+        try:
+            response = await self.client.post("/api/onboard", json=profile)
+            result["submit_status"] = response.status_code
+            result["submit_ms"] = (time.perf_counter() - start) * 1000
+            if response.status_code != 202:
+                result["status"] = "rejected" if response.status_code == 429 else "error"
+                return
+
+            job_url = response.json()["status_url"]
+            deadline = start + self.args.timeout
+            while time.perf_counter() < deadline:
+                await asyncio.sleep(self.args.poll_interval)
+                job = (await self.client.get(job_url)).json()
+                if job["status"] in TERMINAL_STATUSES:
+                    result["status"] = job["status"]
+                    result["e2e_s"] = time.perf_counter() - start
+                    if job.get("started_at"):
+                        result["queue_wait_s"] = job["started_at"] - job["created_at"]
+                        result["service_s"] = job["finished_at"] - job["started_at"]
+                    return
+            result["status"] = "timeout"
+        except httpx.HTTPError as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        finally:
+            self.results.append(result)
+
+    async def closed_loop(self):
+        remaining = self.args.requests
+
+        async def client_loop():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await self.one()
+
+        await asyncio.gather(*(client_loop() for _ in range(self.args.concurrency)))
+
+    async def open_loop(self):
+        rng = random.Random(self.args.seed)
+        tasks = []
+        for _ in range(self.args.requests):
+            tasks.append(asyncio.create_task(self.one()))
+            await asyncio.sleep(rng.expovariate(self.args.rate))
+        await asyncio.gather(*tasks)
+
+    async def sample_queue(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                health = (await self.client.get("/api/health")).json()
+                if "queue" in health:
+                    self.queue_samples.append(health["queue"])
+            except (httpx.HTTPError, ValueError):
+                pass
+            try:
+                await asyncio.wait_for(stop.wait(), self.args.sample_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> Dict[str, Any]:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(self.sample_queue(stop))
+        start = time.perf_counter()
+        if self.args.rate:
+            await self.open_loop()
+        else:
+            await self.closed_loop()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for result in self.results:
+            by_status[result["status"]] = by_status.get(result["status"], 0) + 1
+        completed = [result for result in self.results if result["status"] == "completed"]
+        queued = [sample["queued"] for sample in self.queue_samples]
+        running = [sample["running"] for sample in self.queue_samples]
+        return {
+            "mode": f"open loop, {self.args.rate}/s" if self.args.rate else f"closed loop, {self.args.concurrency} clients",
+            "requests": len(self.results),
+            "elapsed_s": elapsed,
+            "throughput_per_s": len(completed) / elapsed if elapsed else 0.0,
+            "statuses": by_status,
+            "rejected_429": sum(1 for result in self.results if result["submit_status"] == 429),
+            "submit_ms": summarize([result["submit_ms"] for result in self.results if "submit_ms" in result]),
+            "e2e_s": summarize([result["e2e_s"] for result in completed]),
+            "queue_wait_s": summarize([result["queue_wait_s"] for result in completed if "queue_wait_s" in result]),
+            "service_s": summarize([result["service_s"] for result in completed if "service_s" in result]),
+            "queue_depth": {
+                "mean_queued": float(np.mean(queued)) if queued else None,
+                "max_queued": max(queued) if queued else None,
+                "max_running": max(running) if running else None,
+                "samples": len(queued),
+            },
+        }
+
+
+def _format(report: Dict[str, Any]) -> str:
+    def row(name: str, stats: Dict[str, Optional[float]], unit: str) -> str:
+        if stats["p50"] is None:
+            return f"  {name:<14} -"
+        return (
+            f"  {name:<14} p50 {stats['p50']:.2f}{unit}  p95 {stats['p95']:.2f}{unit}  "
+            f"p99 {stats['p99']:.2f}{unit}  max {stats['max']:.2f}{unit}"
+        )
+
+    depth = report["queue_depth"]
+    mean_queued = "-" if depth["mean_queued"] is None else f"{depth['mean_queued']:.1f}"
+    return "\n".join([
+        f"{report['requests']} requests ({report['mode']}) in {report['elapsed_s']:.1f}s: "
+        f"{report['throughput_per_s']:.2f} completed/s",
+        "  statuses       " + ", ".join(f"{status} {count}" for status, count in sorted(report["statuses"].items())),
+        row("submit", report["submit_ms"], "ms"),
+        row("end-to-end", report["e2e_s"], "s"),
+        row("queue wait", report["queue_wait_s"], "s"),
+        row("service", report["service_s"], "s"),
+        f"  queue depth    mean {mean_queued}  "
+        f"max queued {depth['max_queued']}  max running {depth['max_running']}",
+    ])
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    with open(args.profiles, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+    limits = httpx.Limits(max_connections=max(args.concurrency, 1) * 2 + 10)
+    async with httpx.AsyncClient(base_url=args.api, timeout=30, limits=limits) as client:
+        return await LoadGenerator(client, profiles, args).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent onboardings against the API")
+    parser.add_argument("--api", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--requests", type=int, default=20, help="Onboardings to submit")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed-loop clients")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals per second (overrides --concurrency)")
+    parser.add_argument("--pipeline-mode", choices=("agent", "direct"))
+    parser.add_argument("--use-cache", action="store_true", help="Allow research-brief and LLM cache hits")
+    parser.add_argument("--profiles", default=PROFILES_PATH, help="JSON list of employee profiles")
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Seconds between /api/health queue samples")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-job timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    print(json.dumps(report, indent=2) if args.json else _format(report))
+
+
+if __name__ == "__main__":
+    main()
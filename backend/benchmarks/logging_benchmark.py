@@ -0,0 +1,250 @@
+"""
+Cost of logging on the request path: synchronous handlers vs the queue.
+
+    python -m benchmarks.logging_benchmark
+    python -m benchmarks.logging_benchmark --sink-latency-ms 2 --json
+
+Two measurements, each with synchronous sinks attached straight to the
+logger ("sync", the old setup), behind the bounded QueueHandler ("queue",
+the current setup) and with logging disabled ("off"):
+
+  per call      latency of one logger.info() with request correlation
+                fields, as seen by the calling thread
+  /api/onboard  submit latency of POST /api/onboard over ASGI (the job
+                body is stubbed out), which logs twice per request; modes
+                are interleaved over --rounds rounds to cancel drift
+
+Sinks are a stream to os.devnull and a rotating file in a temp dir,
+formatted per LOG_FORMAT. --sink-latency-ms adds a sleep to every sink
+write to stand in for a slow disk, pipe or log shipper. Queue mode also
+reports records dropped when a burst outruns the listener.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(BACKEND_DIR)
+sys.path[:0] = [REPO_ROOT, BACKEND_DIR]
+
+WORK_DIR = tempfile.mkdtemp(prefix="logging-benchmark-")
+# Settings are read at import: a throwaway knowledge base dir satisfies the
+# onboarding readiness check and the queue never rejects benchmark jobs
+os.environ.setdefault("OPENAI_API_KEY", "sk-logging-benchmark")
+os.environ["PERSIST_DIRECTORY"] = os.path.join(WORK_DIR, "kb")
+os.environ["OUTPUTS_DIRECTORY"] = os.path.join(WORK_DIR, "outputs")
+os.environ["JOB_QUEUE_SIZE"] = "1000000"
+# Prune finished jobs immediately so later modes do not pay for a growing job table
+os.environ["JOB_RETENTION_SECONDS"] = "0"
+os.makedirs(os.environ["PERSIST_DIRECTORY"], exist_ok=True)
+
+import httpx  # noqa: E402
+from backend.utils.logger import ContextFilter, attach_queue_handler, create_formatter, log_context  # noqa: E402
+
+MODES = ("sync", "queue", "off")
+
+PROFILE = {
+    "name": "Bench Mark",
+    "role": "Engineer",
+    "department": "Engineering",
+    "location": "California",
+    "work_arrangement": "remote",
+    "employment_type": "full_time",
+    "start_date": "2025-01-06",
+}
+
+
+class SlowHandler(logging.Handler):
+    """Delays every write to another handler by a fixed latency."""
+
+    def __init__(self, inner: logging.Handler, latency_s: float):
+        super().__init__(inner.level)
+        self.inner = inner
+        self.latency_s = latency_s
+
+    def emit(self, record: logging.LogRecord):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.inner.handle(record)
+
+    def close(self):
+        self.inner.close()
+        super().close()
+
+
+def make_sinks(latency_s: float) -> List[logging.Handler]:
+    formatter = create_formatter()
+    stream = logging.StreamHandler(open(os.devnull, "w"))
+    file = RotatingFileHandler(os.path.join(WORK_DIR, "bench.log"), maxBytes=10 * 1024 * 1024, backupCount=1)
+    sinks = []
+    for handler in (stream, file):
+        handler.setFormatter(formatter)
+        sinks.append(SlowHandler(handler, latency_s))
+    return sinks
+
+
+def configure(logger: logging.Logger, mode: str, latency_s: float, queue_size: int):
+    """Point logger at fresh sinks for mode; returns a teardown that flushes them and reports drops."""
+    logger.handlers = []
+    logger.filters = []
+    logger.disabled = mode == "off"
+    logger.propagate = False
+    if mode == "off":
+        return lambda: 0
+
+    sinks = make_sinks(latency_s)
+    if mode == "sync":
+        logger.addFilter(ContextFilter())
+        for sink in sinks:
+            logger.addHandler(sink)
+
+        def teardown():
+            for sink in sinks:
+                sink.close()
+            return 0
+        return teardown
+
+    queue_handler, listener = attach_queue_handler(logger, sinks, queue_size)
+
+    def teardown():
+        listener.stop()
+        for sink in sinks:
+            sink.close()
+        return queue_handler.dropped
+    return teardown
+
+
+def summarize_us(samples_ns: List[int]) -> Dict[str, float]:
+    samples = sorted(sample / 1000 for sample in samples_ns)
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def bench_calls(mode: str, calls: int, latency_s: float, queue_size: int) -> Dict:
+    logger = logging.getLogger(f"bench.calls.{mode}")
+    logger.setLevel(logging.INFO)
+    teardown = configure(logger, mode, latency_s, queue_size)
+    samples = []
+    with log_context(request_id="bench-request", job_id="bench-job"):
+        for i in range(calls):
+            start = time.perf_counter_ns()
+            logger.info("Onboarding request received for %s (%d)", PROFILE["name"], i)
+            samples.append(time.perf_counter_ns() - start)
+    drain_start = time.perf_counter()
+    dropped = teardown()
+    return {
+        "mode": mode,
+        "calls": calls,
+        **summarize_us(samples),
+        "drain_s": time.perf_counter() - drain_start,
+        "dropped": dropped,
+    }
+
+
+async def _post_onboard(requests: int) -> List[int]:
+    import api
+
+    transport = httpx.ASGITransport(app=api.app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter_ns()
+            response = await client.post("/api/onboard", json=PROFILE)
+            samples.append(time.perf_counter_ns() - start)
+            if response.status_code != 202:
+                raise RuntimeError(f"POST /api/onboard returned {response.status_code}: {response.text}")
+    return samples
+
+
+def bench_onboard(mode: str, requests: int, latency_s: float, queue_size: int):
+    """(per-request latencies in ns, records dropped) for one round of mode."""
+    import api
+
+    # Only the submit path is measured; the job itself does nothing
+    api.run_onboarding_job = lambda *args, **kwargs: {}
+    app_logger = logging.getLogger("onboardai")
+    saved = (app_logger.handlers, app_logger.filters, app_logger.disabled, app_logger.propagate)
+    teardown = configure(app_logger, mode, latency_s, queue_size)
+    try:
+        asyncio.run(_post_onboard(max(requests // 10, 1)))  # warm up routing and validation
+        samples = asyncio.run(_post_onboard(requests))
+        # Let the stub jobs finish so their log lines land in this mode's sinks
+        while True:
+            queue = api.job_manager.stats()
+            if queue["queued"] == 0 and queue["running"] == 0:
+                break
+            time.sleep(0.01)
+    finally:
+        dropped = teardown()
+        app_logger.handlers, app_logger.filters, app_logger.disabled, app_logger.propagate = saved
+    return samples, dropped
+
+
+def _format(report: Dict) -> str:
+    lines = [f"log format {report['log_format']}, sink latency {report['sink_latency_ms']} ms"]
+    for title, rows in (("per logger.info() call", report["calls"]), ("POST /api/onboard", report["onboard"])):
+        lines.append(title)
+        for row in rows:
+            lines.append(
+                f"  {row['mode']:<6} mean {row['mean_us']:9.1f}us  p50 {row['p50_us']:9.1f}us  "
+                f"p99 {row['p99_us']:9.1f}us  dropped {row['dropped']}"
+            )
+    per_call = next(row for row in report["calls"] if row["mode"] == "queue")
+    off = next(row for row in report["onboard"] if row["mode"] == "off")
+    queued = next(row for row in report["onboard"] if row["mode"] == "queue")
+    lines.append(
+        f"/api/onboard logging cost: ~{2 * per_call['p50_us']:.1f}us on the request thread (2 records), "
+        f"{queued['p50_us'] - off['p50_us']:.1f}us p50 end to end vs off "
+        "(includes the listener thread formatting under the GIL)"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure logging cost on the request path")
+    parser.add_argument("--calls", type=int, default=20000, help="logger.info() calls per mode")
+    parser.add_argument("--requests", type=int, default=200, help="POST /api/onboard requests per mode and round")
+    parser.add_argument("--rounds", type=int, default=3, help="Interleaved rounds of the /api/onboard modes")
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0, help="Added latency per sink write")
+    parser.add_argument("--queue-size", type=int, default=10000, help="Log queue capacity in queue mode")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    from backend.config import settings
+
+    latency_s = args.sink_latency_ms / 1000
+    calls = [bench_calls(mode, args.calls, latency_s, args.queue_size) for mode in MODES]
+
+    samples = {mode: [] for mode in MODES}
+    dropped = dict.fromkeys(MODES, 0)
+    for _ in range(args.rounds):
+        for mode in MODES:
+            round_samples, round_dropped = bench_onboard(mode, args.requests, latency_s, args.queue_size)
+            samples[mode].extend(round_samples)
+            dropped[mode] += round_dropped
+
+    report = {
+        "log_format": settings.log_format,
+        "sink_latency_ms": args.sink_latency_ms,
+        "calls": calls,
+        "onboard": [
+            {"mode": mode, "requests": len(samples[mode]), **summarize_us(samples[mode]), "dropped": dropped[mode]}
+            for mode in MODES
+        ],
+    }
+    print(json.dumps(report, indent=2) if args.json else _format(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Dense vs hybrid retrieval: latency and recall side by side.
+
+Run from backend/ against an ingested knowledge base:
+
+    python -m benchmarks.retrieval_benchmark
+    python -m benchmarks.retrieval_benchmark --queries labelled.json --k 5 --json
+
+Without --queries, a labelled set is synthesized from the knowledge base:
+for each sampled chunk, the query is its few highest-IDF terms (the
+keyword-heavy searches dense retrieval struggles with, like "I-9" or
+"2FA requirements") and the chunk itself is the expected hit.
+
+A --queries file is a JSON list of {"query": ..., "source": "file.pdf",
+"page": 4}; a result is a hit when it comes from that source and, if a
+page is given, its page range covers it.
+
+Query embeddings are computed once up front, so the latencies compare the
+retrieval stages themselves rather than the shared encoder.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+import numpy as np
+from tools.lexical_index import tokenize
+from tools.pdf_knowledge_base import RETRIEVAL_MODES, WorkdayPDFKnowledgeBase
+
+
+def synthesize_queries(kb: WorkdayPDFKnowledgeBase, samples: int, terms: int, seed: int) -> List[Dict]:
+    """Keyword queries built from sampled chunks' rarest terms."""
+    chunk_ids = kb.lexical_index.ids()
+    random.Random(seed).shuffle(chunk_ids)
+    chunks = kb.store.get(chunk_ids[:samples])
+
+    labelled = []
+    for chunk_id, document in zip(chunks["ids"], chunks["documents"]):
+        candidates = {token for token in tokenize(document) if len(token) > 2}
+        ranked = sorted(candidates, key=lambda term: (-kb.lexical_index.idf(term), term))
+        if ranked:
+            labelled.append({"query": " ".join(ranked[:terms]), "chunk_id": chunk_id})
+    return labelled
+
+
+def is_hit(expected: Dict, chunk_id: str, metadata: Dict) -> bool:
+    if "chunk_id" in expected:
+        return chunk_id == expected["chunk_id"]
+    if metadata.get("source") != expected["source"]:
+        return False
+    page = expected.get("page")
+    if page is None:
+        return True
+    return metadata.get("page_start", page) <= page <= metadata.get("page_end", page)
+
+
+def run_mode(kb: WorkdayPDFKnowledgeBase, labelled: List[Dict], k: int, mode: str) -> Dict:
+    latencies, hits, reciprocal_ranks = [], 0, []
+    for expected in labelled:
+        start = time.perf_counter()
+        results = kb.retrieve([expected["query"]], k, mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        rank = next(
+            (i for i, (chunk_id, metadata) in enumerate(zip(results["ids"][0], results["metadatas"][0]), 1)
+             if is_hit(expected, chunk_id, metadata)),
+            None
+        )
+        hits += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    return {
+        "mode": mode,
+        "queries": len(labelled),
+        f"recall@{k}": hits / len(labelled) if labelled else 0.0,
+        "mrr": float(np.mean(reciprocal_ranks)) if labelled else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense and hybrid retrieval")
+    parser.add_argument("--queries", help="JSON file of labelled queries (default: synthesize from the KB)")
+    parser.add_argument("--samples", type=int, default=200, help="Chunks to sample when synthesizing queries")
+    parser.add_argument("--terms", type=int, default=3, help="Terms per synthesized query")
+    parser.add_argument("--k", type=int, default=3, help="Results per query (n_results)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    kb = WorkdayPDFKnowledgeBase()
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            labelled = json.load(f)
+    else:
+        labelled = synthesize_queries(kb, args.samples, args.terms, args.seed)
+    if not labelled:
+        raise SystemExit("No queries to run; ingest PDFs with setup_pdfs.py first.")
+
+    kb.get_query_embeddings([expected["query"] for expected in labelled])
+    for mode in RETRIEVAL_MODES:
+        # One untimed pass so index loading and page faults are not measured
+        kb.retrieve([labelled[0]["query"]], args.k, mode)
+
+    results = [run_mode(kb, labelled, args.k, mode) for mode in RETRIEVAL_MODES]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    recall_key = f"recall@{args.k}"
+    print(f"{'mode':<8} {'queries':>8} {recall_key:>10} {'mrr':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in results:
+        print(
+            f"{row['mode']:<8} {row['queries']:>8} {row[recall_key]:>10.3f} {row['mrr']:>7.3f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Startup-time budget for the API and the ingestion script.
+
+Each probe runs in a fresh interpreter so module caches are cold:
+
+    python -m benchmarks.startup_benchmark              # check budgets, exit 1 on regression
+    python -m benchmarks.startup_benchmark --profile    # per-module import times for api.py
+
+Checks:
+  - `import api` and `import setup_pdfs` stay under their budgets
+  - importing api and serving the first /api/health stays under budget
+  - none of the heavy dependencies (crewai, chromadb,
+    sentence-transformers, torch) are imported by either module; they
+    must be deferred until first use
+
+Times are medians over --runs runs.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(BACKEND_DIR)
+
+HEAVY_MODULES = (
+    "crewai", "crewai_tools", "langchain_openai", "langchain_core",
+    "chromadb", "sentence_transformers", "torch",
+)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+result = {{"import_ms": (time.perf_counter() - start) * 1000}}
+if {health}:
+    from fastapi.testclient import TestClient
+    response = TestClient({module}.app).get("/api/health")
+    result["health_ms"] = (time.perf_counter() - start) * 1000
+    result["health_status"] = response.status_code
+result["heavy_modules"] = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, BACKEND_DIR, env.get("PYTHONPATH")]))
+    # Settings requires a key; nothing here calls OpenAI
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    return env
+
+
+def probe(module: str, health: bool = False) -> Dict:
+    """Import module (and optionally hit /api/health) in a fresh interpreter."""
+    code = PROBE.format(module=module, health=health, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def profile_imports(module: str, top: int) -> List[Dict]:
+    """Parse `python -X importtime` output into the slowest modules by cumulative time."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check API and setup_pdfs startup time budgets")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--api-import-budget-ms", type=float, default=1500)
+    parser.add_argument("--health-budget-ms", type=float, default=2000)
+    parser.add_argument("--setup-import-budget-ms", type=float, default=1000)
+    parser.add_argument("--profile", action="store_true", help="Report per-module import times instead")
+    parser.add_argument("--module", default="api", help="Module to profile with --profile")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.profile:
+        rows = profile_imports(args.module, args.top)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for row in rows:
+            print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['module']}")
+        return
+
+    api_runs = [probe("api", health=True) for _ in range(args.runs)]
+    setup_runs = [probe("setup_pdfs") for _ in range(args.runs)]
+
+    checks = [
+        ("api import", statistics.median(r["import_ms"] for r in api_runs), args.api_import_budget_ms),
+        ("api import + /api/health", statistics.median(r["health_ms"] for r in api_runs), args.health_budget_ms),
+        ("setup_pdfs import", statistics.median(r["import_ms"] for r in setup_runs), args.setup_import_budget_ms),
+    ]
+    heavy = sorted({name for r in api_runs + setup_runs for name in r["heavy_modules"]})
+    failed = [name for name, value, budget in checks if value > budget] + (["heavy imports"] if heavy else [])
+
+    if args.json:
+        print(json.dumps({
+            "checks": [{"name": name, "median_ms": value, "budget_ms": budget} for name, value, budget in checks],
+            "heavy_modules": heavy,
+            "passed": not failed,
+        }, indent=2))
+    else:
+        for name, value, budget in checks:
+            verdict = "ok" if value <= budget else "OVER BUDGET"
+            print(f"{name:<28} {value:>8.1f} ms  (budget {budget:.0f} ms)  {verdict}")
+        print(f"{'heavy modules at import':<28} {', '.join(heavy) or 'none'}")
+
+    if failed:
+        print(f"Startup budget exceeded: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Dependency-free stand-in for the embedding model."""
+import hashlib
+import re
+from typing import List, Union
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbeddingModel:
+    """
+    Hashed bag-of-words vectors (feature hashing, L2-normalized).
+
+    Fast, deterministic and offline, so benchmarks measure the ingestion and
+    retrieval machinery rather than the transformer. Same encode() contract
+    as tools.embeddings models; not semantically meaningful.
+    """
+
+    backend = "hash"
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self.model_name = f"hashing-{dimensions}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vector[digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            return self._vector(texts)
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.stack([self._vector(text) for text in texts])
@@ -0,0 +1,56 @@
+"""
+Local stand-in for the OpenAI chat model.
+
+Answers every prompt instantly (or after a fixed simulated latency) with a
+canned crewAI-style final answer, and keeps a running total of the time
+spent "in the model" so callers can subtract it from wall-clock time.
+"""
+import threading
+import time
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+from benchmarks.canned_responses import canned_answer
+
+
+class StubLLM(BaseLLM):
+    """
+    crewAI LLM that never leaves the process. It subclasses BaseLLM so
+    crewAI uses it as is; anything else is rebuilt into a real provider LLM.
+    """
+
+    def __init__(self, latency_s: float = 0.0):
+        super().__init__(model="stub")
+        self.latency_s = latency_s
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._model_seconds = 0.0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        messages = self._format_messages(messages)
+        self._emit_call_started_event(
+            messages=messages, tools=tools, callbacks=callbacks,
+            available_functions=available_functions, from_task=from_task, from_agent=from_agent
+        )
+        start = time.perf_counter()
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        text = canned_answer("\n".join(str(message.get('content') or '') for message in messages))
+        with self._lock:
+            self._calls += 1
+            self._model_seconds += time.perf_counter() - start
+        self._emit_call_completed_event(
+            response=text, call_type=LLMCallType.LLM_CALL,
+            from_task=from_task, from_agent=from_agent, messages=messages
+        )
+        return text
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def model_seconds(self) -> float:
+        """Total time spent answering (the simulated latency), across threads."""
+        with self._lock:
+            return self._model_seconds
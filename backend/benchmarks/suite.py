@@ -0,0 +1,304 @@
+"""
+Offline benchmark suite: ingestion throughput, search latency and crew overhead.
+
+Everything runs locally against synthetic policy PDFs and a stub LLM, so no
+API key or network access is needed. Run from backend/:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --sizes 5,20,80 --pages 20 --sections ingest,search
+    python -m benchmarks.suite --compare bench-main.json --output bench.json
+
+Sections:
+  ingest  WorkdayPDFKnowledgeBase.ingest_pdfs on a fresh corpus of each
+          size (pages/s, chunks/s, MB/s), then an incremental no-op re-run
+  search  search() latency p50/p95/p99 per retrieval mode and corpus size,
+          with the result cache disabled so every query does real work
+  crew    OnboardingCrew construction + run() per pipeline mode on the
+          largest corpus, minus the time spent inside the stub LLM, i.e.
+          the orchestration overhead a real request pays on top of OpenAI
+
+Embeddings default to a hashing stub (--embeddings stub) so ingestion and
+retrieval machinery is measured rather than the transformer; pass
+--embeddings model to use the configured embedding backend.
+
+Results are JSON with the commit they were measured on; --compare prints
+the change of every metric against an earlier results file.
+"""
+import os
+
+# Settings requires a key; nothing here calls OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from typing import Dict, List, Optional  # noqa: E402
+import numpy as np  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.utils.file_cleanup import OutputRetentionIndex  # noqa: E402
+from backend.utils.output_store import output_store  # noqa: E402
+from benchmarks.stub_embeddings import HashEmbeddingModel  # noqa: E402
+from benchmarks.synthetic_corpus import TOPICS, generate_corpus  # noqa: E402
+from tools.pdf_knowledge_base import RETRIEVAL_MODES, WorkdayPDFKnowledgeBase  # noqa: E402
+
+SECTIONS = ("ingest", "search", "crew")
+
+PROFILES = [
+    {"name": "Bench Engineer", "role": "Software Engineer", "department": "Engineering",
+     "location": "San Francisco, CA", "work_arrangement": "remote", "employment_type": "full_time",
+     "start_date": "2025-01-15"},
+    {"name": "Bench Seller", "role": "Account Executive", "department": "Sales",
+     "location": "Austin, TX", "work_arrangement": "hybrid", "employment_type": "full_time",
+     "start_date": "2025-02-01"},
+]
+
+# Metrics where a larger value is better; every other numeric metric is a cost
+HIGHER_IS_BETTER = ("_per_s",)
+# Row fields that describe the workload rather than measure it
+DESCRIPTIVE_FIELDS = ("documents", "pages", "chunks", "mode", "queries", "runs")
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+        "p99_ms": float(np.percentile(samples_ms, 99)),
+        "mean_ms": float(np.mean(samples_ms)),
+    }
+
+
+def synthetic_queries(count: int, seed: int) -> List[str]:
+    """Comma-joined topic lists, the shape of the onboarding search queries."""
+    rng = random.Random(seed)
+    return [", ".join(rng.sample(TOPICS, rng.randint(1, 4))) for _ in range(count)]
+
+
+def _directory_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory) if name.endswith('.pdf')
+    )
+
+
+def bench_ingest(kb: WorkdayPDFKnowledgeBase, documents: int, pages: int) -> Dict:
+    summary = kb.ingest_pdfs()
+    seconds = max(summary["seconds"], 1e-9)
+    noop = kb.ingest_pdfs()
+    return {
+        "documents": documents,
+        "pages": summary["pages"],
+        "chunks": summary["chunks"],
+        "seconds": summary["seconds"],
+        "pages_per_s": summary["pages"] / seconds,
+        "chunks_per_s": summary["chunks"] / seconds,
+        "mb_per_s": _directory_bytes(kb.pdf_directory) / (1024 * 1024) / seconds,
+        "noop_seconds": noop["seconds"],
+    }
+
+
+def bench_search(kb: WorkdayPDFKnowledgeBase, documents: int, queries: List[str], n_results: int) -> List[Dict]:
+    rows = []
+    for mode in RETRIEVAL_MODES:
+        # One untimed query so index loading and page faults are not measured
+        kb.search(queries[0], n_results, mode)
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            kb.search(query, n_results, mode)
+            samples.append((time.perf_counter() - start) * 1000)
+        rows.append({
+            "documents": documents,
+            "chunks": kb.store.count(),
+            "mode": mode,
+            "queries": len(queries),
+            **percentiles(samples),
+        })
+    return rows
+
+
+def bench_crew(kb: WorkdayPDFKnowledgeBase, runs: int, llm_latency_s: float) -> List[Dict]:
+    """OnboardingCrew wall time minus stub model time, per pipeline mode."""
+    # The crew stack is only needed for this section
+    from agents.onboarding_agents import set_llm
+    from backend.main import PIPELINE_MODES, OnboardingCrew
+    from backend.utils.stdio import silence_output
+    from benchmarks.stub_llm import StubLLM
+    from tools.knowledge_base import set_knowledge_base
+
+    llm = StubLLM(latency_s=llm_latency_s)
+    set_llm(llm)
+    set_knowledge_base(kb)
+
+    rows = []
+    for mode in PIPELINE_MODES:
+        overheads, cold_ms = [], None
+        calls_before = llm.calls
+        for run in range(runs + 1):
+            profile = PROFILES[run % len(PROFILES)]
+            model_before = llm.model_seconds
+            start = time.perf_counter()
+            with silence_output():
+                OnboardingCrew(profile, use_cache=False, pipeline_mode=mode).run()
+            overhead_ms = (time.perf_counter() - start - (llm.model_seconds - model_before)) * 1000
+            if run == 0:
+                # First run builds the agents and tools; reported separately
+                cold_ms = overhead_ms
+            else:
+                overheads.append(overhead_ms)
+        rows.append({
+            "mode": mode,
+            "runs": runs,
+            "cold_overhead_ms": cold_ms,
+            "llm_calls_per_run": (llm.calls - calls_before) / (runs + 1),
+            **{f"overhead_{key}": value for key, value in percentiles(overheads).items()},
+        })
+    return rows
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _row_key(section: str, row: Dict) -> tuple:
+    return (section, row.get("documents"), row.get("mode"))
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Lines describing every metric's change; regressions beyond threshold are flagged."""
+    previous = {
+        _row_key(section, row): row for section in SECTIONS for row in baseline.get(section, [])
+    }
+    lines = [f"Compared with {baseline.get('meta', {}).get('commit') or 'baseline'}:"]
+    for section in SECTIONS:
+        for row in current.get(section, []):
+            old = previous.get(_row_key(section, row))
+            if old is None:
+                continue
+            label = "/".join(str(part) for part in _row_key(section, row) if part is not None)
+            for metric, value in row.items():
+                old_value = old.get(metric)
+                if metric in DESCRIPTIVE_FIELDS or not isinstance(value, (int, float)) or not old_value:
+                    continue
+                change = (value - old_value) / old_value
+                worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+                flag = "  REGRESSION" if worse > threshold else ""
+                lines.append(f"  {label:<20} {metric:<20} {old_value:>10.2f} -> {value:>10.2f} ({change:+.1%}){flag}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingestion, search and crew overhead benchmarks")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="Comma-separated subset of: " + ", ".join(SECTIONS))
+    parser.add_argument("--sizes", default="5,20", help="Corpus sizes (number of PDFs), comma-separated")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic PDF")
+    parser.add_argument("--queries", type=int, default=200, help="Timed search queries per mode and size")
+    parser.add_argument("--n-results", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=10, help="Timed OnboardingCrew runs per pipeline mode")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated stub LLM latency per call")
+    parser.add_argument("--embeddings", choices=("stub", "model"), default="stub")
+    parser.add_argument("--vector-store", help="Override VECTOR_STORE for the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change flagged as a regression")
+    args = parser.parse_args()
+
+    sections = [section.strip() for section in args.sections.split(",") if section.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"Unknown sections: {', '.join(sorted(unknown))}")
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    if args.vector_store:
+        settings.vector_store = args.vector_store
+    # Measure real retrieval work, not the LRU caches
+    settings.search_cache_enabled = False
+    embedding_model = HashEmbeddingModel() if args.embeddings == "stub" else None
+
+    results = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "embeddings": args.embeddings,
+            "vector_store": settings.vector_store,
+            "pages_per_document": args.pages,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "ingest": [],
+        "search": [],
+        "crew": [],
+    }
+    queries = synthetic_queries(args.queries, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="onboardai-bench-") as workdir:
+        settings.outputs_directory = os.path.join(workdir, "outputs")
+        # Keep benchmark packages out of the real output store and its retention index
+        output_store.directory = settings.outputs_directory
+        output_store.index = OutputRetentionIndex(
+            path=os.path.join(workdir, "output_index.db"), directory=settings.outputs_directory
+        )
+        kb = None
+        for documents in sizes:
+            corpus_dir = os.path.join(workdir, f"corpus-{documents}")
+            generate_corpus(os.path.join(corpus_dir, "pdfs"), documents, args.pages, args.seed)
+            kb = WorkdayPDFKnowledgeBase(
+                os.path.join(corpus_dir, "pdfs"), os.path.join(corpus_dir, "db"), embedding_model
+            )
+            # Unlike search, ingestion is always needed to build the corpus
+            ingest = bench_ingest(kb, documents, args.pages)
+            if "ingest" in sections:
+                results["ingest"].append(ingest)
+                print(
+                    f"ingest  {documents:>5} docs  {ingest['pages']:>6} pages  {ingest['chunks']:>7} chunks  "
+                    f"{ingest['pages_per_s']:>8.1f} pages/s  {ingest['chunks_per_s']:>8.1f} chunks/s",
+                    file=sys.stderr
+                )
+            if "search" in sections:
+                for row in bench_search(kb, documents, queries, args.n_results):
+                    results["search"].append(row)
+                    print(
+                        f"search  {documents:>5} docs  {row['mode']:<7} p50 {row['p50_ms']:.2f} ms  "
+                        f"p95 {row['p95_ms']:.2f} ms  p99 {row['p99_ms']:.2f} ms",
+                        file=sys.stderr
+                    )
+
+        if "crew" in sections and kb is not None:
+            settings.persist_directory = kb.persist_directory
+            for row in bench_crew(kb, args.runs, args.llm_latency_ms / 1000):
+                results["crew"].append(row)
+                print(
+                    f"crew    {row['mode']:<7} cold {row['cold_overhead_ms']:.1f} ms  "
+                    f"overhead p50 {row['overhead_p50_ms']:.1f} ms  p95 {row['overhead_p95_ms']:.1f} ms",
+                    file=sys.stderr
+                )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare(baseline, results, args.threshold)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
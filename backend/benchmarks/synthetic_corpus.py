@@ -0,0 +1,131 @@
+"""
+Synthetic Workday-style policy PDFs for benchmarks.
+
+    python -m benchmarks.synthetic_corpus --output data/pdfs_synthetic --documents 20 --pages 30
+
+Pages are built from policy sentences that mention the terms the
+onboarding queries search for (California meal breaks, I-9, 2FA, ...)
+mixed with generic handbook filler, so both dense and keyword retrieval
+have something to find. Output is deterministic for a given seed.
+"""
+import argparse
+import os
+import random
+from typing import List
+
+TOPICS = [
+    "Code of Conduct", "information security", "data privacy", "workplace safety",
+    "benefits enrollment", "vacation policy", "compliance requirements",
+    "California labor law", "meal breaks", "home office stipend",
+    "Texas hybrid work requirements", "New York commuter benefits", "co-working spaces",
+    "GitHub access", "security training", "2FA requirements",
+    "CRM access", "customer data handling", "HR privacy training", "background checks",
+    "I-9 employment eligibility", "direct deposit", "paid time off", "expense reimbursement",
+]
+
+TEMPLATES = [
+    "Employees must review the {topic} guidelines within {days} days of their start date.",
+    "The {topic} policy applies to all full-time and part-time employees in every region.",
+    "Managers are responsible for confirming that new hires understand {topic} obligations.",
+    "Questions about {topic} should be directed to the People Operations team.",
+    "Failure to follow {topic} procedures may result in disciplinary action.",
+    "Section {section}: {topic} requirements are reviewed annually by the compliance office.",
+    "New hires complete {topic} acknowledgement in Workday before day {days}.",
+]
+
+FILLER = [
+    "Workday is committed to a respectful and inclusive workplace.",
+    "This handbook summarizes policies and does not create a contract of employment.",
+    "Policies may be updated from time to time and the latest version is published internally.",
+    "Employees are encouraged to raise concerns without fear of retaliation.",
+    "Local law takes precedence where it provides greater protection to employees.",
+]
+
+# Roughly a dense page of 10pt text
+PAGE_CHARS = 3000
+LINE_CHARS = 90
+
+
+def page_text(rng: random.Random, chars: int = PAGE_CHARS) -> str:
+    sentences = []
+    length = 0
+    while length < chars:
+        if rng.random() < 0.7:
+            sentence = rng.choice(TEMPLATES).format(
+                topic=rng.choice(TOPICS), days=rng.randint(1, 90), section=rng.randint(1, 40)
+            )
+        else:
+            sentence = rng.choice(FILLER)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: List[str]):
+    """Minimal text-only PDF: one Helvetica content stream per page."""
+    count = len(pages)
+    font_id = 3 + 2 * count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids [" + " ".join(f"{3 + 2 * i} 0 R" for i in range(count))
+            + f"] /Count {count} >>"
+        ).encode(),
+    ]
+    for i, text in enumerate(pages):
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        ).encode())
+        lines = [text[j:j + LINE_CHARS] for j in range(0, len(text), LINE_CHARS)]
+        stream = "\n".join(
+            ["BT /F1 9 Tf 36 770 Td 11 TL"] + [f"({_escape(line)}) Tj T*" for line in lines] + ["ET"]
+        ).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+
+
+def generate_corpus(directory: str, documents: int, pages: int, seed: int = 0) -> List[str]:
+    """Write `documents` PDFs of `pages` pages each; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for number in range(documents):
+        path = os.path.join(directory, f"synthetic-policy-{number:04d}.pdf")
+        write_pdf(path, [page_text(rng) for _ in range(pages)])
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic policy PDFs")
+    parser.add_argument("--output", required=True, help="Directory to write PDFs into")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20, help="Pages per document")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.output, args.documents, args.pages, args.seed)
+    print(f"Wrote {len(paths)} PDFs ({args.documents * args.pages} pages) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
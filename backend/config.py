@@ -25,7 +25,19 @@ class Settings(BaseSettings):
     openai_max_tokens: int = 1800
     openai_timeout: float = 30.0
     openai_max_retries: int = 2
+    # Global budgets shared by every thread and worker process (see LLM Rate Limiting)
     openai_max_rpm: int = 60
+    openai_max_tpm: int = 200000
+    # Point at any OpenAI-compatible server, e.g. the local stand-in:
+    # python -m benchmarks.fake_openai -> http://127.0.0.1:8100/v1
+    openai_base_url: str = ""
+    # Shared keep-alive connection pool for all LLM calls in the process
+    openai_max_connections: int = 20
+    openai_max_keepalive_connections: int = 10
+    openai_keepalive_expiry: float = 60.0
+    # USD per million tokens, for the LLM cost metric (gpt-4o-mini list prices)
+    openai_input_cost_per_1m: float = 0.15
+    openai_output_cost_per_1m: float = 0.60
     
     # CORS Configuration
     cors_origins: str = "http://localhost:5173,http://localhost:3000,http://127.0.0.1:5173"
@@ -35,12 +47,90 @@ class Settings(BaseSettings):
     persist_directory: str = "data/chroma_db"
     outputs_directory: str = "outputs"
     
+    # Load the embedding model and knowledge base at startup (gates /api/ready)
+    warmup_enabled: bool = True
+    
+    # Pipeline: "agent" runs the researcher LLM agent, "direct" feeds
+    # retrieved policy excerpts straight to the writer (one LLM call)
+    pipeline_mode: str = "agent"
+    
+    # Embeddings: "torch" (sentence-transformers) or "onnx-int8" (quantized
+    # ONNX Runtime; export once with `python -m tools.embeddings --export`)
+    embedding_backend: str = "torch"
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_onnx_dir: str = "data/models"
+    embedding_max_length: int = 256
+    embedding_threads: int = 0  # ONNX Runtime intra-op threads; 0 = runtime default
+    
+    # Vector Store
+    vector_store: str = "chroma"  # chroma | numpy (memory-mapped matrix under persist_directory)
+    vector_store_dtype: str = "float32"  # numpy store only: float32 | float16
+    
+    # Retrieval: "dense" (embeddings only) or "hybrid" (embeddings + BM25,
+    # fused with reciprocal rank fusion)
+    retrieval_mode: str = "hybrid"
+    retrieval_candidates: int = 20  # per-ranker candidates fed into fusion
+    rrf_k: int = 60
+    
+    # Ingestion pipeline
+    ingest_workers: int = 0  # PDF extraction processes; 0 = one per CPU core
+    ingest_pages_per_task: int = 25
+    ingest_embed_batch_size: int = 256
+    ingest_write_batch_size: int = 2048
+    ingest_queue_size: int = 8
+    
+    # Job Queue
+    max_concurrent_jobs: int = 2
+    job_queue_size: int = 20
+    job_retention_seconds: int = 3600
+    
+    # Batch Onboarding
+    batch_max_size: int = 200
+    batch_max_concurrency: int = 4
+    
+    # LLM Rate Limiting (token buckets in SQLite, shared across processes)
+    llm_rate_limit_enabled: bool = True
+    llm_rate_limit_path: str = "data/llm_rate_limit.db"
+    # Share of the burst batch calls must leave free for interactive ones
+    llm_rate_limit_batch_reserve: float = 0.25
+    # Interactive calls (and submissions) facing a longer wait are refused with 429 / Retry-After
+    llm_rate_limit_max_wait_seconds: float = 60.0
+    
+    # Research Brief Cache
+    research_cache_enabled: bool = True
+    research_cache_path: str = "data/research_cache.db"
+    research_cache_ttl_seconds: int = 86400
+    research_cache_max_entries: int = 256
+    
+    # LLM Response Cache (SQLite, shared by workers)
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "data/llm_cache.db"
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_max_bytes: int = 64 * 1024 * 1024
+    
+    # Knowledge Base Search Cache (in-process LRU)
+    search_cache_enabled: bool = True
+    search_cache_max_entries: int = 512
+    
     # File Management
     file_retention_days: int = 30
+    file_cleanup_interval_seconds: int = 600  # background cleanup period; 0 disables it
+    file_cleanup_batch_size: int = 500  # files deleted per batch; batches repeat until the backlog is drained
+    file_index_path: str = "data/output_index.db"
+    output_compress_level: int = 6  # gzip level for stored packages
+    
+    # Tracing: per-job span trees, appended to a rotating JSONL file
+    tracing_enabled: bool = True
+    trace_path: str = "logs/traces.jsonl"
+    trace_max_bytes: int = 10 * 1024 * 1024
+    trace_backup_count: int = 5
+    trace_memory_entries: int = 200  # recent traces served from memory
     
     # Logging
     log_level: str = "INFO"
-    log_format: str = "json"
+    log_format: str = "json"  # json | text
+    # Records buffered for the background log writer; overflow is dropped, not waited on
+    log_queue_size: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,31 +1,141 @@
 import os
 import json
+import time
 from datetime import datetime
 from crewai import Crew, Process
+from agents.llm_pool import agent_pool
 from agents.onboarding_agents import OnboardingAgents
 from tasks.onboarding_tasks import OnboardingTasks
+from tools.kb_version import read_kb_version
+from tools.knowledge_base import get_knowledge_base
 from backend.config import settings
 from backend.utils.logger import logger
-from backend.utils.exceptions import KnowledgeBaseError, ProcessingError
+from backend.utils.exceptions import KnowledgeBaseError, ProcessingError, ValidationError
+from backend.utils.metrics import crews_in_flight, stage_duration
+from backend.utils.output_store import output_store
+from backend.utils.progress import emit
+from backend.utils.research_cache import research_cache
+from backend.utils.tracing import span, start_span
+
+PIPELINE_MODES = ("agent", "direct")
+
+AGENT_FACTORIES = {
+    'researcher': OnboardingAgents.policy_researcher,
+    'writer': OnboardingAgents.onboarding_writer,
+}
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def split_sections(markdown: str):
+    """Split a markdown document into (title, body) pairs at each heading."""
+    sections = []
+    title, lines = "", []
+    for line in markdown.splitlines():
+        if line.lstrip().startswith('#'):
+            if title or any(l.strip() for l in lines):
+                sections.append((title, "\n".join(lines).strip()))
+            title, lines = line.strip().lstrip('#').strip(), []
+        else:
+            lines.append(line)
+    if title or any(l.strip() for l in lines):
+        sections.append((title, "\n".join(lines).strip()))
+    return sections
 
 
 class OnboardingCrew:
     """Main orchestrator for employee onboarding crew"""
     
-    def __init__(self, employee_profile):
+    def __init__(self, employee_profile, research_brief=None, use_cache=True, pipeline_mode=None):
+        setup_start = time.perf_counter()
         self.employee_profile = employee_profile
-        self.agents = self._create_agents()
-        self.tasks = self._create_tasks()
+        self.pipeline_mode = OnboardingCrew.resolve_pipeline_mode(pipeline_mode)
+        self.facets = OnboardingTasks.policy_facets(employee_profile)
+        self.use_cache = use_cache and settings.research_cache_enabled
+        self.kb_version = read_kb_version()
+        self.research_cached = False
+        
+        if research_brief is None and self.use_cache:
+            research_brief = research_cache.get(self._cache_facets(self.facets, self.pipeline_mode), self.kb_version)
+            self.research_cached = research_brief is not None
+            logger.info(
+                f"Research cache {'hit' if self.research_cached else 'miss'} for {'/'.join(self.facets)}"
+            )
+        
+        if research_brief is None and self.pipeline_mode == 'direct':
+            research_brief = OnboardingCrew.retrieve_policies(employee_profile)
+            if self.use_cache:
+                research_cache.put(
+                    self._cache_facets(self.facets, self.pipeline_mode), self.kb_version, research_brief
+                )
+        
+        self.research_brief = research_brief
+        # Per-request overhead before the first LLM call, reported in the
+        # "setup" progress event
+        self.timings = {"research_ms": _elapsed_ms(setup_start)}
+        
+        step_start = time.perf_counter()
+        self.agents_reused = 0
+        self._pooled_agents = {}
+        try:
+            self.agents = self._create_agents()
+            self.timings["agents_ms"] = _elapsed_ms(step_start)
+            
+            step_start = time.perf_counter()
+            self.tasks = self._create_tasks()
+            self.timings["tasks_ms"] = _elapsed_ms(step_start)
+        except BaseException:
+            # run() will never be called, so nothing else would return them
+            self._release_agents()
+            raise
+        self._stage_started = None
+        # perf_counter marks for the agent_step and task trace spans
+        self._step_started = None
+        self._task_started = None
+    
+    @staticmethod
+    def resolve_pipeline_mode(pipeline_mode=None):
+        """Validate a requested pipeline mode, defaulting to settings.pipeline_mode"""
+        mode = pipeline_mode or settings.pipeline_mode
+        if mode not in PIPELINE_MODES:
+            raise ValidationError(
+                f"Unknown pipeline mode '{mode}'. Expected one of: {', '.join(PIPELINE_MODES)}"
+            )
+        return mode
+    
+    @staticmethod
+    def _cache_facets(facets, pipeline_mode):
+        """Agent briefs and raw retrieved excerpts are cached separately"""
+        return (*facets, pipeline_mode)
     
     def _create_agents(self):
-        """Initialize all specialized agents"""
-        return {
-            'researcher': OnboardingAgents.policy_researcher(),
-            'writer': OnboardingAgents.onboarding_writer()
-        }
+        """Check out agents from the shared pool (no researcher when a brief is supplied)"""
+        roles = (['researcher'] if self.research_brief is None else []) + ['writer']
+        agents = {}
+        for role in roles:
+            agents[role], reused = agent_pool.acquire(role, AGENT_FACTORIES[role])
+            # Tracked as soon as it is checked out so a failure later in setup can return it
+            self._pooled_agents[role] = agents[role]
+            self.agents_reused += reused
+        return agents
+    
+    def _release_agents(self):
+        """Return this crew's agents to the pool; safe to call more than once"""
+        while self._pooled_agents:
+            role, agent = self._pooled_agents.popitem()
+            agent_pool.release(role, agent)
     
     def _create_tasks(self):
         """Initialize all tasks with context passing"""
+        if self.research_brief is not None:
+            return [OnboardingTasks.create_onboarding_package(
+                agent=self.agents['writer'],
+                employee_profile=self.employee_profile,
+                research_brief=self.research_brief
+            )]
+        
         research_task = OnboardingTasks.research_policies(
             agent=self.agents['researcher'],
             employee_profile=self.employee_profile
@@ -39,30 +149,185 @@ class OnboardingCrew:
         
         return [research_task, writing_task]
     
+    @staticmethod
+    def retrieve_policies(employee_profile):
+        """
+        Deterministic research: run the profile's search queries directly
+        against the knowledge base and pack the excerpts into a brief.
+        No LLM call is made.
+        """
+        queries = OnboardingTasks.search_queries(employee_profile)
+        start = time.perf_counter()
+        try:
+            excerpts = get_knowledge_base().search_many(queries, n_results=3)
+        except Exception as e:
+            logger.error(f"Policy retrieval failed for {queries}: {str(e)}", exc_info=True)
+            raise KnowledgeBaseError(f"Failed to search policies: {str(e)}") from e
+        elapsed = time.perf_counter() - start
+        stage_duration.observe(elapsed, stage="search")
+        emit(
+            "tool_call",
+            tool="direct_retrieval",
+            query=queries,
+            latency_ms=round(elapsed * 1000, 1)
+        )
+        
+        searches = "\n".join(f"- {query}" for query in queries)
+        return f"Relevant Workday policy excerpts for:\n{searches}\n\n{excerpts.strip()}"
+    
+    @staticmethod
+    def research(employee_profile, use_cache=True, pipeline_mode=None):
+        """
+        Produce a policy brief without writing a package.
+        In 'agent' mode the policy researcher writes it; in 'direct' mode the
+        retrieved excerpts are the brief. The brief can be handed to
+        OnboardingCrew(..., research_brief=...) for every employee with the
+        same policy facets.
+        """
+        pipeline_mode = OnboardingCrew.resolve_pipeline_mode(pipeline_mode)
+        use_cache = use_cache and settings.research_cache_enabled
+        facets = OnboardingCrew._cache_facets(OnboardingTasks.policy_facets(employee_profile), pipeline_mode)
+        kb_version = read_kb_version()
+        
+        if use_cache:
+            cached_brief = research_cache.get(facets, kb_version)
+            if cached_brief is not None:
+                return cached_brief
+        
+        if pipeline_mode == 'direct':
+            brief = OnboardingCrew.retrieve_policies(employee_profile)
+        else:
+            brief = OnboardingCrew._run_researcher(employee_profile)
+        
+        if use_cache:
+            research_cache.put(facets, kb_version, brief)
+        return brief
+    
+    @staticmethod
+    def _run_researcher(employee_profile):
+        """Run a researcher-only crew and return its brief"""
+        researcher, _ = agent_pool.acquire('researcher', AGENT_FACTORIES['researcher'])
+        try:
+            research_task = OnboardingTasks.research_policies(
+                agent=researcher,
+                employee_profile=employee_profile
+            )
+            crew = Crew(
+                agents=[researcher],
+                tasks=[research_task],
+                process=Process.sequential,
+                verbose=False,
+                memory=False,
+                cache=True,
+                # Per-crew cap on top of the budget OnboardingLLM shares across workers
+                max_rpm=settings.openai_max_rpm
+            )
+            with crews_in_flight.track_in_progress(), stage_duration.time(stage="researcher"), \
+                    span("crew", agents=1, tasks=1):
+                return crew.kickoff().raw
+        except Exception as e:
+            logger.error(f"Error during policy research: {str(e)}", exc_info=True)
+            raise ProcessingError(f"Failed to research policies: {str(e)}") from e
+        finally:
+            agent_pool.release('researcher', researcher)
+    
+    def _step_callback(self, step):
+        """Forward each agent step (thought, tool use, answer) to the progress stream and trace"""
+        text = getattr(step, 'text', None) or getattr(step, 'output', None) or str(step)
+        now = time.perf_counter()
+        # A step covers everything since the previous one: LLM call plus tool run
+        start_span(
+            "agent_step",
+            start=self._step_started or now,
+            tool=getattr(step, 'tool', None),
+            tool_input_chars=len(str(getattr(step, 'tool_input', None) or '')),
+            output_chars=len(str(text))
+        ).end()
+        self._step_started = now
+        emit("agent_step", output=str(text)[:500])
+    
+    def _task_callback(self, output):
+        """Mark stage transitions and publish the writer's sections as they land"""
+        now = datetime.now()
+        duration = (now - self._stage_started).total_seconds() if self._stage_started else None
+        self._stage_started = now
+        task_span = start_span("task", start=self._task_started, output_chars=len(output.raw or ""))
+        self._task_started = self._step_started = time.perf_counter()
+        
+        if 'researcher' in self.agents and output.agent == self.agents['researcher'].role:
+            stage = "researcher"
+            emit("stage", stage="researcher", status="completed", duration_s=duration)
+            emit("stage", stage="writer", status="started")
+        else:
+            stage = "writer"
+            for title, body in split_sections(output.raw or ""):
+                emit("section", title=title, content=body)
+            emit("stage", stage="writer", status="completed", duration_s=duration)
+        if duration is not None:
+            stage_duration.observe(duration, stage=stage)
+        task_span.set(stage=stage)
+        task_span.end()
+    
     def run(self):
         """Execute the onboarding crew workflow"""
-        os.makedirs(settings.outputs_directory, exist_ok=True)
-        
         logger.info(f"Starting onboarding for {self.employee_profile.get('name', 'Unknown')}")
         
-        crew = Crew(
-            agents=[self.agents['researcher'], self.agents['writer']],
-            tasks=self.tasks,
-            process=Process.sequential,
-            verbose=False,
-            memory=False,
-            cache=True,
-            max_rpm=settings.openai_max_rpm,
-            step_callback=None
-        )
+        try:
+            step_start = time.perf_counter()
+            crew = Crew(
+                agents=list(self.agents.values()),
+                tasks=self.tasks,
+                process=Process.sequential,
+                verbose=False,
+                memory=False,
+                cache=True,
+                max_rpm=settings.openai_max_rpm,
+                step_callback=self._step_callback,
+                task_callback=self._task_callback
+            )
+            self.timings["crew_ms"] = _elapsed_ms(step_start)
+            emit(
+                "setup",
+                **self.timings,
+                agents_reused=self.agents_reused,
+                agents_built=len(self.agents) - self.agents_reused
+            )
+            logger.info(
+                "Request setup: " + ", ".join(f"{name} {value}" for name, value in self.timings.items())
+                + f" ({self.agents_reused}/{len(self.agents)} agents reused)"
+            )
         
-        start_time = datetime.now()
+            start_time = datetime.now()
+            self._stage_started = start_time
+            self._task_started = self._step_started = time.perf_counter()
+            if 'researcher' in self.agents:
+                emit("stage", stage="researcher", status="started")
+            else:
+                emit(
+                    "stage",
+                    stage="researcher",
+                    status="skipped",
+                    cached=self.research_cached,
+                    pipeline_mode=self.pipeline_mode
+                )
+                emit("stage", stage="writer", status="started")
         
-        try:
-            result = crew.kickoff()
+            with crews_in_flight.track_in_progress(), span("crew", agents=len(self.agents), tasks=len(self.tasks)):
+                result = crew.kickoff()
             end_time = datetime.now()
             execution_time = (end_time - start_time).total_seconds()
             
+            if 'researcher' in self.agents and self.use_cache:
+                research_cache.put(
+                    self._cache_facets(self.facets, self.pipeline_mode), self.kb_version, self.tasks[0].output.raw
+                )
+            
+            # The writer's final answer is the package; keep it in memory and
+            # store a content-addressed copy for download
+            package_content = result.raw or ""
+            with span("store_output", chars=len(package_content)) as store_span:
+                stored = output_store.put(package_content)
+                store_span.set(stored_bytes=stored.stored_size)
             output_file = f"{self.employee_profile['name'].replace(' ', '_')}_onboarding_package.md"
             
             logger.info(f"Onboarding completed in {execution_time:.2f}s for {self.employee_profile.get('name')}")
@@ -70,12 +335,19 @@ class OnboardingCrew:
             return {
                 'result': result,
                 'execution_time': execution_time,
-                'output_file': output_file
+                'output_id': stored.output_id,
+                'output_file': output_file,
+                'package_content': package_content,
+                'research_cached': self.research_cached,
+                'pipeline_mode': self.pipeline_mode,
+                'setup_timings': dict(self.timings)
             }
             
         except Exception as e:
             logger.error(f"Error during onboarding: {str(e)}", exc_info=True)
             raise ProcessingError(f"Failed to create onboarding package: {str(e)}") from e
+        finally:
+            self._release_agents()
 
 def main():
     """Main entry point - run onboarding for test employee"""
@@ -115,7 +387,7 @@ def main():
     logger.info("EXECUTION SUMMARY")
     logger.info("="*70)
     logger.info(f"Successfully created onboarding package for {employee['name']}")
-    logger.info(f"Check the {settings.outputs_directory}/ folder for the complete onboarding package")
+    logger.info(f"Package stored as {result['output_id']} in {output_store.directory}/ (GET /api/output/{result['output_id']})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
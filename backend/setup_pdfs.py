@@ -1,11 +1,13 @@
 import os
 import shutil
+import argparse
 from tools.pdf_knowledge_base import WorkdayPDFKnowledgeBase
 
-def setup():
+def setup(force: bool = False):
     """
-    One-time setup script to process Workday PDFs.
-    Run this after adding PDF files to data/pdfs/
+    Setup script to process Workday PDFs.
+    Run this after adding, changing or removing PDF files in data/pdfs/;
+    only the files that changed are re-processed.
     """
     print("="*60)
     print("WORKDAY PDF KNOWLEDGE BASE SETUP")
@@ -33,7 +35,17 @@ def setup():
     # Process PDFs
     print("\nProcessing PDFs and creating knowledge base...")
     kb = WorkdayPDFKnowledgeBase()
-    kb.ingest_pdfs()
+    summary = kb.ingest_pdfs(force=force)
+    
+    elapsed = max(summary['seconds'], 1e-9)
+    print(
+        f"\n   {summary['added']} added, {summary['updated']} updated, "
+        f"{summary['unchanged']} unchanged, {summary['removed']} removed, {summary['failed']} failed"
+    )
+    print(
+        f"   {summary['pages']} pages, {summary['chunks']} chunks in {summary['seconds']:.2f}s "
+        f"({summary['pages'] / elapsed:.1f} pages/s, {summary['chunks'] / elapsed:.1f} chunks/s)"
+    )
     
     print("\n" + "="*60)
     print("✅ SETUP COMPLETE!")
@@ -42,4 +54,7 @@ def setup():
     print("The agents will use real Workday policy content!\n")
 
 if __name__ == "__main__":
-    setup()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build or update the Workday policy knowledge base")
+    parser.add_argument("--force", action="store_true", help="Re-process every PDF, even unchanged ones")
+    args = parser.parse_args()
+    setup(force=args.force)
\ No newline at end of file
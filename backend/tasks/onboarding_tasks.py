@@ -5,14 +5,41 @@ class OnboardingTasks:
     """Factory class for creating onboarding workflow tasks"""
     
     @staticmethod
-    def research_policies(agent, employee_profile):
+    def policy_facets(employee_profile):
         """
-        Research all relevant Workday policies for this specific employee.
-        Returns a comprehensive policy brief with compliance requirements.
+        Normalize a profile to the (location, department, work arrangement)
+        buckets that determine which policies are researched.
+        Employees sharing facets share the same research.
         """
         location = employee_profile['location']
         department = employee_profile['department']
-        work_arrangement = employee_profile['work_arrangement']
+        
+        if 'California' in location or 'CA' in location:
+            location_bucket = 'CA'
+        elif 'Texas' in location or 'TX' in location:
+            location_bucket = 'TX'
+        elif 'New York' in location or 'NY' in location:
+            location_bucket = 'NY'
+        else:
+            location_bucket = 'OTHER'
+        
+        if 'Engineering' in department:
+            department_bucket = 'Engineering'
+        elif 'Sales' in department:
+            department_bucket = 'Sales'
+        elif 'HR' in department:
+            department_bucket = 'HR'
+        else:
+            department_bucket = 'OTHER'
+        
+        work_arrangement = employee_profile['work_arrangement'].strip().lower()
+        
+        return location_bucket, department_bucket, work_arrangement
+    
+    @staticmethod
+    def search_queries(employee_profile):
+        """Policy search queries for a profile (at most 2)."""
+        location, department, _ = OnboardingTasks.policy_facets(employee_profile)
         
         search_queries = []
         
@@ -20,31 +47,42 @@ class OnboardingTasks:
         search_queries.append(universal_query)
         
         specific_query_parts = []
-        if 'California' in location or 'CA' in location:
+        if location == 'CA':
             specific_query_parts.append("California labor law, meal breaks, home office stipend")
-        elif 'Texas' in location or 'TX' in location:
+        elif location == 'TX':
             specific_query_parts.append("Texas hybrid work requirements")
-        elif 'New York' in location or 'NY' in location:
+        elif location == 'NY':
             specific_query_parts.append("New York commuter benefits, co-working spaces")
         
-        if 'Engineering' in department:
+        if department == 'Engineering':
             specific_query_parts.append("Engineering GitHub access, security training, 2FA requirements")
-        elif 'Sales' in department:
+        elif department == 'Sales':
             specific_query_parts.append("Sales CRM access, customer data handling")
-        elif 'HR' in department:
+        elif department == 'HR':
             specific_query_parts.append("HR privacy training, background checks")
         
         if specific_query_parts:
             search_queries.append(", ".join(specific_query_parts))
         
-        queries_text = "\n".join([f"- {q}" for q in search_queries[:2]])
+        return search_queries[:2]
+    
+    @staticmethod
+    def research_policies(agent, employee_profile):
+        """
+        Research all relevant Workday policies for this employee's department
+        and location. The prompt leaves out name and role so that colleagues
+        with the same department and location send an identical prompt and
+        can be served from the LLM response cache.
+        """
+        search_queries = OnboardingTasks.search_queries(employee_profile)
+        queries_text = "\n".join([f"- {q}" for q in search_queries])
         
         return Task(
             description=dedent(f"""
-                Research Workday policies for {employee_profile['name']} ({employee_profile['role']}, 
-                {employee_profile['department']}, {employee_profile['location']}).
+                Research Workday policies for a new hire in {employee_profile['department']}, 
+                {employee_profile['location']}.
                 
-                **Make 1-2 searches maximum:**
+                **Make one search, passing these queries together as a list:**
                 {queries_text}
                 
                 **Output:** Brief policy summary with:
@@ -65,13 +103,14 @@ class OnboardingTasks:
         )
     
     @staticmethod
-    def create_onboarding_package(agent, employee_profile):
+    def create_onboarding_package(agent, employee_profile, research_brief=None):
         """
         Task 2: Create personalized onboarding materials from research.
         Output: Welcome email, checklists, policy summaries.
+        When research_brief is given it is embedded directly instead of
+        arriving through the research task's context.
         """
-        return Task(
-            description=dedent(f"""
+        description = dedent(f"""
                 Create onboarding package for {employee_profile['name']} ({employee_profile['role']}, 
                 {employee_profile['department']}, {employee_profile['location']}, starts {employee_profile['start_date']}).
                 
@@ -84,11 +123,17 @@ class OnboardingTasks:
                 
                 **Tone:** Warm, professional, actionable. Emphasize benefits enrollment 30-day deadline.
                 
-                Save to: outputs/{employee_profile['name'].replace(' ', '_')}_onboarding_package.md
-            """),
-            expected_output=dedent(f"""
-                Onboarding package with welcome email, Day 1/week 1/30-day checklists, and policy summaries.
-                Saved to: outputs/{employee_profile['name'].replace(' ', '_')}_onboarding_package.md
+                Return the complete package as Markdown in your final answer; do not save it to a file.
+            """)
+        
+        if research_brief:
+            description += f"\n**Policy research brief:**\n{research_brief}\n"
+        
+        return Task(
+            description=description,
+            expected_output=dedent("""
+                The full onboarding package in Markdown: welcome email, Day 1/week 1/30-day
+                checklists, and policy summaries.
             """),
             agent=agent,
             context=[],
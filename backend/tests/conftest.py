@@ -0,0 +1,13 @@
+"""Shared test setup: the import paths and environment the backend expects when run from backend/."""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.dirname(BACKEND_DIR), BACKEND_DIR]
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+# Keeps crewAI from offering its first-run trace viewer prompt
+os.environ.setdefault("CREWAI_TESTING", "true")
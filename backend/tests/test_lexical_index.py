@@ -0,0 +1,170 @@
+"""BM25Index: tokenization, CSR postings, tombstones and the .npz round-trip."""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from tools.lexical_index import BM25Index, tokenize
+
+DOCUMENTS = {
+    "pto-1": ("Paid time-off accrues every pay period for full-time employees.", "pto.pdf"),
+    "i9-1": ("Complete the I-9 form and verify employment eligibility.", "i9.pdf"),
+    "sec-1": ("Enable 2FA on every account; 2FA is required for engineers.", "security.pdf"),
+    "sec-2": ("Report lost devices to security within one day.", "security.pdf"),
+    "meal-1": ("California employees take a meal break after five hours.", "california.pdf"),
+}
+
+
+def build(path, documents=DOCUMENTS) -> BM25Index:
+    index = BM25Index(str(path))
+    index.add(
+        ids=list(documents),
+        documents=[text for text, _ in documents.values()],
+        metadatas=[{"source": source} for _, source in documents.values()],
+    )
+    return index
+
+
+def reference_scores(index, query: str, documents: dict) -> dict:
+    """Okapi BM25 computed directly from the texts, for comparison."""
+    counts = {chunk_id: Counter(tokenize(text)) for chunk_id, (text, _) in documents.items()}
+    avg_len = sum(sum(c.values()) for c in counts.values()) / len(counts)
+    scores = {}
+    for chunk_id, tf in counts.items():
+        length = sum(tf.values())
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(1 for c in counts.values() if term in c)
+            if not tf[term]:
+                continue
+            idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+            norm = index.k1 * (1 - index.b + index.b * length / avg_len)
+            score += idf * tf[term] * (index.k1 + 1) / (tf[term] + norm)
+        if score:
+            scores[chunk_id] = score
+    return scores
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "bm25_index.npz"
+
+
+def test_tokenize_keeps_hyphenated_terms_whole_and_split():
+    assert tokenize("Complete the I-9 and time-off forms") == [
+        "complete", "the", "i-9", "and", "time-off", "time", "off", "forms"
+    ]
+    # Single-character parts are not indexed on their own
+    assert "i" not in tokenize("I-9")
+    assert tokenize("Employee's 2FA") == ["employee's", "2fa"]
+
+
+def test_postings_list_the_rows_containing_each_term(index_path):
+    index = build(index_path)
+    index.persist()
+
+    ids = list(DOCUMENTS)
+    for term, tid in index._term_ids.items():
+        start, end = index._offsets[tid], index._offsets[tid + 1]
+        rows = index._post_rows[start:end]
+        expected = [row for row, chunk_id in enumerate(ids) if term in tokenize(DOCUMENTS[chunk_id][0])]
+        assert sorted(rows.tolist()) == expected
+        for row, tf in zip(rows, index._post_tf[start:end]):
+            assert tf == tokenize(DOCUMENTS[ids[row]][0]).count(term)
+    assert index._offsets[-1] == len(index._post_rows) == len(index._post_tf)
+    assert index._post_rows.dtype == np.int32 and index._post_tf.dtype == np.uint16
+
+
+def test_search_matches_reference_bm25(index_path):
+    index = build(index_path)
+
+    for query in ("2FA requirements", "I-9", "time employees", "meal breaks"):
+        expected = reference_scores(index, query, DOCUMENTS)
+        results = dict(index.search([query], n_results=10)[0])
+        assert results.keys() == expected.keys()
+        for chunk_id, score in expected.items():
+            assert results[chunk_id] == pytest.approx(score, rel=1e-5)
+
+    assert index.search(["I-9"], n_results=1)[0][0][0] == "i9-1"
+    assert index.search(["vacation"], n_results=3) == [[]]
+
+
+def test_index_round_trips_through_the_npz_file(index_path):
+    index = build(index_path)
+    index.persist()
+
+    reloaded = BM25Index(str(index_path))
+    assert reloaded.exists()
+    assert len(reloaded) == len(index) == 5
+    assert sorted(reloaded.ids()) == sorted(DOCUMENTS)
+    for term in ("2fa", "employees", "i-9", "unseen"):
+        assert reloaded.idf(term) == index.idf(term)
+    queries = ["2FA", "full-time employees", "security devices"]
+    assert reloaded.search(queries, n_results=3) == index.search(queries, n_results=3)
+
+
+def test_other_instances_reload_after_persist(index_path):
+    index = build(index_path)
+    index.persist()
+    reader = BM25Index(str(index_path))
+
+    index.add(ids=["hol-1"], documents=["Company holidays are listed yearly."],
+              metadatas=[{"source": "holidays.pdf"}])
+    assert len(reader) == 5
+
+    index.persist()
+    assert len(reader) == 6
+    assert reader.search(["holidays"], n_results=1)[0][0][0] == "hol-1"
+
+
+def test_replaced_and_deleted_documents_are_tombstoned(index_path):
+    index = build(index_path)
+    index.persist()
+
+    index.add(ids=["meal-1"], documents=["Meal periods are unpaid."], metadatas=[{"source": "california.pdf"}])
+    index.persist()
+
+    # One dead row of six stays in place, excluded from scores and document frequencies
+    assert len(index._live) == 6 and not index._live[4]
+    assert len(index) == 5
+    assert index.search(["california"], n_results=5) == [[]]
+    assert [chunk_id for chunk_id, _ in index.search(["meal"], n_results=5)[0]] == ["meal-1"]
+    remaining = dict(DOCUMENTS, **{"meal-1": ("Meal periods are unpaid.", "california.pdf")})
+    assert index.idf("employees") == pytest.approx(
+        math.log(1 + (5 - 1 + 0.5) / (1 + 0.5))
+    )
+    results = dict(index.search(["meal employees"], n_results=5)[0])
+    for chunk_id, score in reference_scores(index, "meal employees", remaining).items():
+        assert results[chunk_id] == pytest.approx(score, rel=1e-5)
+
+
+def test_delete_source_compacts_past_the_ratio(index_path):
+    index = build(index_path)
+    index.persist()
+
+    index.delete_source("security.pdf")
+    index.persist()
+
+    # Two dead rows of five reach the ratio: survivors are renumbered
+    assert index._ids == ["pto-1", "i9-1", "meal-1"]
+    assert index._live.all()
+    assert int(index._post_rows.max()) == 2
+    # Terms stay in the vocabulary with empty posting lists
+    tid = index._term_ids["2fa"]
+    assert index._offsets[tid] == index._offsets[tid + 1]
+
+    reloaded = BM25Index(str(index_path))
+    assert reloaded.search(["2FA"], n_results=5) == [[]]
+    assert reloaded.search(["I-9 employees"], n_results=5) == index.search(["I-9 employees"], n_results=5)
+
+
+def test_pending_duplicate_is_replaced_before_merge(index_path):
+    index = BM25Index(str(index_path))
+    index.add(ids=["a"], documents=["relocation stipend"], metadatas=[{"source": "x.pdf"}])
+    index.add(ids=["a"], documents=["parking permit"], metadatas=[{"source": "x.pdf"}])
+
+    assert len(index) == 1
+    assert index.search(["relocation"], n_results=1) == [[]]
+    assert index.search(["parking"], n_results=1)[0][0][0] == "a"
+    assert index._total_len == 2
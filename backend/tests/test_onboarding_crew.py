@@ -0,0 +1,67 @@
+"""OnboardingCrew setup returns pooled agents when it fails."""
+import pytest
+
+pytest.importorskip("crewai")
+
+import main  # noqa: E402
+from agents.llm_pool import AgentPool  # noqa: E402
+from backend.utils.exceptions import ProcessingError  # noqa: E402
+
+PROFILE = {
+    "name": "Jordan Lee",
+    "role": "Software Engineer",
+    "department": "Engineering",
+    "location": "California",
+    "work_arrangement": "remote",
+    "employment_type": "full_time",
+    "start_date": "2025-12-01",
+}
+
+
+class FakeAgent:
+    role = "fake"
+    crew = None
+    step_callback = None
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = AgentPool()
+    monkeypatch.setattr(main, "agent_pool", pool)
+    monkeypatch.setattr(main, "AGENT_FACTORIES", {"researcher": FakeAgent, "writer": FakeAgent})
+    return pool
+
+
+def idle(pool: AgentPool) -> int:
+    return sum(len(agents) for agents in pool._idle.values())
+
+
+def test_agents_are_released_when_task_setup_fails(pool, monkeypatch):
+    def broken_tasks(self):
+        raise RuntimeError("task setup failed")
+
+    monkeypatch.setattr(main.OnboardingCrew, "_create_tasks", broken_tasks)
+
+    with pytest.raises(RuntimeError):
+        main.OnboardingCrew(PROFILE, research_brief=None, use_cache=False, pipeline_mode="agent")
+
+    assert pool.built == 2
+    assert idle(pool) == 2
+
+
+def test_agents_are_released_when_crew_construction_fails(pool, monkeypatch):
+    monkeypatch.setattr(main.OnboardingCrew, "_create_tasks", lambda self: [])
+
+    def broken_crew(**kwargs):
+        raise ValueError("invalid crew")
+
+    monkeypatch.setattr(main, "Crew", broken_crew)
+    crew = main.OnboardingCrew(PROFILE, research_brief=None, use_cache=False, pipeline_mode="agent")
+
+    with pytest.raises(ProcessingError):
+        crew.run()
+    assert idle(pool) == 2
+
+    with pytest.raises(ProcessingError):
+        main.OnboardingCrew._run_researcher(PROFILE)
+    assert idle(pool) == 2
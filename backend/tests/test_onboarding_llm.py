@@ -0,0 +1,200 @@
+"""OnboardingLLM driven through real crewAI agents, against a mocked OpenAI endpoint."""
+import json
+import httpx
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai import Agent, Crew, Task  # noqa: E402
+import agents.onboarding_agents as onboarding_agents  # noqa: E402
+from agents.llm_pool import get_http_client  # noqa: E402
+from agents.onboarding_agents import OnboardingLLM, _estimate_tokens, get_llm  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.utils.llm_cache import LLMResponseCache  # noqa: E402
+from backend.utils.metrics import llm_cost, llm_requests, llm_tokens  # noqa: E402
+from backend.utils.progress import publishing_to  # noqa: E402
+from backend.utils.rate_limit import SharedRateLimiter  # noqa: E402
+from backend.utils.tracing import tracing  # noqa: E402
+
+ANSWER = "Thought: I know the answer\nFinal Answer: Welcome aboard!"
+USAGE = {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150}
+
+
+class FakeOpenAI:
+    """httpx transport answering every chat completion with ANSWER."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        if body.get("stream"):
+            return self._stream(body)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": ANSWER},
+                "finish_reason": "stop",
+            }],
+            "usage": USAGE,
+        })
+
+    @staticmethod
+    def _stream(body) -> httpx.Response:
+        def chunk(choices, **extra):
+            payload = {"id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0,
+                       "model": body["model"], "choices": choices, **extra}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        words = ANSWER.split(" ")
+        pieces = [word + " " for word in words[:-1]] + words[-1:]
+        events = [chunk([{"index": 0, "delta": {"content": piece}, "finish_reason": None}]) for piece in pieces]
+        events.append(chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            events.append(chunk([], usage=USAGE))
+        events.append("data: [DONE]\n\n")
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content="".join(events).encode())
+
+
+def metric_value(metric, **labels) -> float:
+    return metric._values.get(metric._key(labels), 0)
+
+
+def make_llm(server: FakeOpenAI, **kwargs) -> OnboardingLLM:
+    return OnboardingLLM(
+        model="gpt-4o-mini",
+        api_key="test-key",
+        max_tokens=200,
+        http_client=httpx.Client(transport=httpx.MockTransport(server)),
+        **kwargs
+    )
+
+
+def run_agent(llm: OnboardingLLM) -> str:
+    agent = Agent(
+        role="Greeter",
+        goal="Welcome new employees",
+        backstory="You welcome new employees.",
+        llm=llm,
+        allow_delegation=False,
+        max_iter=1
+    )
+    # crewAI keeps BaseLLM instances as they are instead of rebuilding them
+    assert agent.llm is llm
+    task = Task(description="Welcome the new hire.", expected_output="A greeting", agent=agent)
+    return Crew(agents=[agent], tasks=[task]).kickoff().raw
+
+
+def test_agent_calls_draw_from_shared_rate_limiter(tmp_path):
+    limiter = SharedRateLimiter(path=str(tmp_path / "rate.db"), requests_per_minute=600, tokens_per_minute=600000)
+    acquired, refunded = [], []
+    take, refund = limiter.acquire, limiter.refund_tokens
+    limiter.acquire = lambda **kwargs: acquired.append(kwargs) or take(**kwargs)
+    limiter.refund_tokens = lambda tokens: refunded.append(tokens) or refund(tokens)
+    server = FakeOpenAI()
+
+    assert run_agent(make_llm(server, limiter=limiter)) == "Welcome aboard!"
+
+    assert len(server.requests) == 1
+    assert limiter.stats()["acquired"]["interactive"] == 1
+    prompt_chars = sum(len(message["content"]) for message in server.requests[0]["messages"])
+    assert acquired == [{"tokens": _estimate_tokens(prompt_chars)}]
+    # The up-front estimate is settled against the usage the API reported
+    assert refunded == [_estimate_tokens(prompt_chars) - USAGE["total_tokens"]]
+
+
+def test_repeated_requests_are_answered_from_the_llm_cache(tmp_path):
+    limiter = SharedRateLimiter(path=str(tmp_path / "rate.db"), requests_per_minute=600, tokens_per_minute=600000)
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"))
+    server = FakeOpenAI()
+    llm = make_llm(server, limiter=limiter, cache=cache)
+
+    assert run_agent(llm) == "Welcome aboard!"
+    assert run_agent(llm) == "Welcome aboard!"
+
+    # The replay neither reaches the API nor draws from the budget
+    assert len(server.requests) == 1
+    assert limiter.stats()["acquired"]["interactive"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_llm_calls_are_recorded_in_metrics(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"))
+    llm = make_llm(FakeOpenAI(), cache=cache)
+    model = llm.model
+    before = {
+        "api": metric_value(llm_requests, model=model, source="api"),
+        "cache": metric_value(llm_requests, model=model, source="cache"),
+        "prompt": metric_value(llm_tokens, model=model, kind="prompt"),
+        "completion": metric_value(llm_tokens, model=model, kind="completion"),
+        "cost": metric_value(llm_cost, model=model),
+    }
+
+    run_agent(llm)
+    run_agent(llm)
+
+    assert metric_value(llm_requests, model=model, source="api") - before["api"] == 1
+    assert metric_value(llm_requests, model=model, source="cache") - before["cache"] == 1
+    assert metric_value(llm_tokens, model=model, kind="prompt") - before["prompt"] == USAGE["prompt_tokens"]
+    assert metric_value(llm_tokens, model=model, kind="completion") - before["completion"] == USAGE["completion_tokens"]
+    assert metric_value(llm_cost, model=model) > before["cost"]
+
+
+def test_llm_calls_get_a_span_in_the_job_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(settings, "trace_path", str(tmp_path / "traces.jsonl"))
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"))
+    llm = make_llm(FakeOpenAI(), cache=cache)
+
+    with tracing("job-1", "job") as trace:
+        run_agent(llm)
+        run_agent(llm)
+
+    spans = [span for span in trace.to_dict()["spans"] if span["name"] == "llm"]
+    assert [span["attributes"]["cached"] for span in spans] == [False, True]
+    assert spans[0]["attributes"]["prompt_tokens"] == USAGE["prompt_tokens"]
+    assert spans[0]["attributes"]["completion_tokens"] == USAGE["completion_tokens"]
+    assert spans[0]["attributes"]["response_chars"] == len(ANSWER)
+    assert all(span["duration_ms"] is not None for span in spans)
+
+
+def test_streamed_tokens_reach_the_job_progress_stream(tmp_path):
+    limiter = SharedRateLimiter(path=str(tmp_path / "rate.db"), requests_per_minute=600, tokens_per_minute=600000)
+    refunded = []
+    refund = limiter.refund_tokens
+    limiter.refund_tokens = lambda tokens: refunded.append(tokens) or refund(tokens)
+    server = FakeOpenAI()
+    events = []
+
+    with publishing_to(lambda event, data: events.append((event, data))):
+        assert run_agent(make_llm(server, stream=True, limiter=limiter)) == "Welcome aboard!"
+
+    assert server.requests[0]["stream"] is True
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert "".join(tokens) == ANSWER
+    # Usage from the final chunk settles the rate limiter charge
+    assert len(refunded) == 1
+
+
+def test_shared_llm_sends_requests_through_the_pooled_http_client(monkeypatch):
+    monkeypatch.setattr(onboarding_agents, "_llm", None)
+
+    llm = get_llm()
+
+    assert isinstance(llm, OnboardingLLM)
+    assert llm.client._client is get_http_client()
+
+
+def test_shared_llm_targets_the_configured_base_url(monkeypatch):
+    monkeypatch.setattr(onboarding_agents, "_llm", None)
+    monkeypatch.setattr(settings, "openai_base_url", "http://127.0.0.1:8100/v1")
+
+    llm = get_llm()
+
+    assert str(llm.client.base_url) == "http://127.0.0.1:8100/v1/"
+    assert llm.base_url == "http://127.0.0.1:8100/v1"
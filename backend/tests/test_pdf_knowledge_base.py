@@ -0,0 +1,66 @@
+"""WorkdayPDFKnowledgeBase ingestion: the manifest after failed re-extraction."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from tools import pdf_knowledge_base
+from tools.pdf_knowledge_base import WorkdayPDFKnowledgeBase
+
+PAGES = ["Employees accrue paid time off every pay period.", "Meal breaks follow state law."]
+
+
+class FakeEmbeddingModel:
+    backend = "fake"
+    model_name = "bag-of-letters"
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.array([[text.lower().count(c) + 1 for c in "aeiost"] for text in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def kb(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_store", "numpy")
+    # Extraction runs in threads so the patched functions below apply
+    monkeypatch.setattr(pdf_knowledge_base, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(pdf_knowledge_base, "count_pages", lambda path: len(PAGES))
+    pdf_directory = tmp_path / "pdfs"
+    pdf_directory.mkdir()
+    (pdf_directory / "handbook.pdf").write_bytes(b"version 1")
+    return WorkdayPDFKnowledgeBase(
+        pdf_directory=str(pdf_directory),
+        persist_directory=str(tmp_path / "kb"),
+        embedding_model=FakeEmbeddingModel()
+    )
+
+
+def extract_pages(pdf_path, first, last):
+    return PAGES[first:last]
+
+
+def fail_extraction(pdf_path, first, last):
+    raise ValueError("corrupt page tree")
+
+
+def test_failed_reextraction_drops_the_manifest_entry(kb, monkeypatch):
+    monkeypatch.setattr(pdf_knowledge_base, "extract_page_range", extract_pages)
+    assert kb.ingest_pdfs()["added"] == 1
+    chunks = kb.store.count()
+    assert chunks and "handbook.pdf" in kb._load_manifest()["files"]
+
+    # A forced re-ingest deletes the file's old chunks before its extraction fails
+    monkeypatch.setattr(pdf_knowledge_base, "extract_page_range", fail_extraction)
+    assert kb.ingest_pdfs(force=True)["failed"] == 1
+    assert kb.store.count() == 0
+    assert "handbook.pdf" not in kb._load_manifest()["files"]
+
+    # The file is unchanged, but the next incremental run must re-ingest it rather than skip it
+    monkeypatch.setattr(pdf_knowledge_base, "extract_page_range", extract_pages)
+    summary = kb.ingest_pdfs()
+    assert summary["added"] == 1 and summary["unchanged"] == 0
+    assert kb.store.count() == chunks
+    assert kb._load_manifest()["files"]["handbook.pdf"]["chunks"] == chunks
@@ -0,0 +1,155 @@
+"""SharedRateLimiter: admission order across lanes, rejection and token settlement."""
+import pytest
+
+from backend.utils import rate_limit
+from backend.utils.exceptions import RateLimitedError
+from backend.utils.rate_limit import BATCH, INTERACTIVE, SharedRateLimiter, rate_limit_lane
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the limiter's sleeps instead of taking them."""
+    recorded = []
+    monkeypatch.setattr(rate_limit.time, "sleep", recorded.append)
+    return recorded
+
+
+def make_limiter(tmp_path, **kwargs) -> SharedRateLimiter:
+    # 60 requests/minute: refills one request per second, bursts of 6
+    kwargs.setdefault("requests_per_minute", 60)
+    kwargs.setdefault("tokens_per_minute", 600000)
+    kwargs.setdefault("batch_reserve", 0.25)
+    kwargs.setdefault("max_wait_seconds", 60)
+    return SharedRateLimiter(path=str(tmp_path / "rate.db"), **kwargs)
+
+
+def test_interactive_calls_queue_first_come_first_served(tmp_path, sleeps):
+    limiter = make_limiter(tmp_path)
+
+    waits = [limiter.acquire() for _ in range(9)]
+
+    # The burst is admitted at once; each later call waits one refill longer than the one before
+    assert waits[:6] == [0.0] * 6
+    assert waits[6:] == pytest.approx([1.0, 2.0, 3.0], abs=0.05)
+    assert limiter.backlog_seconds() == pytest.approx(3.0, abs=0.05)
+    assert limiter.stats()["acquired"][INTERACTIVE] == 9
+
+
+def test_interactive_call_past_max_wait_is_rejected(tmp_path, sleeps):
+    limiter = make_limiter(tmp_path, max_wait_seconds=2)
+    for _ in range(8):
+        limiter.acquire()
+
+    with pytest.raises(RateLimitedError) as excinfo:
+        limiter.acquire()
+
+    assert excinfo.value.retry_after == pytest.approx(3.0, abs=0.05)
+    assert limiter.stats()["rejected"] == 1
+    # A rejected call takes nothing from the budget
+    assert limiter.backlog_seconds() == pytest.approx(2.0, abs=0.05)
+
+
+def test_batch_calls_leave_the_reserve_to_interactive_calls(tmp_path, sleeps):
+    limiter = make_limiter(tmp_path)
+    for _ in range(4):
+        limiter.acquire()
+
+    # Two requests left: a batch call needs one plus a quarter of the burst (1.5) to remain
+    assert not limiter.try_acquire(lane=BATCH)
+    assert limiter.try_acquire(lane=INTERACTIVE)
+
+
+def test_batch_lane_comes_from_the_context(tmp_path, sleeps):
+    limiter = make_limiter(tmp_path)
+
+    with rate_limit_lane(BATCH):
+        limiter.acquire()
+    limiter.acquire()
+
+    assert limiter.stats()["acquired"] == {INTERACTIVE: 1, BATCH: 1}
+    with pytest.raises(ValueError):
+        with rate_limit_lane("bulk"):
+            pass
+
+
+def test_batch_call_polls_until_interactive_debt_is_repaid(tmp_path, sleeps, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: clock[0])
+    limiter = make_limiter(tmp_path)
+    # Interactive calls two requests into debt, whose sleeps have not started yet
+    for _ in range(8):
+        limiter.acquire()
+    polls = []
+
+    def sleep(seconds):
+        polls.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limit.time, "sleep", sleep)
+
+    waited = limiter.acquire(lane=BATCH)
+
+    # Two requests of debt, then one request plus the 1.5 reserve: ~4.5s, polled at most a second at a time
+    assert waited == pytest.approx(4.5, abs=0.1)
+    assert max(polls) <= 1.0
+    assert limiter.stats()["waited_seconds"][BATCH] == pytest.approx(waited, abs=0.01)
+
+
+def test_token_charges_are_settled_against_reported_usage(tmp_path, sleeps):
+    # 600 tokens/minute: burst of 60, refilling 10 a second
+    limiter = make_limiter(tmp_path, tokens_per_minute=600)
+
+    def tokens_level():
+        return limiter.stats()["buckets"]["tokens"]["level"]
+
+    limiter.acquire(tokens=50)
+    assert tokens_level() == pytest.approx(10, abs=0.5)
+
+    # The call used 20 of the 50 charged
+    limiter.refund_tokens(30)
+    assert tokens_level() == pytest.approx(40, abs=0.5)
+
+    # It used more than charged: the difference is taken as well
+    limiter.refund_tokens(-55)
+    assert tokens_level() == pytest.approx(-15, abs=0.5)
+
+    # Refunds never fill the bucket past its burst
+    limiter.refund_tokens(500)
+    assert tokens_level() == pytest.approx(60, abs=0.01)
+
+
+def test_single_call_charge_is_clamped_to_the_burst(tmp_path, sleeps):
+    limiter = make_limiter(tmp_path, tokens_per_minute=600)
+
+    # Larger than the whole burst: charged as one full burst, so it is admitted
+    assert limiter.acquire(tokens=1000) == 0.0
+    assert limiter.stats()["buckets"]["tokens"]["level"] == pytest.approx(0, abs=0.5)
+
+
+def test_budget_is_shared_between_limiters_on_the_same_file(tmp_path, sleeps):
+    first = make_limiter(tmp_path)
+    second = make_limiter(tmp_path)
+
+    for _ in range(6):
+        first.acquire()
+
+    assert not second.try_acquire()
+    assert second.acquire() == pytest.approx(1.0, abs=0.05)
+
+
+def test_batch_calls_are_admitted_under_low_limits(tmp_path, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: clock[0])
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    # 5 requests/minute: a burst of one request, so the reserve leaves less than a whole one
+    limiter = make_limiter(tmp_path, requests_per_minute=5, tokens_per_minute=20000)
+
+    # Charged at most the burst outside the reserve, or they could never be admitted
+    assert limiter.token_charge(1900, lane=BATCH) == pytest.approx(1500)
+    assert limiter.token_charge(1900, lane=INTERACTIVE) == 1900
+    assert limiter.acquire(tokens=1900, lane=BATCH) == 0.0
+
+    # The next one waits for the clamped share to refill rather than forever
+    waited = limiter.acquire(tokens=1900, lane=BATCH)
+    assert waited == pytest.approx(9.0, abs=1.0)
+    assert limiter.stats()["acquired"][BATCH] == 2
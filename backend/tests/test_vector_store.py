@@ -0,0 +1,155 @@
+"""NumpyVectorStore: tombstones, compaction and recovery of unpersisted appends."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from tools.vector_store import NumpyVectorStore
+
+DIM = 4
+
+
+def vector(axis: int) -> list:
+    return [1.0 if i == axis else 0.0 for i in range(DIM)]
+
+
+def add(store, *chunks):
+    """Upsert (id, axis, source) chunks, each embedded along one axis."""
+    store.upsert(
+        ids=[chunk_id for chunk_id, _, _ in chunks],
+        documents=[f"text of {chunk_id}" for chunk_id, _, _ in chunks],
+        embeddings=[vector(axis) for _, axis, _ in chunks],
+        metadatas=[{"source": source} for _, _, source in chunks],
+    )
+
+
+def read_meta(store) -> dict:
+    with open(os.path.join(store.directory, NumpyVectorStore.META_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    add(store, ("a", 0, "handbook.pdf"), ("b", 1, "handbook.pdf"), ("c", 2, "benefits.pdf"),
+        ("d", 3, "benefits.pdf"), ("e", 0, "travel.pdf"))
+    store.persist()
+    return store
+
+
+def test_query_returns_nearest_chunks_with_cosine_distance(store):
+    results = store.query([vector(1)], n_results=2)
+
+    assert results["ids"][0][0] == "b"
+    assert results["documents"][0][0] == "text of b"
+    assert results["metadatas"][0][0] == {"source": "handbook.pdf"}
+    assert results["distances"][0] == pytest.approx([0.0, 1.0])
+
+
+def test_reupsert_tombstones_the_previous_row(store):
+    add(store, ("a", 3, "handbook.pdf"))
+    store.persist()
+
+    # One dead row of six is below the compaction ratio: it stays, tombstoned
+    meta = read_meta(store)
+    assert meta["generation"] == 0
+    assert meta["deleted"] == [0]
+    assert store.count() == 5
+    assert set(store.query([vector(3)], n_results=2)["ids"][0]) == {"a", "d"}
+    assert store.query([vector(0)], n_results=1)["ids"][0] == ["e"]
+
+
+def test_delete_source_below_the_ratio_only_tombstones(store):
+    store.delete_source("travel.pdf")
+    store.persist()
+
+    meta = read_meta(store)
+    assert meta["generation"] == 0
+    assert meta["deleted"] == [4]
+    assert store.count() == 4
+    assert store.get(["e"])["ids"] == []
+    assert store.query([vector(0)], n_results=5)["ids"][0][0] == "a"
+
+
+def test_compaction_rewrites_live_rows_into_a_new_generation(store, tmp_path):
+    store.delete_source("handbook.pdf")
+    store.persist()
+
+    # Two dead rows of five reach the ratio: live rows move to generation 1
+    meta = read_meta(store)
+    assert meta["generation"] == 1
+    assert meta["deleted"] == []
+    assert meta["ids"] == ["c", "d", "e"]
+    assert sorted(os.listdir(store.directory)) == ["documents-1.bin", "meta.json", "vectors-1.bin"]
+    assert os.path.getsize(os.path.join(store.directory, "vectors-1.bin")) == 3 * DIM * 4
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    for query in (vector(0), vector(2)):
+        assert reopened.query([query], n_results=3) == store.query([query], n_results=3)
+    assert reopened.get(["c", "e"])["documents"] == ["text of c", "text of e"]
+
+
+def test_compaction_converts_to_the_configured_dtype(store, tmp_path):
+    half = NumpyVectorStore(str(tmp_path), dtype="float16")
+    half.delete_source("handbook.pdf")
+    half.persist()
+
+    assert read_meta(half)["dtype"] == "float16"
+    assert os.path.getsize(os.path.join(half.directory, "vectors-1.bin")) == 3 * DIM * 2
+    assert half.query([vector(2)], n_results=1)["ids"][0] == ["c"]
+
+
+def test_unpersisted_appends_are_invisible_and_truncated(store, tmp_path):
+    vectors_path = os.path.join(store.directory, "vectors-0.bin")
+    documents_path = os.path.join(store.directory, "documents-0.bin")
+    persisted = (os.path.getsize(vectors_path), os.path.getsize(documents_path))
+
+    # A writer that appends and dies before persist() leaves bytes past the last meta.json
+    crashed = NumpyVectorStore(str(tmp_path))
+    add(crashed, ("f", 1, "orphan.pdf"))
+    assert os.path.getsize(vectors_path) > persisted[0]
+
+    reader = NumpyVectorStore(str(tmp_path))
+    assert reader.count() == 5
+    assert reader.get(["f"])["ids"] == []
+
+    # The next writer drops the orphaned tail before appending its own rows
+    add(reader, ("g", 2, "policy.pdf"))
+    reader.persist()
+    assert os.path.getsize(vectors_path) == persisted[0] + DIM * 4
+    assert os.path.getsize(documents_path) == persisted[1] + len("text of g")
+    assert reader.get(["g"])["documents"] == ["text of g"]
+    assert set(NumpyVectorStore(str(tmp_path)).query([vector(2)], n_results=2)["ids"][0]) == {"c", "g"}
+
+
+def test_store_reloads_after_another_instance_persists(store, tmp_path):
+    other = NumpyVectorStore(str(tmp_path))
+    add(other, ("f", 1, "policy.pdf"))
+    other.persist()
+
+    assert store.count() == 6
+    assert store.get(["f"])["metadatas"] == [{"source": "policy.pdf"}]
+
+
+def test_mismatched_dimension_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.upsert(ids=["x"], documents=["x"], embeddings=[np.ones(DIM + 1)], metadatas=[{}])
+
+
+def test_query_reloads_once_after_a_concurrent_compaction(store, tmp_path):
+    other = NumpyVectorStore(str(tmp_path))
+    other.delete_source("handbook.pdf")
+    other.persist()
+    # Make the stale instance miss the meta.json change, as if it raced the compaction
+    store._meta_stamp = store._stat_meta()
+
+    assert store.query([vector(2)], n_results=1)["ids"][0] == ["c"]
+
+
+def test_query_raises_when_data_files_are_missing(store):
+    os.remove(os.path.join(store.directory, "vectors-0.bin"))
+    store._matrix = None
+
+    with pytest.raises(OSError):
+        store.query([vector(0)], n_results=1)
@@ -0,0 +1,180 @@
+"""
+Embedding model backends.
+
+  torch      sentence-transformers on PyTorch (fp32), the original path
+  onnx-int8  the same model exported to ONNX with dynamic int8
+             quantization, run by ONNX Runtime with a `tokenizers`
+             tokenizer; torch is not imported at all
+
+Both return L2-normalized float32 vectors from encode(), mirroring the
+subset of SentenceTransformer.encode the knowledge base uses, so either
+can back WorkdayPDFKnowledgeBase.embedding_model. Vectors from the two
+backends are close but not identical; the knowledge base re-ingests when
+the backend or model changes.
+
+The int8 model is exported once (needs optimum, onnx and torch, e.g. on
+a build machine) and then only needs onnxruntime and tokenizers:
+
+    cd backend && python -m tools.embeddings --export
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from typing import List, Union
+import numpy as np
+from backend.config import settings
+from backend.utils.exceptions import ConfigurationError
+from backend.utils.logger import logger
+
+EMBEDDING_BACKENDS = ("torch", "onnx-int8")
+ONNX_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def hub_model_id(model_name: str) -> str:
+    """Short sentence-transformers names resolve the way SentenceTransformer does."""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def onnx_model_dir(model_name: str = None) -> str:
+    model_name = model_name or settings.embedding_model
+    return os.path.join(settings.embedding_onnx_dir, hub_model_id(model_name).replace("/", "__"))
+
+
+class TorchEmbeddingModel:
+    """sentence-transformers on PyTorch."""
+
+    backend = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+
+class OnnxEmbeddingModel:
+    """
+    Int8-quantized ONNX export run with ONNX Runtime on CPU.
+
+    Reproduces the sentence-transformers pipeline for mean-pooling models:
+    tokenize (truncate to max_length), transformer forward pass, mean pool
+    over the attention mask, L2 normalize. Batches are sorted by length to
+    minimize padding.
+    """
+
+    backend = "onnx-int8"
+
+    def __init__(self, model_name: str, model_dir: str = None, max_length: int = None, threads: int = None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        model_dir = model_dir or onnx_model_dir(model_name)
+        model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise ConfigurationError(
+                f"ONNX embedding model not found at {model_path}. "
+                "Export it with: python -m tools.embeddings --export"
+            )
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length or settings.embedding_max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        threads = settings.embedding_threads if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch([texts[i] for i in order[start:start + batch_size]])
+            input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            hidden = self.session.run(None, feeds)[0]
+            mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
+
+def load_embedding_model(backend: str = None, model_name: str = None):
+    """Build the embedding model selected by Settings.embedding_backend."""
+    backend = (backend or settings.embedding_backend).lower()
+    model_name = model_name or settings.embedding_model
+    if backend == "torch":
+        return TorchEmbeddingModel(model_name)
+    if backend == "onnx-int8":
+        return OnnxEmbeddingModel(model_name)
+    raise ConfigurationError(
+        f"Unknown embedding backend '{backend}'. Expected one of: {', '.join(EMBEDDING_BACKENDS)}"
+    )
+
+
+def export_onnx_int8(model_name: str = None, output_dir: str = None) -> str:
+    """
+    Export model_name to ONNX and apply dynamic int8 weight quantization.
+    Returns the directory holding model_int8.onnx and tokenizer.json.
+    """
+    from optimum.exporters.onnx import main_export
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_name = model_name or settings.embedding_model
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        logger.info(f"Exporting {hub_model_id(model_name)} to ONNX...")
+        main_export(hub_model_id(model_name), output=export_dir, task="feature-extraction")
+        logger.info("Quantizing weights to int8...")
+        quantize_dynamic(
+            os.path.join(export_dir, "model.onnx"),
+            os.path.join(output_dir, ONNX_MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
+        shutil.copy(os.path.join(export_dir, TOKENIZER_FILE), os.path.join(output_dir, TOKENIZER_FILE))
+
+    logger.info(f"Int8 ONNX embedding model written to {output_dir}")
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage embedding model backends")
+    parser.add_argument("--export", action="store_true", help="Export the configured model to int8 ONNX")
+    parser.add_argument("--model", help="Model name (default: EMBEDDING_MODEL)")
+    parser.add_argument("--output", help="Output directory (default: under EMBEDDING_ONNX_DIR)")
+    args = parser.parse_args()
+    if args.export:
+        print(export_onnx_int8(args.model, args.output))
+    else:
+        parser.print_help()
@@ -0,0 +1,38 @@
+"""Version stamp identifying the current contents of the knowledge base."""
+import json
+import os
+import time
+import uuid
+from backend.config import settings
+
+VERSION_FILE = "kb_version.json"
+UNVERSIONED = "unversioned"
+
+
+def version_path(persist_directory: str = None) -> str:
+    """Path of the version stamp file."""
+    return os.path.join(persist_directory or settings.persist_directory, VERSION_FILE)
+
+
+def read_kb_version(persist_directory: str = None) -> str:
+    """
+    Return the knowledge base version stamp.
+    Knowledge bases built before stamps existed report UNVERSIONED.
+    """
+    try:
+        with open(version_path(persist_directory), 'r', encoding='utf-8') as f:
+            return json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        return UNVERSIONED
+
+
+def bump_kb_version(persist_directory: str = None) -> str:
+    """Record that the knowledge base contents changed; returns the new stamp."""
+    path = version_path(persist_directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    version = uuid.uuid4().hex
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": version, "updated_at": time.time()}, f)
+    os.replace(tmp_path, path)
+    return version
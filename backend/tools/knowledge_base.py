@@ -0,0 +1,31 @@
+"""Process-wide knowledge base instance, created on first use."""
+import threading
+
+_knowledge_base = None
+_lock = threading.Lock()
+
+
+def get_knowledge_base():
+    """Get or create the knowledge base singleton."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _lock:
+            if _knowledge_base is None:
+                # Deferred: loads sentence-transformers and the vector store
+                from tools.pdf_knowledge_base import WorkdayPDFKnowledgeBase
+                _knowledge_base = WorkdayPDFKnowledgeBase()
+    return _knowledge_base
+
+
+def set_knowledge_base(knowledge_base):
+    """Install a prebuilt instance as the singleton (benchmarks, offline runs)."""
+    global _knowledge_base
+    with _lock:
+        _knowledge_base = knowledge_base
+
+
+def knowledge_base_cache_stats():
+    """Search cache statistics, or None if the knowledge base is not loaded yet."""
+    if _knowledge_base is None:
+        return None
+    return _knowledge_base.cache_stats()
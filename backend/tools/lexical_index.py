@@ -0,0 +1,285 @@
+"""
+BM25 inverted index over knowledge base chunks.
+
+Keyword-heavy queries ("2FA requirements", "I-9", "meal breaks") are where
+MiniLM embeddings are weakest, so search fuses this index with the dense
+vector store (see WorkdayPDFKnowledgeBase).
+"""
+import json
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Tuple
+import numpy as np
+
+INDEX_FILE = "bm25_index.npz"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens. Hyphenated terms are kept whole and also split,
+    so 'I-9' matches 'I-9' exactly while 'time-off' still matches 'time'.
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if '-' in token:
+            tokens.extend(part for part in token.split('-') if len(part) > 1)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 with array-backed posting lists.
+
+    Postings are stored CSR-style: one int32 array of document rows and
+    one uint16 array of term frequencies, sliced per term by an offsets
+    array. New documents accumulate in compact pending arrays and are
+    merged in one vectorized sort before the next search or persist.
+    Replaced and deleted documents are tombstoned and dropped when they
+    reach COMPACT_RATIO of the rows. The whole index is one .npz file,
+    replaced atomically; other processes reload it when it changes.
+    """
+
+    COMPACT_RATIO = 0.3
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._dirty = False
+        self._load()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        stamp = self._stat()
+        try:
+            with np.load(self.path) as data:
+                header = json.loads(data["header"].tobytes().decode('utf-8'))
+                self._offsets = data["offsets"]
+                self._post_rows = data["rows"]
+                self._post_tf = data["tf"]
+                self._doc_len = data["doc_len"]
+                self._live = data["live"].copy()
+        except (OSError, ValueError, KeyError):
+            header = {}
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._post_rows = np.zeros(0, dtype=np.int32)
+            self._post_tf = np.zeros(0, dtype=np.uint16)
+            self._doc_len = np.zeros(0, dtype=np.int32)
+            self._live = np.zeros(0, dtype=bool)
+
+        self._terms = header.get("terms", [])
+        self._term_ids = {term: tid for tid, term in enumerate(self._terms)}
+        self._ids = header.get("ids", [])
+        self._sources = header.get("sources", [])
+        self._row_of = {
+            chunk_id: row for row, chunk_id in enumerate(self._ids) if self._live[row]
+        }
+        self._total_len = int(self._doc_len[self._live].sum())
+        self._pending_terms = array('i')
+        self._pending_rows = array('i')
+        self._pending_tf = array('H')
+        self._pending_len = array('i')
+        self._stamp = stamp
+
+    def _refresh(self):
+        if not self._dirty and self._stat() != self._stamp:
+            self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._row_of)
+
+    def ids(self) -> List[str]:
+        """IDs of all indexed chunks."""
+        with self._lock:
+            self._refresh()
+            return list(self._row_of)
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency of a term (0.0 if unseen)."""
+        with self._lock:
+            self._refresh()
+            self._merge_pending()
+            tid = self._term_ids.get(term)
+            if tid is None or not self._row_of:
+                return 0.0
+            rows = self._post_rows[self._offsets[tid]:self._offsets[tid + 1]]
+            df = int(self._live[rows].sum())
+            return float(np.log(1 + (len(self._row_of) - df + 0.5) / (df + 0.5)))
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """Index chunks, replacing any previous chunks with the same IDs."""
+        with self._lock:
+            self._refresh()
+            first_row = len(self._ids)
+            for i, (chunk_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                row = first_row + i
+                self._tombstone(chunk_id)
+                counts = Counter(tokenize(document))
+                for term, tf in counts.items():
+                    tid = self._term_ids.get(term)
+                    if tid is None:
+                        tid = self._term_ids[term] = len(self._terms)
+                        self._terms.append(term)
+                    self._pending_terms.append(tid)
+                    self._pending_rows.append(row)
+                    self._pending_tf.append(min(tf, 65535))
+                length = sum(counts.values())
+                self._pending_len.append(length)
+                self._total_len += length
+                self._ids.append(chunk_id)
+                self._sources.append(metadata.get("source"))
+                self._row_of[chunk_id] = row
+            self._dirty = True
+
+    def _tombstone(self, chunk_id: str):
+        row = self._row_of.pop(chunk_id, None)
+        if row is None:
+            return
+        self._total_len -= self._length(row)
+        if row < len(self._live):
+            self._live[row] = False
+        else:
+            # Not merged yet: a negative length marks it dead at merge time
+            self._pending_len[row - len(self._live)] = -1
+
+    def _length(self, row: int) -> int:
+        if row < len(self._doc_len):
+            return int(self._doc_len[row])
+        return max(self._pending_len[row - len(self._doc_len)], 0)
+
+    def delete_source(self, source: str):
+        with self._lock:
+            self._refresh()
+            for row, row_source in enumerate(self._sources):
+                if row_source == source and self._row_of.get(self._ids[row]) == row:
+                    self._tombstone(self._ids[row])
+                    self._dirty = True
+
+    def _merge_pending(self):
+        """Fold pending postings into the CSR arrays."""
+        if not len(self._pending_len):
+            return
+        pending_len = np.frombuffer(self._pending_len, dtype=np.int32)
+        self._doc_len = np.concatenate([self._doc_len, np.maximum(pending_len, 0)])
+        self._live = np.concatenate([self._live, pending_len >= 0])
+
+        term_of = np.repeat(np.arange(len(self._offsets) - 1, dtype=np.int32), np.diff(self._offsets))
+        terms = np.concatenate([term_of, np.frombuffer(self._pending_terms, dtype=np.int32)])
+        rows = np.concatenate([self._post_rows, np.frombuffer(self._pending_rows, dtype=np.int32)])
+        tfs = np.concatenate([self._post_tf, np.frombuffer(self._pending_tf, dtype=np.uint16)])
+        self._set_postings(terms, rows, tfs)
+
+        self._pending_terms = array('i')
+        self._pending_rows = array('i')
+        self._pending_tf = array('H')
+        self._pending_len = array('i')
+
+    def _set_postings(self, terms: np.ndarray, rows: np.ndarray, tfs: np.ndarray):
+        order = np.argsort(terms, kind='stable')
+        counts = np.bincount(terms, minlength=len(self._terms))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._post_rows = rows[order].astype(np.int32)
+        self._post_tf = tfs[order].astype(np.uint16)
+
+    def _compact(self):
+        """Drop tombstoned rows and renumber the survivors."""
+        live_rows = np.flatnonzero(self._live)
+        new_row = np.full(len(self._live), -1, dtype=np.int32)
+        new_row[live_rows] = np.arange(len(live_rows), dtype=np.int32)
+
+        keep = self._live[self._post_rows]
+        term_of = np.repeat(np.arange(len(self._offsets) - 1, dtype=np.int32), np.diff(self._offsets))
+        self._set_postings(term_of[keep], new_row[self._post_rows[keep]], self._post_tf[keep])
+
+        self._ids = [self._ids[row] for row in live_rows]
+        self._sources = [self._sources[row] for row in live_rows]
+        self._doc_len = self._doc_len[live_rows]
+        self._live = np.ones(len(live_rows), dtype=bool)
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+
+    def persist(self):
+        """Merge, compact if worthwhile and atomically rewrite the index file."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._merge_pending()
+            dead = len(self._live) - len(self._row_of)
+            if dead and dead >= self.COMPACT_RATIO * len(self._live):
+                self._compact()
+
+            header = json.dumps({"terms": self._terms, "ids": self._ids, "sources": self._sources})
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.frombuffer(header.encode('utf-8'), dtype=np.uint8),
+                    offsets=self._offsets,
+                    rows=self._post_rows,
+                    tf=self._post_tf,
+                    doc_len=self._doc_len,
+                    live=self._live
+                )
+            os.replace(tmp_path, self.path)
+            self._stamp = self._stat()
+            self._dirty = False
+
+    def search(self, queries: List[str], n_results: int) -> List[List[Tuple[str, float]]]:
+        """Top n_results (chunk_id, score) pairs per query, best first."""
+        with self._lock:
+            self._refresh()
+            self._merge_pending()
+            live_count = len(self._row_of)
+            if not live_count:
+                return [[] for _ in queries]
+            offsets, post_rows, post_tf = self._offsets, self._post_rows, self._post_tf
+            live = self._live.copy()
+            doc_len = self._doc_len
+            avg_len = max(self._total_len / live_count, 1.0)
+            term_ids = [
+                [self._term_ids[t] for t in set(tokenize(query)) if t in self._term_ids]
+                for query in queries
+            ]
+            ids = self._ids
+
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avg_len)
+        results = []
+        for tids in term_ids:
+            scores = np.zeros(len(live), dtype=np.float32)
+            for tid in tids:
+                rows = post_rows[offsets[tid]:offsets[tid + 1]]
+                tf = post_tf[offsets[tid]:offsets[tid + 1]].astype(np.float32)
+                df = int(live[rows].sum())
+                if not df:
+                    continue
+                idf = np.log(1 + (live_count - df + 0.5) / (df + 0.5))
+                scores[rows] += idf * tf * (self.k1 + 1) / (tf + norm[rows])
+            scores[~live] = 0.0
+
+            matched = np.flatnonzero(scores > 0)
+            if len(matched) > n_results:
+                matched = matched[np.argpartition(-scores[matched], n_results - 1)[:n_results]]
+            matched = matched[np.argsort(-scores[matched], kind='stable')]
+            results.append([(ids[row], float(scores[row])) for row in matched])
+        return results
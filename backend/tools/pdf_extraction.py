@@ -0,0 +1,153 @@
+"""
+PDF text extraction and chunking.
+
+Kept free of heavy imports (no chromadb / sentence-transformers / app
+logging) so ingestion worker processes start quickly and stay small.
+
+Documents are processed page by page: pages are extracted lazily and fed
+to PageChunker, which carries the overlap window across page boundaries,
+so a document is never held in memory as one string.
+"""
+import bisect
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+import PyPDF2
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+MIN_CHUNK_CHARS = 50
+PAGE_SEPARATOR = "\n\n"
+
+
+class Chunk(NamedTuple):
+    """A chunk of document text and where it came from."""
+    num: int
+    text: str
+    page_start: int
+    page_end: int
+    char_start: int
+    char_end: int
+
+
+def count_pages(pdf_path: str) -> int:
+    """Number of pages in a PDF (reads the page tree, not the content)."""
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def iter_pages(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """Lazily yield (page_number, text) for each page, 1-based."""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_index, page in enumerate(pdf_reader.pages):
+            yield page_index + 1, page.extract_text() or ""
+
+
+def extract_page_range(pdf_path: str, first: int, last: int) -> List[str]:
+    """
+    Process-pool entry point: text of pages [first, last), 0-based.
+    Splitting documents into page ranges bounds how much text any one
+    task returns and lets several workers share a large document.
+    """
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        last = min(last, len(pdf_reader.pages))
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(first, last)]
+
+
+def extract_text(pdf_path: str) -> Tuple[int, str]:
+    """Extract text content from a PDF file. Returns (page_count, text)."""
+    pages = [text + PAGE_SEPARATOR for _, text in iter_pages(pdf_path)]
+    return len(pages), "".join(pages)
+
+
+class PageChunker:
+    """
+    Incremental sentence-aware chunker fed one page at a time.
+
+    Produces the same windows as chunking the concatenated document
+    (pages joined by PAGE_SEPARATOR) while only buffering the current
+    window plus the newest page. Chunks carry their page range and their
+    character offsets within that concatenated document.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self._buffer = ""
+        self._base = 0
+        self._start = 0
+        self._page_offsets: List[int] = []
+        self._page_numbers: List[int] = []
+        self._chunk_num = 0
+
+    def feed(self, page_number: int, text: str) -> List[Chunk]:
+        """Add a page; returns the chunks that are now complete."""
+        self._page_offsets.append(self._base + len(self._buffer))
+        self._page_numbers.append(page_number)
+        self._buffer += text + PAGE_SEPARATOR
+
+        chunks = []
+        # Only cut while text exists beyond the window, so the sentence
+        # boundary search sees exactly what a whole-document pass would.
+        while len(self._buffer) - self._start > self.chunk_size:
+            start = self._start
+            end = start + self.chunk_size
+            sentence_end = max(
+                self._buffer.rfind('.', start, end),
+                self._buffer.rfind('!', start, end),
+                self._buffer.rfind('?', start, end)
+            )
+            if sentence_end > start + self.chunk_size // 2:
+                end = sentence_end + 1
+
+            self._emit(start, end, chunks)
+            self._start = max(start + 1, end - self.overlap)
+
+        # Drop text no future chunk can reach
+        self._buffer = self._buffer[self._start:]
+        self._base += self._start
+        self._start = 0
+        return chunks
+
+    def finish(self) -> List[Chunk]:
+        """Flush the final window once the document is exhausted."""
+        chunks = []
+        if self._start < len(self._buffer):
+            self._emit(self._start, len(self._buffer), chunks)
+        self._base += len(self._buffer)
+        self._buffer = ""
+        self._start = 0
+        return chunks
+
+    def _emit(self, start: int, end: int, chunks: List[Chunk]):
+        text = self._buffer[start:end].strip()
+        if text and len(text) > MIN_CHUNK_CHARS:
+            char_start = self._base + start
+            char_end = self._base + end
+            chunks.append(Chunk(
+                num=self._chunk_num,
+                text=text,
+                page_start=self._page_at(char_start),
+                page_end=self._page_at(char_end - 1),
+                char_start=char_start,
+                char_end=char_end
+            ))
+            self._chunk_num += 1
+
+    def _page_at(self, offset: int) -> int:
+        index = bisect.bisect_right(self._page_offsets, offset) - 1
+        return self._page_numbers[max(index, 0)]
+
+
+def chunk_pages(pages: Iterable[Tuple[int, str]], chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> Iterator[Chunk]:
+    """Chunk a stream of (page_number, text) pairs."""
+    chunker = PageChunker(chunk_size, overlap)
+    for page_number, text in pages:
+        yield from chunker.feed(page_number, text)
+    yield from chunker.finish()
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> Iterator[Tuple[int, str]]:
+    """Generator that yields (chunk_num, chunk) for a single block of text."""
+    for chunk in chunk_pages([(1, text)], chunk_size, overlap):
+        yield chunk.num, chunk.text
@@ -1,209 +1,688 @@
 import os
+import json
 import time
+import queue
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
-import PyPDF2
-import chromadb
-from sentence_transformers import SentenceTransformer
 from backend.config import settings
 from backend.utils.logger import logger
+from backend.utils.exceptions import ProcessingError
+from backend.utils.lru_cache import LRUCache
+from backend.utils.metrics import embedded_texts, embedding_duration, search_duration
+from backend.utils.tracing import span
+from tools.embeddings import load_embedding_model
+from tools.lexical_index import INDEX_FILE, BM25Index
+from tools.kb_version import bump_kb_version, read_kb_version, version_path
+from tools.vector_store import create_vector_store
+from tools.pdf_extraction import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    PageChunker,
+    chunk_text,
+    count_pages,
+    extract_page_range,
+    extract_text
+)
+
+MANIFEST_FILE = "ingest_manifest.json"
+# Embedding identity assumed for manifest entries written before it was recorded
+LEGACY_EMBEDDING = "torch:all-MiniLM-L6-v2"
+RETRIEVAL_MODES = ("dense", "hybrid")
+
 
 class WorkdayPDFKnowledgeBase:
     """
     Processes Workday PDF documents using local embeddings (free, no API needed).
     Memory-optimized with incremental processing.
+    Chunks live in the VectorStore selected by Settings.vector_store.
+    Re-ingestion is incremental: a manifest of per-file content hashes lets
+    unchanged PDFs be skipped and removed PDFs be purged.
+    Query embeddings and formatted search results are kept in LRU caches;
+    result entries are tied to the knowledge base version stamp, so any
+    ingestion that changes the collection invalidates them.
     """
     
-    def __init__(self, pdf_directory: str = None, persist_directory: str = None):
+    def __init__(self, pdf_directory: str = None, persist_directory: str = None, embedding_model=None):
         self.pdf_directory = pdf_directory or settings.pdf_directory
         self.persist_directory = persist_directory or settings.persist_directory
         
-        logger.info("Loading local embedding model (free, no API needed)...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("Model loaded successfully")
+        if embedding_model is None:
+            logger.info(
+                f"Loading local embedding model {settings.embedding_model} "
+                f"({settings.embedding_backend}, free, no API needed)..."
+            )
+            embedding_model = load_embedding_model()
+            logger.info("Model loaded successfully")
+        self.embedding_model = embedding_model
         
-        self.client = chromadb.PersistentClient(
-            path=self.persist_directory
-        )
+        self.store = create_vector_store(self.persist_directory)
+        logger.info(f"Using '{self.store.name}' vector store")
+        # Lives with the store's files so both always describe the same chunks
+        self.lexical_index = BM25Index(os.path.join(self.store.directory, INDEX_FILE))
         
-        self.collection = self.client.get_or_create_collection(
-            name="workday_policies",
-            metadata={"description": "Workday HR policies and documents"}
-        )
+        self._embedding_cache = LRUCache(settings.search_cache_max_entries)
+        self._search_cache = LRUCache(settings.search_cache_max_entries)
+        self._version_stamp = None
+        self._version = None
         
     def get_embedding(self, text: str) -> List[float]:
         """Get embedding from local model."""
         embedding = self.embedding_model.encode(text, show_progress_bar=False, convert_to_numpy=True)
         return embedding.tolist()
     
+    def get_query_embedding(self, query: str) -> List[float]:
+        """Embedding for a search query, served from the LRU cache when possible."""
+        return self.get_query_embeddings([query])[0]
+    
+    def collection_version(self) -> str:
+        """
+        Version stamp of the collection contents.
+        
+        The stamp file is re-read only when its stat changes, so ingestion
+        by another process (setup_pdfs.py) is noticed for the cost of a
+        stat() call. A new version drops all cached search results.
+        """
+        try:
+            stat = os.stat(version_path(self.persist_directory))
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp != self._version_stamp or self._version is None:
+            self._version = read_kb_version(self.persist_directory)
+            self._version_stamp = stamp
+            self._search_cache.clear()
+        return self._version
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics for the query embedding and search result caches."""
+        return {
+            "enabled": settings.search_cache_enabled,
+            "kb_version": self._version,
+            "query_embeddings": self._embedding_cache.stats(),
+            "search_results": self._search_cache.stats(),
+        }
+    
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from a PDF file."""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                total_pages = len(pdf_reader.pages)
-                logger.info(f"Extracting text from {total_pages} pages...")
-                
-                for page_num in range(total_pages):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n\n"
-                    
-                logger.info(f"Extracted {len(text)} characters")
+            total_pages, text = extract_text(pdf_path)
+            logger.info(f"Extracted {len(text)} characters from {total_pages} pages")
             return text
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {str(e)}", exc_info=True)
             return ""
     
-    def chunk_text_generator(self, text: str, chunk_size: int = 1000, overlap: int = 200):
+    def chunk_text_generator(self, text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
         """Generator that yields chunks incrementally to avoid memory issues."""
-        start = 0
-        text_length = len(text)
-        chunk_num = 0
+        return chunk_text(text, chunk_size, overlap)
+    
+    @property
+    def manifest_path(self) -> str:
+        # Kept with the store's files so each backend tracks its own contents
+        return os.path.join(self.store.directory, MANIFEST_FILE)
+    
+    def _load_manifest(self) -> Dict:
+        """Load the ingestion manifest, or an empty one for a fresh knowledge base."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("files", {})
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict):
+        """Write the manifest atomically so an interrupted run never corrupts it."""
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+    
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """SHA-256 of a file's contents, read in 1 MB blocks."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _chunking_params() -> Dict:
+        # page_metadata: chunks carry page ranges; older entries are re-ingested
+        return {"chunk_size": CHUNK_SIZE, "overlap": CHUNK_OVERLAP, "page_metadata": True}
+    
+    def _embedding_id(self) -> str:
+        return f"{self.embedding_model.backend}:{self.embedding_model.model_name}"
+    
+    def _is_current(self, entry: Dict, params: Dict) -> bool:
+        """Whether a manifest entry was chunked and embedded the way this run would."""
+        return (
+            entry.get("chunking") == params
+            and entry.get("embedding", LEGACY_EMBEDDING) == self._embedding_id()
+        )
+    
+    def _delete_source(self, pdf_file: str):
+        """Remove every chunk that came from pdf_file."""
+        self.store.delete_source(pdf_file)
+        self.lexical_index.delete_source(pdf_file)
+    
+    def _persist_indexes(self):
+        """Publish pending vector store and lexical index writes."""
+        self.store.persist()
+        self.lexical_index.persist()
+    
+    def _run_ingest_pipeline(self, pending_files: List[Dict], manifest: Dict, summary: Dict):
+        """
+        Ingest files through three overlapping stages:
         
-        while start < text_length:
-            end = min(start + chunk_size, text_length)
-            
-            if end < text_length:
-                sentence_end = max(
-                    text.rfind('.', start, end),
-                    text.rfind('!', start, end),
-                    text.rfind('?', start, end)
-                )
-                if sentence_end > start + chunk_size // 2:
-                    end = sentence_end + 1
-            
-            chunk = text[start:end].strip()
-            
-            if chunk and len(chunk) > 50:
-                yield chunk_num, chunk
-                chunk_num += 1
-            
-            start = max(start + 1, end - overlap)
+        1. A process pool extracts page ranges (PyPDF2 is CPU-bound).
+        2. This thread streams pages through a PageChunker per file and
+           encodes the chunks in large batches.
+        3. A writer thread upserts into the vector store in large batches and
+           records each file in the manifest once all its chunks are stored.
+        
+        At most 2 page ranges per worker are in flight and the write queue
+        is bounded, so memory stays capped regardless of document or corpus
+        size; no document is ever held as a single string.
+        """
+        params = self._chunking_params()
+        workers = settings.ingest_workers or os.cpu_count() or 1
+        embed_batch_size = settings.ingest_embed_batch_size
+        pages_per_task = settings.ingest_pages_per_task
+        
+        write_queue = queue.Queue(maxsize=settings.ingest_queue_size)
+        writer = _IngestWriter(self, manifest, write_queue, settings.ingest_write_batch_size)
+        writer.start()
+        
+        def put(item):
+            while True:
+                if writer.error is not None:
+                    raise ProcessingError(f"Failed to write chunks: {writer.error}") from writer.error
+                try:
+                    write_queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        batch = {"ids": [], "documents": [], "metadatas": []}
+        # Files whose final chunks are still waiting in the batch
+        files_in_batch = []
+        
+        def flush_batch():
+            if batch["ids"]:
+                with embedding_duration.time(kind="ingest"):
+                    embeddings = self.embedding_model.encode(
+                        batch["documents"],
+                        show_progress_bar=False,
+                        batch_size=embed_batch_size,
+                        convert_to_numpy=True
+                    )
+                embedded_texts.inc(len(batch["documents"]), kind="ingest")
+                put(("upsert", batch["ids"], batch["documents"], embeddings, batch["metadatas"]))
+                batch["ids"], batch["documents"], batch["metadatas"] = [], [], []
+            for done in files_in_batch:
+                put(("done",) + done)
+            files_in_batch.clear()
+        
+        def page_tasks():
+            """(job, first, last) page ranges for every pending file, in document order."""
+            for job in pending_files:
+                pdf_path = os.path.join(self.pdf_directory, job["file"])
+                try:
+                    job["pages"] = count_pages(pdf_path)
+                except Exception as e:
+                    logger.error(f"Error reading {job['file']}: {str(e)}")
+                    summary["failed"] += 1
+                    continue
+                job["chunks"] = 0
+                if job["pages"] == 0:
+                    yield job, 0, 0
+                for first in range(0, job["pages"], pages_per_task):
+                    yield job, first, min(first + pages_per_task, job["pages"])
+        
+        def add_chunks(job, chunks):
+            for chunk in chunks:
+                batch["ids"].append(f"{job['file']}_chunk_{chunk.num}")
+                batch["documents"].append(chunk.text)
+                batch["metadatas"].append({
+                    "source": job["file"],
+                    "chunk_id": chunk.num,
+                    "content_hash": job["sha256"],
+                    "page_start": chunk.page_start,
+                    "page_end": chunk.page_end,
+                    "char_start": chunk.char_start,
+                    "char_end": chunk.char_end,
+                })
+                job["chunks"] += 1
+                if len(batch["ids"]) >= embed_batch_size:
+                    flush_batch()
+        
+        def finish_file(job, chunker):
+            if job is None:
+                return
+            add_chunks(job, chunker.finish())
+            if not job["chunks"]:
+                logger.warning(f"No text extracted from {job['file']}")
             
-            if start >= text_length:
-                break
+            files_in_batch.append((job["file"], {
+                "sha256": job["sha256"],
+                "size": job["size"],
+                "mtime": job["mtime"],
+                "pages": job["pages"],
+                "chunks": job["chunks"],
+                "chunking": params,
+                "embedding": self._embedding_id(),
+            }))
+            summary["updated" if job["existing"] else "added"] += 1
+            summary["pages"] += job["pages"]
+            summary["chunks"] += job["chunks"]
+            logger.info(f"Processed {job['chunks']} chunks from {job['file']} ({job['pages']} pages)")
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                tasks = page_tasks()
+                # Page ranges are consumed strictly in order so each file's
+                # pages reach its chunker in sequence; workers run ahead.
+                in_flight = deque()
+                
+                def submit_next():
+                    task = next(tasks, None)
+                    if task is not None:
+                        job, first, last = task
+                        pdf_path = os.path.join(self.pdf_directory, job["file"])
+                        in_flight.append((job, first, pool.submit(extract_page_range, pdf_path, first, last)))
+                
+                for _ in range(workers * 2):
+                    submit_next()
+                
+                current_job, chunker = None, None
+                
+                while in_flight:
+                    job, first, future = in_flight.popleft()
+                    submit_next()
+                    
+                    if job.get("failed"):
+                        continue
+                    
+                    if job is not current_job:
+                        finish_file(current_job, chunker)
+                        current_job = job
+                        chunker = PageChunker(params["chunk_size"], params["overlap"])
+                        # Drop the previous version first; also covers knowledge
+                        # bases built before the manifest existed
+                        put(("delete", job["file"]))
+                    
+                    try:
+                        page_texts = future.result()
+                    except Exception as e:
+                        logger.error(f"Error extracting text from {job['file']}: {str(e)}")
+                        job["failed"] = True
+                        summary["failed"] += 1
+                        # Its old chunks are already queued for deletion
+                        put(("failed", job["file"]))
+                        current_job, chunker = None, None
+                        continue
+                    
+                    for offset, text in enumerate(page_texts):
+                        add_chunks(job, chunker.feed(first + offset + 1, text))
+                
+                finish_file(current_job, chunker)
+                flush_batch()
+        finally:
+            write_queue.put(None)
+            writer.join()
+        
+        if writer.error is not None:
+            raise ProcessingError(f"Failed to write chunks: {writer.error}") from writer.error
     
-    def ingest_pdfs(self):
-        """Process PDFs using local embeddings (free, no API needed)."""
+    def ingest_pdfs(self, force: bool = False) -> Dict:
+        """
+        Process PDFs using local embeddings (free, no API needed).
+        
+        Only new or changed PDFs are embedded; their previous chunks are
+        deleted first so shrinking documents leave nothing stale behind.
+        PDFs removed from pdf_directory are purged. force=True re-ingests
+        everything.
+        
+        Returns:
+            Counts of added, updated, unchanged, removed and failed files,
+            plus pages, chunks and seconds for the run.
+        """
+        summary = {
+            "added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0,
+            "pages": 0, "chunks": 0, "seconds": 0.0,
+        }
+        start_time = time.perf_counter()
+        
         if not os.path.exists(self.pdf_directory):
             os.makedirs(self.pdf_directory)
             logger.info(f"Created {self.pdf_directory}. Please add Workday PDF files there.")
-            return
+            return summary
+        
+        pdf_files = sorted(f for f in os.listdir(self.pdf_directory) if f.endswith('.pdf'))
+        manifest = self._load_manifest()
+        
+        if not force and manifest["files"] and not self.lexical_index.exists():
+            logger.info("Lexical index missing; re-ingesting all PDFs to build it")
+            force = True
+        params = self._chunking_params()
+        pending_files = []
         
-        pdf_files = [f for f in os.listdir(self.pdf_directory) if f.endswith('.pdf')]
+        for pdf_file in sorted(set(manifest["files"]) - set(pdf_files)):
+            logger.info(f"Removing chunks for deleted file: {pdf_file}")
+            self._delete_source(pdf_file)
+            self._persist_indexes()
+            del manifest["files"][pdf_file]
+            self._save_manifest(manifest)
+            summary["removed"] += 1
         
         if not pdf_files:
             logger.warning(f"No PDF files found in {self.pdf_directory}")
-            return
-        
-        logger.info(f"Found {len(pdf_files)} PDF files. Processing with local embeddings...")
+        else:
+            logger.info(f"Found {len(pdf_files)} PDF files. Processing with local embeddings...")
         
         for pdf_file in pdf_files:
             pdf_path = os.path.join(self.pdf_directory, pdf_file)
-            logger.info(f"Processing: {pdf_file}")
-            
-            text = self.extract_text_from_pdf(pdf_path)
-            if not text.strip():
-                logger.warning(f"No text extracted from {pdf_file}")
-                continue
-            
-            logger.info("Generating embeddings locally...")
+            stat = os.stat(pdf_path)
+            entry = manifest["files"].get(pdf_file)
             
-            batch_size = 5
-            batch_documents = []
-            batch_chunks_list = []
-            batch_metadatas = []
-            batch_ids = []
-            chunk_count = 0
-            
-            for chunk_num, chunk in self.chunk_text_generator(text):
-                try:
-                    chunk_count += 1
-                    
-                    if chunk_count % 5 == 0:
-                        logger.debug(f"Progress: {chunk_count} chunks processed...")
-                    
-                    batch_documents.append(chunk)
-                    batch_chunks_list.append(chunk)
-                    batch_metadatas.append({
-                        "source": pdf_file,
-                        "chunk_id": chunk_num,
-                    })
-                    batch_ids.append(f"{pdf_file}_chunk_{chunk_num}")
-                    
-                    if len(batch_documents) >= batch_size:
-                        embeddings = self.embedding_model.encode(
-                            batch_chunks_list,
-                            show_progress_bar=False,
-                            batch_size=2,
-                            convert_to_numpy=True
-                        ).tolist()
-                        
-                        self.collection.add(
-                            documents=batch_documents,
-                            embeddings=embeddings,
-                            metadatas=batch_metadatas,
-                            ids=batch_ids
-                        )
-                        
-                        batch_documents = []
-                        batch_chunks_list = []
-                        batch_metadatas = []
-                        batch_ids = []
-                        
-                        time.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"Error on chunk {chunk_num+1}: {str(e)}", exc_info=True)
-                    batch_documents = []
-                    batch_chunks_list = []
-                    batch_metadatas = []
-                    batch_ids = []
+            if entry and not force and self._is_current(entry, params):
+                # Size and mtime unchanged: skip without even hashing
+                if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+                    summary["unchanged"] += 1
                     continue
             
-            if batch_documents:
-                embeddings = self.embedding_model.encode(
-                    batch_chunks_list,
-                    show_progress_bar=False,
-                    batch_size=2,
-                    convert_to_numpy=True
-                ).tolist()
-                
-                self.collection.add(
-                    documents=batch_documents,
-                    embeddings=embeddings,
-                    metadatas=batch_metadatas,
-                    ids=batch_ids
-                )
+            content_hash = self._file_hash(pdf_path)
             
-            logger.info(f"Processed {chunk_count} chunks from {pdf_file}")
+            if entry and not force and self._is_current(entry, params) and entry.get("sha256") == content_hash:
+                entry.update(size=stat.st_size, mtime=stat.st_mtime)
+                self._save_manifest(manifest)
+                summary["unchanged"] += 1
+                continue
+            
+            pending_files.append({
+                "file": pdf_file,
+                "sha256": content_hash,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "existing": entry is not None,
+            })
+        
+        if pending_files:
+            logger.info(f"Processing {len(pending_files)} new or changed PDFs...")
+            self._run_ingest_pipeline(pending_files, manifest, summary)
+        
+        changed = summary["added"] + summary["updated"] + summary["removed"]
+        if changed:
+            bump_kb_version(self.persist_directory)
         
-        total = self.collection.count()
-        logger.info(f"Successfully ingested {len(pdf_files)} PDFs with {total} chunks!")
+        summary["seconds"] = time.perf_counter() - start_time
+        elapsed = max(summary["seconds"], 1e-9)
+        
+        total = self.store.count()
+        logger.info(
+            f"Ingestion complete: {summary['added']} added, {summary['updated']} updated, "
+            f"{summary['unchanged']} unchanged, {summary['removed']} removed, {summary['failed']} failed; "
+            f"{total} chunks total"
+        )
+        logger.info(
+            f"Throughput: {summary['pages'] / elapsed:.1f} pages/s, "
+            f"{summary['chunks'] / elapsed:.1f} chunks/s over {summary['seconds']:.2f}s"
+        )
         logger.info("Cost: $0.00 (using free local embeddings)")
+        return summary
     
-    def search(self, query: str, n_results: int = 3) -> str:
-        """Search using local embeddings."""
-        query_embedding = self.get_embedding(query)
+    @staticmethod
+    def _citation(metadata: Dict) -> str:
+        """Source file plus page range, e.g. 'handbook.pdf, p. 4-5'."""
+        page_start = metadata.get('page_start')
+        if page_start is None:
+            return metadata['source']
+        page_end = metadata.get('page_end', page_start)
+        pages = f"p. {page_start}" if page_end == page_start else f"p. {page_start}-{page_end}"
+        return f"{metadata['source']}, {pages}"
+    
+    def resolve_retrieval_mode(self, retrieval_mode: str = None) -> str:
+        retrieval_mode = (retrieval_mode or settings.retrieval_mode).lower()
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown retrieval mode '{retrieval_mode}'. Expected one of: {', '.join(RETRIEVAL_MODES)}"
+            )
+        return retrieval_mode
+    
+    def search(self, query: str, n_results: int = 3, retrieval_mode: str = None) -> str:
+        """Search using local embeddings, fused with BM25 in 'hybrid' retrieval mode."""
+        retrieval_mode = self.resolve_retrieval_mode(retrieval_mode)
+        return self._cached_search(query, [query], n_results, retrieval_mode)
+    
+    def search_many(self, queries: List[str], n_results: int = 3, retrieval_mode: str = None) -> str:
+        """
+        Search several queries in one round trip.
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results
-        )
+        Uncached queries are encoded in a single model forward pass and all
+        embeddings go to the vector store in one query call. Hits are merged across
+        queries by chunk ID, so an excerpt matched by several queries is
+        returned once; merged hits are ordered by their best rank, then by
+        distance.
+        """
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return "No relevant policies found."
+        if len(queries) == 1:
+            return self.search(queries[0], n_results=n_results, retrieval_mode=retrieval_mode)
+        retrieval_mode = self.resolve_retrieval_mode(retrieval_mode)
+        return self._cached_search(tuple(queries), queries, n_results, retrieval_mode)
+    
+    def _cached_search(self, cache_key, queries: List[str], n_results: int, retrieval_mode: str) -> str:
+        """Formatted results from the search cache, running the search on a miss."""
+        with span("kb.search", queries=len(queries), n_results=n_results, mode=retrieval_mode) as trace_span:
+            if not settings.search_cache_enabled:
+                formatted_results = self._search_many(queries, n_results, retrieval_mode)
+            else:
+                key = (cache_key, n_results, retrieval_mode, self.collection_version())
+                formatted_results = self._search_cache.get(key)
+                trace_span.set(cache_hit=formatted_results is not None)
+                if formatted_results is None:
+                    formatted_results = self._search_many(queries, n_results, retrieval_mode)
+                    self._search_cache.put(key, formatted_results)
+            trace_span.set(result_chars=len(formatted_results))
+            return formatted_results
+    
+    def _search_many(self, queries: List[str], n_results: int, retrieval_mode: str) -> str:
+        results = self.retrieve(queries, n_results, retrieval_mode)
         
-        if not results['documents'][0]:
+        distances = results.get('distances') or [[] for _ in queries]
+        # chunk id -> (best rank, best distance, document, metadata)
+        hits = {}
+        for ids, documents, metadatas, query_distances in zip(
+            results['ids'], results['documents'], results['metadatas'], distances
+        ):
+            for rank, (chunk_id, doc, metadata) in enumerate(zip(ids, documents, metadatas)):
+                distance = query_distances[rank] if query_distances else 0.0
+                best = hits.get(chunk_id)
+                if best is None or (rank, distance) < best[:2]:
+                    hits[chunk_id] = (rank, distance, doc, metadata)
+        
+        merged = sorted(hits.values(), key=lambda hit: hit[:2])
+        return self._format_results([hit[2] for hit in merged], [hit[3] for hit in merged])
+    
+    def retrieve(self, queries: List[str], n_results: int, retrieval_mode: str = None) -> Dict:
+        """
+        Raw per-query hits in Chroma's result shape.
+        
+        'dense' ranks by embedding similarity alone. 'hybrid' takes the top
+        retrieval_candidates from both the vector store and the BM25 index
+        and fuses them with reciprocal rank fusion,
+        score = sum(1 / (rrf_k + rank)); distances are then -score.
+        """
+        retrieval_mode = self.resolve_retrieval_mode(retrieval_mode)
+        with search_duration.time(mode=retrieval_mode):
+            return self._retrieve(queries, n_results, retrieval_mode)
+    
+    def _retrieve(self, queries: List[str], n_results: int, retrieval_mode: str) -> Dict:
+        embeddings = self.get_query_embeddings(queries)
+        if retrieval_mode == "dense":
+            return self.store.query(query_embeddings=embeddings, n_results=n_results)
+        
+        candidates = max(n_results, settings.retrieval_candidates)
+        dense = self.store.query(query_embeddings=embeddings, n_results=candidates)
+        lexical = self.lexical_index.search(queries, candidates)
+        
+        known = {}
+        for ids, documents, metadatas in zip(dense['ids'], dense['documents'], dense['metadatas']):
+            known.update(zip(ids, zip(documents, metadatas)))
+        
+        fused_rankings = []
+        for dense_ids, lexical_hits in zip(dense['ids'], lexical):
+            scores = {}
+            for ranking in (dense_ids, [chunk_id for chunk_id, _ in lexical_hits]):
+                for rank, chunk_id in enumerate(ranking, 1):
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (settings.rrf_k + rank)
+            fused_rankings.append(sorted(scores.items(), key=lambda item: -item[1])[:n_results])
+        
+        missing = list(dict.fromkeys(
+            chunk_id for ranking in fused_rankings for chunk_id, _ in ranking if chunk_id not in known
+        ))
+        if missing:
+            extra = self.store.get(missing)
+            known.update(zip(extra['ids'], zip(extra['documents'], extra['metadatas'])))
+        
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for ranking in fused_rankings:
+            # Skip anything the index has but the store lost, e.g. mid-ingestion
+            ranking = [(chunk_id, score) for chunk_id, score in ranking if chunk_id in known]
+            results["ids"].append([chunk_id for chunk_id, _ in ranking])
+            results["documents"].append([known[chunk_id][0] for chunk_id, _ in ranking])
+            results["metadatas"].append([known[chunk_id][1] for chunk_id, _ in ranking])
+            results["distances"].append([-score for _, score in ranking])
+        return results
+    
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embeddings for several queries; cache misses are encoded in one batch."""
+        if settings.search_cache_enabled:
+            embeddings = [self._embedding_cache.get(query) for query in queries]
+        else:
+            embeddings = [None] * len(queries)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            with embedding_duration.time(kind="query"), span(
+                "kb.encode", texts=len(missing), chars=sum(len(queries[i]) for i in missing)
+            ):
+                encoded = self.embedding_model.encode(
+                    [queries[i] for i in missing],
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                ).tolist()
+            embedded_texts.inc(len(missing), kind="query")
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                if settings.search_cache_enabled:
+                    self._embedding_cache.put(queries[i], embedding)
+        return embeddings
+    
+    def _format_results(self, documents: List[str], metadatas: List[Dict]) -> str:
+        if not documents:
             return "No relevant policies found."
         
-        formatted_results = f"Found {len(results['documents'][0])} relevant policy sections:\n\n"
+        formatted_results = f"Found {len(documents)} relevant policy sections:\n\n"
         
         max_chars_per_result = 500
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0]), 1):
+        for i, (doc, metadata) in enumerate(zip(documents, metadatas), 1):
             truncated_doc = doc[:max_chars_per_result] + "..." if len(doc) > max_chars_per_result else doc
-            formatted_results += f"{i}. **From: {metadata['source']}**\n"
+            formatted_results += f"{i}. **From: {self._citation(metadata)}**\n"
             formatted_results += f"   {truncated_doc}\n\n"
         
         return formatted_results
 
+class _IngestWriter(threading.Thread):
+    """
+    Final ingestion stage: drains the write queue into the vector store.
+    
+    Queue items are ("delete", file), ("upsert", ids, documents, embeddings,
+    metadatas), ("done", file, manifest_entry) and ("failed", file); None
+    stops the thread. Upserts are coalesced into transactions of up to
+    write_batch_size chunks. A file's manifest entry is only saved after the
+    transaction holding its last chunks commits, and is dropped at once when
+    its extraction fails, so either way the next run re-processes it.
+    """
+    
+    def __init__(self, kb, manifest, items, write_batch_size):
+        super().__init__(name="ingest-writer", daemon=True)
+        self.kb = kb
+        self.manifest = manifest
+        self.items = items
+        self.write_batch_size = min(write_batch_size, kb.store.max_batch_size() or write_batch_size)
+        self.error = None
+        self._ids, self._documents, self._embeddings, self._metadatas = [], [], [], []
+        self._done = []
+    
+    def run(self):
+        while True:
+            item = self.items.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self._handle(item)
+            except Exception as e:
+                logger.error(f"Ingestion writer failed: {str(e)}", exc_info=True)
+                self.error = e
+        
+        if self.error is None:
+            try:
+                self._flush()
+            except Exception as e:
+                logger.error(f"Ingestion writer failed: {str(e)}", exc_info=True)
+                self.error = e
+    
+    def _handle(self, item):
+        kind = item[0]
+        if kind == "delete":
+            self.kb._delete_source(item[1])
+        elif kind == "upsert":
+            _, ids, documents, embeddings, metadatas = item
+            self._ids.extend(ids)
+            self._documents.extend(documents)
+            self._embeddings.extend(embeddings.tolist())
+            self._metadatas.extend(metadatas)
+            if len(self._ids) >= self.write_batch_size:
+                self._flush()
+        elif kind == "done":
+            self._done.append((item[1], item[2]))
+            if not self._ids:
+                self._flush()
+        elif kind == "failed":
+            # Its previous chunks were deleted, so the old entry no longer describes the store
+            if self.manifest["files"].pop(item[1], None) is not None:
+                self.kb._save_manifest(self.manifest)
+    
+    def _flush(self):
+        while self._ids:
+            n = self.write_batch_size
+            self.kb.store.upsert(
+                ids=self._ids[:n],
+                documents=self._documents[:n],
+                embeddings=self._embeddings[:n],
+                metadatas=self._metadatas[:n]
+            )
+            self.kb.lexical_index.add(self._ids[:n], self._documents[:n], self._metadatas[:n])
+            del self._ids[:n], self._documents[:n], self._embeddings[:n], self._metadatas[:n]
+        self.kb._persist_indexes()
+        
+        if self._done:
+            for pdf_file, entry in self._done:
+                self.manifest["files"][pdf_file] = entry
+            self.kb._save_manifest(self.manifest)
+            self._done = []
+
+
 def setup_knowledge_base():
     """Run this once to process PDFs."""
     kb = WorkdayPDFKnowledgeBase()
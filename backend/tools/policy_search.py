@@ -1,15 +1,10 @@
+import time
+from typing import List, Union
 from crewai.tools import BaseTool
-from tools.pdf_knowledge_base import WorkdayPDFKnowledgeBase
-
-_knowledge_base = None
-
-
-def get_knowledge_base():
-    """Get or create the knowledge base singleton."""
-    global _knowledge_base
-    if _knowledge_base is None:
-        _knowledge_base = WorkdayPDFKnowledgeBase()
-    return _knowledge_base
+from tools.knowledge_base import get_knowledge_base
+from backend.utils.metrics import stage_duration
+from backend.utils.progress import emit
+from backend.utils.tracing import span
 
 class PolicySearchTool(BaseTool):
     name: str = "Workday Policy Search Tool"
@@ -18,17 +13,36 @@ class PolicySearchTool(BaseTool):
         "Input should be natural language queries like 'vacation policy', "
         "'California labor law requirements', 'remote work guidelines', "
         "'benefits enrollment', 'code of conduct'. "
+        "Pass a list of queries to run them together in one search. "
         "Returns relevant excerpts from official Workday policy documents."
     )
     
-    def _run(self, query: str) -> str:
+    def _run(self, query: Union[str, List[str]]) -> str:
         """
         Search Workday policies using semantic search.
+        A list of queries is searched in one batch with duplicate excerpts removed.
         Returns relevant policy excerpts.
         """
-        try:
-            kb = get_knowledge_base()
-            results = kb.search(query, n_results=3)
-            return results
-        except Exception as e:
-            return f"Error searching policies: {str(e)}"
\ No newline at end of file
+        start = time.perf_counter()
+        queries = [query] if isinstance(query, str) else query
+        with span("tool.policy_search", queries=len(queries), query_chars=sum(map(len, queries))) as trace_span:
+            try:
+                kb = get_knowledge_base()
+                if isinstance(query, str):
+                    result = kb.search(query, n_results=3)
+                else:
+                    result = kb.search_many(query, n_results=3)
+            except Exception as e:
+                result = f"Error searching policies: {str(e)}"
+                trace_span.set(error=str(e))
+            trace_span.set(result_chars=len(result))
+        
+        elapsed = time.perf_counter() - start
+        stage_duration.observe(elapsed, stage="search")
+        emit(
+            "tool_call",
+            tool=self.name,
+            query=query,
+            latency_ms=round(elapsed * 1000, 1)
+        )
+        return result
\ No newline at end of file
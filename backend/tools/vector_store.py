@@ -0,0 +1,393 @@
+"""
+Vector store backends for the policy knowledge base.
+
+Both backends take and return Chroma-shaped data: query() results are
+dicts of per-query lists under 'ids', 'documents', 'metadatas' and
+'distances'. The knowledge base code therefore works unchanged on either.
+"""
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import numpy as np
+from backend.config import settings
+from backend.utils.exceptions import ConfigurationError
+
+VECTOR_STORES = ("chroma", "numpy")
+
+
+class VectorStore(ABC):
+    """Storage and nearest-neighbour search for embedded chunks."""
+
+    name: str = ""
+    # Where the store keeps its files; the ingestion manifest lives here too
+    directory: str = ""
+
+    @abstractmethod
+    def upsert(self, ids: List[str], documents: List[str], embeddings, metadatas: List[Dict]):
+        """Insert or replace chunks by ID."""
+
+    @abstractmethod
+    def delete_source(self, source: str):
+        """Remove every chunk whose metadata 'source' is source."""
+
+    @abstractmethod
+    def query(self, query_embeddings, n_results: int) -> Dict:
+        """Top n_results chunks for each query embedding."""
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> Dict:
+        """Documents and metadatas for the given chunk IDs; unknown IDs are skipped."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    def max_batch_size(self) -> Optional[int]:
+        """Largest upsert the backend accepts, or None if unbounded."""
+        return None
+
+    def persist(self):
+        """Make all writes so far durable and visible to other processes."""
+
+
+class ChromaVectorStore(VectorStore):
+    """The 'workday_policies' collection in a persistent Chroma client."""
+
+    name = "chroma"
+
+    def __init__(self, persist_directory: str, collection_name: str = "workday_policies"):
+        import chromadb
+
+        self.directory = persist_directory
+        self.client = chromadb.PersistentClient(
+            path=persist_directory
+        )
+
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"description": "Workday HR policies and documents"}
+        )
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.collection.upsert(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+
+    def delete_source(self, source):
+        self.collection.delete(where={"source": source})
+
+    def query(self, query_embeddings, n_results):
+        return self.collection.query(query_embeddings=query_embeddings, n_results=n_results)
+
+    def get(self, ids):
+        return self.collection.get(ids=ids)
+
+    def count(self):
+        return self.collection.count()
+
+    def max_batch_size(self):
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        return get_max_batch_size() if get_max_batch_size else None
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process store: L2-normalized embeddings in a memory-mapped matrix.
+
+    Files under <persist_directory>/numpy_store/:
+        meta.json             ids, columnar metadata, document offsets and
+                              deleted rows; rewritten atomically by persist()
+        vectors-<gen>.bin     rows x dim matrix (float32 or float16)
+        documents-<gen>.bin   UTF-8 chunk texts, back to back
+
+    Writes append to the data files and only become visible to readers
+    when meta.json is replaced, so readers never see partial rows.
+    Upserted or deleted rows are tombstoned; once tombstones make up
+    COMPACT_RATIO of the rows, persist() rewrites live rows into a new
+    generation of files. Queries are a blocked matrix-vector product plus
+    argpartition top-k; readers reload whenever meta.json changes.
+    """
+
+    name = "numpy"
+    META_FILE = "meta.json"
+    COMPACT_RATIO = 0.3
+    BLOCK_ROWS = 16384
+
+    def __init__(self, persist_directory: str, dtype: str = "float32"):
+        self.directory = os.path.join(persist_directory, "numpy_store")
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype(np.float32), np.dtype(np.float16)):
+            raise ConfigurationError(f"Unsupported vector dtype: {dtype}")
+        self._lock = threading.RLock()
+        self._meta_stamp = None
+        self._dirty = False
+        self._tail_checked = False
+        self._load()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, self.META_FILE)
+
+    def _data_path(self, kind: str, generation: int = None) -> str:
+        generation = self._generation if generation is None else generation
+        return os.path.join(self.directory, f"{kind}-{generation}.bin")
+
+    def _stat_meta(self):
+        try:
+            stat = os.stat(self._meta_path)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        """(Re)read meta.json; an absent file means an empty store."""
+        stamp = self._stat_meta()
+        try:
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+
+        self._generation = meta.get("generation", 0)
+        self._dim = meta.get("dim")
+        self._store_dtype = np.dtype(meta.get("dtype", self.dtype.name))
+        self._ids = meta.get("ids", [])
+        columns = meta.get("metadata", {})
+        self._metadatas = [
+            {key: values[row] for key, values in columns.items() if values[row] is not None}
+            for row in range(len(self._ids))
+        ]
+        self._offsets = meta.get("offsets", [0])
+        self._live = np.ones(len(self._ids), dtype=bool)
+        self._live[meta.get("deleted", [])] = False
+        self._row_of = {
+            chunk_id: row for row, chunk_id in enumerate(self._ids) if self._live[row]
+        }
+        self._matrix = None
+        self._documents = None
+        self._meta_stamp = stamp
+        self._tail_checked = False
+
+    def _refresh(self):
+        """Pick up changes persisted by another process."""
+        if not self._dirty and self._stat_meta() != self._meta_stamp:
+            self._load()
+
+    def _views(self):
+        """Memory maps over the persisted rows, opened on first use."""
+        rows = len(self._ids)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(
+                self._data_path("vectors"), dtype=self._store_dtype, mode='r', shape=(rows, self._dim)
+            )
+            self._documents = np.memmap(self._data_path("documents"), dtype=np.uint8, mode='r')
+        return self._matrix, self._documents
+
+    def _prepare_append(self):
+        """Drop bytes a crashed writer appended after the last persist."""
+        if self._tail_checked:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        rows = len(self._ids)
+        for kind, size in (
+            ("vectors", rows * (self._dim or 0) * self._store_dtype.itemsize),
+            ("documents", self._offsets[-1])
+        ):
+            path = self._data_path(kind)
+            with open(path, 'ab'):
+                pass
+            if os.path.getsize(path) > size:
+                os.truncate(path, size)
+        self._tail_checked = True
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        encoded = [document.encode('utf-8') for document in documents]
+
+        with self._lock:
+            self._refresh()
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._dim}")
+            self._prepare_append()
+
+            with open(self._data_path("vectors"), 'ab') as f:
+                f.write(vectors.astype(self._store_dtype).tobytes())
+            with open(self._data_path("documents"), 'ab') as f:
+                f.write(b"".join(encoded))
+
+            first_row = len(self._ids)
+            self._live = np.concatenate([self._live, np.ones(len(ids), dtype=bool)])
+            for i, chunk_id in enumerate(ids):
+                previous = self._row_of.get(chunk_id)
+                if previous is not None:
+                    self._live[previous] = False
+                self._row_of[chunk_id] = first_row + i
+                self._offsets.append(self._offsets[-1] + len(encoded[i]))
+            self._ids.extend(ids)
+            self._metadatas.extend(dict(metadata) for metadata in metadatas)
+            self._dirty = True
+
+    def delete_source(self, source):
+        with self._lock:
+            self._refresh()
+            for row, metadata in enumerate(self._metadatas):
+                if self._live[row] and metadata.get("source") == source:
+                    self._live[row] = False
+                    del self._row_of[self._ids[row]]
+                    self._dirty = True
+
+    def get(self, ids):
+        with self._lock:
+            self._refresh()
+            rows = [self._row_of[chunk_id] for chunk_id in ids if chunk_id in self._row_of]
+            if not rows:
+                return {"ids": [], "documents": [], "metadatas": []}
+            _, documents = self._views()
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": [
+                    documents[self._offsets[row]:self._offsets[row + 1]].tobytes().decode('utf-8')
+                    for row in rows
+                ],
+                "metadatas": [dict(self._metadatas[row]) for row in rows],
+            }
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return len(self._row_of)
+
+    def persist(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            dead = len(self._ids) - len(self._row_of)
+            if dead and dead >= self.COMPACT_RATIO * len(self._ids):
+                self._compact()
+            else:
+                self._write_meta()
+            self._dirty = False
+
+    def _write_meta(self):
+        os.makedirs(self.directory, exist_ok=True)
+        keys = sorted({key for metadata in self._metadatas for key in metadata})
+        meta = {
+            "generation": self._generation,
+            "dim": self._dim,
+            "dtype": self._store_dtype.name,
+            "ids": self._ids,
+            "metadata": {key: [metadata.get(key) for metadata in self._metadatas] for key in keys},
+            "offsets": self._offsets,
+            "deleted": np.flatnonzero(~self._live).tolist(),
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, separators=(',', ':'))
+        os.replace(tmp_path, self._meta_path)
+        self._meta_stamp = self._stat_meta()
+
+    def _compact(self):
+        """Rewrite live rows into a new generation, converting to the configured dtype."""
+        old_generation = self._generation
+        live_rows = np.flatnonzero(self._live)
+        new_generation = old_generation + 1
+        offsets = [0]
+
+        if len(self._ids):
+            matrix, documents = self._views()
+            with open(self._data_path("vectors", new_generation), 'wb') as vectors_file, \
+                    open(self._data_path("documents", new_generation), 'wb') as documents_file:
+                for start in range(0, len(live_rows), self.BLOCK_ROWS):
+                    block = live_rows[start:start + self.BLOCK_ROWS]
+                    vectors_file.write(np.asarray(matrix[block], dtype=self.dtype).tobytes())
+                    for row in block:
+                        text = documents[self._offsets[row]:self._offsets[row + 1]].tobytes()
+                        documents_file.write(text)
+                        offsets.append(offsets[-1] + len(text))
+
+        self._generation = new_generation
+        self._store_dtype = self.dtype
+        self._ids = [self._ids[row] for row in live_rows]
+        self._metadatas = [self._metadatas[row] for row in live_rows]
+        self._offsets = offsets
+        self._live = np.ones(len(self._ids), dtype=bool)
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._matrix = None
+        self._documents = None
+        if not self._ids:
+            self._dim = None
+        self._tail_checked = False
+        self._write_meta()
+
+        for kind in ("vectors", "documents"):
+            try:
+                os.remove(self._data_path(kind, old_generation))
+            except OSError:
+                pass
+
+    def query(self, query_embeddings, n_results, _retry: bool = True):
+        queries = self._normalize(query_embeddings)
+
+        with self._lock:
+            self._refresh()
+            live_count = len(self._row_of)
+            if not live_count:
+                return {key: [[] for _ in queries] for key in ("ids", "documents", "metadatas", "distances")}
+            try:
+                matrix, documents = self._views()
+            except OSError:
+                if not _retry:
+                    raise
+                # Another process may have compacted the store between our reads;
+                # if the files are still missing after a reload, they are gone
+                self._load()
+                return self.query(query_embeddings, n_results, _retry=False)
+            live = self._live.copy()
+            ids, metadatas, offsets = self._ids, self._metadatas, self._offsets
+
+        rows = matrix.shape[0]
+        scores = np.empty((len(queries), rows), dtype=np.float32)
+        for start in range(0, rows, self.BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + self.BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        scores[:, ~live] = -np.inf
+
+        k = min(n_results, live_count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_index, candidates in enumerate(top):
+            order = candidates[np.argsort(-scores[query_index, candidates], kind='stable')]
+            results["ids"].append([ids[row] for row in order])
+            results["documents"].append([
+                documents[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8') for row in order
+            ])
+            results["metadatas"].append([dict(metadatas[row]) for row in order])
+            # Cosine distance, as reported by Chroma collections configured for cosine
+            results["distances"].append([float(1.0 - scores[query_index, row]) for row in order])
+        return results
+
+
+def create_vector_store(persist_directory: str = None, backend: str = None) -> VectorStore:
+    """Build the vector store selected by Settings.vector_store."""
+    persist_directory = persist_directory or settings.persist_directory
+    backend = (backend or settings.vector_store).lower()
+    if backend == "chroma":
+        return ChromaVectorStore(persist_directory)
+    if backend == "numpy":
+        return NumpyVectorStore(persist_directory, dtype=settings.vector_store_dtype)
+    raise ConfigurationError(
+        f"Unknown vector store '{backend}'. Expected one of: {', '.join(VECTOR_STORES)}"
+    )
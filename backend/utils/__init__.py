@@ -5,7 +5,8 @@ from backend.utils.exceptions import (
     KnowledgeBaseError,
     ConfigurationError,
     ValidationError,
-    ProcessingError
+    ProcessingError,
+    QueueFullError
 )
 
 __all__ = [
@@ -16,5 +17,6 @@ __all__ = [
     "ConfigurationError",
     "ValidationError",
     "ProcessingError",
+    "QueueFullError",
 ]
 
@@ -33,3 +33,18 @@ class ProcessingError(OnboardingError):
     def __init__(self, message: str = "Processing error"):
         super().__init__(message, "PROCESSING_ERROR")
 
+
+class RateLimitedError(OnboardingError):
+    """Exception raised when the shared LLM rate budget cannot serve a call in time."""
+    def __init__(self, retry_after: float, message: str = None):
+        self.retry_after = retry_after
+        super().__init__(
+            message or f"OpenAI rate budget exhausted; retry in about {retry_after:.0f}s",
+            "RATE_LIMITED"
+        )
+
+
+class QueueFullError(OnboardingError):
+    """Exception raised when the job queue has no free capacity."""
+    def __init__(self, message: str = "Job queue is full"):
+        super().__init__(message, "QUEUE_FULL")
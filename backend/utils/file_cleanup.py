@@ -1,52 +1,237 @@
-"""File cleanup utilities for managing output files."""
+"""Retention of generated output files, driven by an index of when they were written."""
 import os
+import sqlite3
+import threading
 import time
-from pathlib import Path
+from typing import Any, Dict, List, Optional
 from backend.utils.logger import logger
+from backend.utils.metrics import files_cleaned
 from backend.config import settings
 
+# Breather between delete batches so a large backlog does not monopolize the disk
+BATCH_PAUSE_SECONDS = 0.05
 
-def cleanup_old_files(directory: str = None, retention_days: int = None) -> int:
+
+class OutputRetentionIndex:
     """
-    Remove files older than retention_days from the specified directory.
-    
-    Args:
-        directory: Directory to clean (defaults to outputs directory)
-        retention_days: Number of days to retain files (defaults to config value)
-    
-    Returns:
-        Number of files deleted
+    SQLite index of generated output files ordered by creation time.
+
+    Every file gets the same retention period, so creation order is expiry
+    order: the expired files are a range scan from the start of the
+    created_at index, never a walk of the outputs directory. Files are
+    registered as packages are written; files that predate the index are
+    picked up by a one-off seeding pass. SQLite handles locking, so several
+    API workers can share (and drain) the same index.
     """
-    if directory is None:
-        directory = settings.outputs_directory
-    
-    if retention_days is None:
-        retention_days = settings.file_retention_days
-    
-    if not os.path.exists(directory):
-        logger.warning(f"Directory {directory} does not exist")
-        return 0
-    
-    cutoff_time = time.time() - (retention_days * 24 * 60 * 60)
-    deleted_count = 0
-    
-    try:
-        for file_path in Path(directory).iterdir():
-            if file_path.is_file():
-                file_age = os.path.getmtime(file_path)
-                if file_age < cutoff_time:
+
+    def __init__(self, path: str = None, directory: str = None, retention_days: int = None,
+                 batch_size: int = None):
+        self.path = path or settings.file_index_path
+        self.directory = directory or settings.outputs_directory
+        self.retention_days = settings.file_retention_days if retention_days is None else retention_days
+        self.batch_size = batch_size or settings.file_cleanup_batch_size
+        self._initialized = False
+        self._stats_lock = threading.Lock()
+        # Refreshed by the worker after each batch so scrapes never touch SQLite
+        self._backlog = 0
+        self._oldest_expired: Optional[float] = None
+        self._indexed = 0
+        self._last_run_at: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS output_files (
+                    name TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_output_files_created_at "
+                "ON output_files (created_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS output_index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.retention_days * 24 * 60 * 60
+
+    def register(self, name: str, created_at: float = None):
+        """Record (or refresh) an output file written to the outputs directory."""
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO output_files (name, created_at) VALUES (?, ?)",
+                    (name, time.time() if created_at is None else created_at)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # The file is still served; it just waits for the next seeding pass
+            logger.warning(f"Could not index output file {name}: {e}")
+
+    def seed(self) -> int:
+        """
+        Index files already in the outputs directory, once per index, using
+        their modification time. Returns the number of files added.
+        """
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM output_index_meta WHERE key = 'seeded'").fetchone():
+                return 0
+            added = 0
+            if os.path.isdir(self.directory):
+                rows: List[tuple] = []
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.') or not entry.is_file():
+                            continue
+                        rows.append((entry.name, entry.stat().st_mtime))
+                        if len(rows) >= self.batch_size:
+                            added += self._insert_missing(conn, rows)
+                            rows = []
+                added += self._insert_missing(conn, rows)
+            conn.execute("INSERT OR REPLACE INTO output_index_meta (key, value) VALUES ('seeded', ?)",
+                         (str(time.time()),))
+            conn.commit()
+        finally:
+            conn.close()
+        if added:
+            logger.info(f"Indexed {added} existing output files for retention")
+        return added
+
+    @staticmethod
+    def _insert_missing(conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO output_files (name, created_at) VALUES (?, ?)", rows)
+        conn.commit()
+        return conn.total_changes - before
+
+    def delete_batch(self, now: float = None) -> int:
+        """Delete up to batch_size expired files, oldest first. Returns the number of index rows removed."""
+        now = time.time() if now is None else now
+        cutoff = self._cutoff(now)
+        conn = self._connect()
+        try:
+            names = [row[0] for row in conn.execute(
+                "SELECT name FROM output_files WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                (cutoff, self.batch_size)
+            )]
+            removed = 0
+            deleted = 0
+            # Hold the write lock while unlinking: a concurrent put re-registers
+            # the file before checking it exists, so it either refreshed the row
+            # before the DELETE below (which then skips it) or waits for this
+            # transaction and rewrites the file after it is gone.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name in names:
+                    if not conn.execute(
+                        "DELETE FROM output_files WHERE name = ? AND created_at < ?", (name, cutoff)
+                    ).rowcount:
+                        continue
+                    removed += 1
                     try:
-                        os.remove(file_path)
-                        deleted_count += 1
-                        logger.info(f"Deleted old file: {file_path}")
+                        os.remove(os.path.join(self.directory, name))
+                        deleted += 1
+                    except FileNotFoundError:
+                        pass
                     except OSError as e:
-                        logger.error(f"Error deleting file {file_path}: {e}")
-    
-    except Exception as e:
-        logger.error(f"Error during file cleanup: {e}")
-    
-    if deleted_count > 0:
-        logger.info(f"Cleaned up {deleted_count} old files from {directory}")
-    
-    return deleted_count
+                        # Drop the row anyway so one stuck file cannot wedge the queue
+                        logger.error(f"Error deleting output file {name}: {e}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            self._refresh(conn, now)
+        finally:
+            conn.close()
+        if deleted:
+            files_cleaned.inc(deleted)
+        return removed
+
+    def _refresh(self, conn: sqlite3.Connection, now: float):
+        backlog, oldest = conn.execute(
+            "SELECT COUNT(*), MIN(created_at) FROM output_files WHERE created_at < ?", (self._cutoff(now),)
+        ).fetchone()
+        indexed = conn.execute("SELECT COUNT(*) FROM output_files").fetchone()[0]
+        with self._stats_lock:
+            self._backlog = backlog
+            self._oldest_expired = oldest
+            self._indexed = indexed
+            self._last_run_at = now
+
+    def run(self, stop: threading.Event = None) -> int:
+        """Drain every expired file in bounded batches; returns the number removed."""
+        removed = 0
+        while True:
+            batch = self.delete_batch()
+            removed += batch
+            if batch < self.batch_size or (stop is not None and stop.wait(BATCH_PAUSE_SECONDS)):
+                break
+        if removed:
+            logger.info(f"Retention removed {removed} expired output files from {self.directory}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Backlog and lag as of the last batch; lag keeps growing until the oldest expired file goes."""
+        with self._stats_lock:
+            oldest, backlog = self._oldest_expired, self._backlog
+            indexed, last_run_at = self._indexed, self._last_run_at
+        lag = 0.0
+        if backlog and oldest is not None:
+            lag = max(0.0, self._cutoff(time.time()) - oldest)
+        return {
+            "indexed": indexed,
+            "backlog": backlog,
+            "lag_seconds": lag,
+            "last_run_at": last_run_at,
+        }
+
+
+output_index = OutputRetentionIndex()
+
+
+def start_cleanup_worker(interval_seconds: int = None) -> Optional[threading.Event]:
+    """
+    Seed the output index, then delete expired files now and every
+    interval_seconds in a daemon thread. Returns the event that stops it,
+    or None when disabled.
+    """
+    if interval_seconds is None:
+        interval_seconds = settings.file_cleanup_interval_seconds
+    if interval_seconds <= 0:
+        logger.info("Output file cleanup disabled")
+        return None
+
+    stop = threading.Event()
+
+    def loop():
+        seeded = False
+        while True:
+            try:
+                if not seeded:
+                    output_index.seed()
+                    seeded = True
+                output_index.run(stop)
+            except Exception as e:
+                logger.error(f"Output file cleanup failed: {e}", exc_info=True)
+            if stop.wait(interval_seconds):
+                return
 
+    threading.Thread(target=loop, name="file-cleanup", daemon=True).start()
+    return stop
@@ -0,0 +1,189 @@
+"""Bounded background job queue for long-running onboarding work."""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import settings
+from backend.utils.logger import current_log_context, log_context, logger
+from backend.utils.exceptions import OnboardingError, QueueFullError
+from backend.utils.progress import publishing_to
+from backend.utils.tracing import tracing
+
+
+class JobStatus:
+    """Lifecycle states of a job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    FINISHED = (COMPLETED, FAILED)
+
+
+class Job:
+    """A single unit of work tracked by the JobManager."""
+
+    def __init__(self, kind: str, description: str = "", request_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        # HTTP request that submitted the job, for log correlation
+        self.request_id = request_id
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._events_lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in JobStatus.FINISHED
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Append a progress event; sequence numbers start at 1."""
+        with self._events_lock:
+            self.events.append({
+                "id": len(self.events) + 1,
+                "event": event,
+                "time": time.time(),
+                "data": data,
+            })
+
+    def events_since(self, last_id: int) -> List[Dict[str, Any]]:
+        """Events with a sequence number greater than ``last_id``."""
+        with self._events_lock:
+            return self.events[last_id:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for API responses."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "request_id": self.request_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a fixed-size worker pool with a bounded backlog.
+
+    Submissions beyond ``max_workers + max_queue_size`` outstanding jobs are
+    rejected with QueueFullError instead of piling up behind slow LLM runs.
+    Finished jobs are kept for ``retention_seconds`` so clients can poll them.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue_size: int = None,
+        retention_seconds: int = None
+    ):
+        self.max_workers = max_workers or settings.max_concurrent_jobs
+        self.max_queue_size = settings.job_queue_size if max_queue_size is None else max_queue_size
+        self.retention_seconds = retention_seconds or settings.job_retention_seconds
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="onboarding-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._outstanding = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of queued plus running jobs."""
+        return self.max_workers + self.max_queue_size
+
+    def submit(self, fn: Callable[[Job], Any], kind: str, description: str = "") -> Job:
+        """
+        Enqueue ``fn(job)`` for background execution.
+
+        Raises:
+            QueueFullError: If the queue is already at capacity.
+        """
+        with self._lock:
+            self._prune_locked()
+            if self._outstanding >= self.capacity:
+                raise QueueFullError(
+                    f"Onboarding queue is full ({self.capacity} jobs outstanding). Please retry shortly."
+                )
+            job = Job(kind, description, request_id=current_log_context().get("request_id"))
+            self._jobs[job.id] = job
+            self._outstanding += 1
+
+        with log_context(job_id=job.id):
+            logger.info(f"Queued {kind} job {job.id} ({description})")
+        self._executor.submit(self._execute, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Current queue occupancy."""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == JobStatus.RUNNING)
+            queued = sum(1 for job in self._jobs.values() if job.status == JobStatus.QUEUED)
+        return {
+            "queued": queued,
+            "running": running,
+            "max_workers": self.max_workers,
+            "capacity": self.capacity,
+        }
+
+    def shutdown(self):
+        """Stop accepting work and cancel jobs that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, job: Job, fn: Callable[[Job], Any]):
+        with log_context(request_id=job.request_id, job_id=job.id):
+            self._run_job(job, fn)
+
+    def _run_job(self, job: Job, fn: Callable[[Job], Any]):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.publish("job", {"status": job.status})
+        try:
+            with publishing_to(job.publish), tracing(job.id, job.kind):
+                job.result = fn(job)
+            job.status = JobStatus.COMPLETED
+        except OnboardingError as e:
+            logger.error(f"Job {job.id} failed: {e.message}", exc_info=True)
+            job.error = e.message
+            job.status = JobStatus.FAILED
+        except Exception as e:
+            logger.error(f"Unexpected error in job {job.id}: {str(e)}", exc_info=True)
+            job.error = "An unexpected error occurred. Please try again later."
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = time.time()
+            job.publish("job", {"status": job.status, "error": job.error, "result": job.result})
+            with self._lock:
+                self._outstanding -= 1
+            logger.info(
+                f"Job {job.id} {job.status} in {job.finished_at - job.started_at:.2f}s"
+            )
+
+    def _prune_locked(self):
+        """Drop finished jobs older than the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
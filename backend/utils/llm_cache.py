@@ -0,0 +1,210 @@
+"""Persistent cache of LLM responses keyed by model, temperature and prompt."""
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+from backend.config import settings
+from backend.utils.logger import logger
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+# Runs of whitespace, including JSON-escaped newlines and tabs
+_WHITESPACE = re.compile(r'(?:\\[nrt]|\s)+')
+
+
+@contextlib.contextmanager
+def bypassing_llm_cache(bypass: bool = True):
+    """
+    Skip cache lookups for LLM calls made in this context. Fresh responses
+    are still stored, replacing any cached entry.
+    """
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so indentation and line-wrapping changes still hit."""
+    return _WHITESPACE.sub(' ', prompt).strip()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed LLM response cache with TTL expiry and a size bound.
+
+    Keys hash the model, temperature, call parameters (stop words, bound
+    tools) and the normalized prompt. Responses are stored as serialized
+    text; least recently used entries are evicted once the stored bytes
+    exceed max_bytes. SQLite handles locking, making the cache safe to
+    share between workers.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_bytes: int = None):
+        self.path = path or settings.llm_cache_path
+        self.ttl_seconds = settings.llm_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_bytes = settings.llm_cache_max_bytes if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.tokens_saved = 0
+        self._stats_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access "
+                "ON llm_responses (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str, params: str = "") -> str:
+        payload = json.dumps([model, temperature, params, normalize_prompt(prompt)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, hit: bool, tokens: int = 0):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+                self.tokens_saved += tokens
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss, expired entry or bypass."""
+        if llm_cache_bypassed():
+            with self._stats_lock:
+                self.bypassed += 1
+            return None
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT response, tokens, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[2] < now - self.ttl_seconds:
+                    if row is not None:
+                        conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                        conn.commit()
+                    self._count(hit=False)
+                    return None
+                conn.execute(
+                    "UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True, tokens=row[1])
+        return row[0]
+
+    def put(self, key: str, model: str, response: str, tokens: int = 0):
+        """Store a response, evicting least recently used entries beyond max_bytes."""
+        if not response:
+            return
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, model, response, size, tokens, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, response, size, tokens, now, now)
+                )
+                conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS total "
+                    "FROM llm_responses) WHERE total > ?)",
+                    (self.max_bytes,)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def clear(self):
+        """Remove every cached response."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _usage(self) -> Tuple[Optional[int], Optional[int]]:
+        try:
+            conn = self._connect()
+            try:
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None, None
+        return entries, size
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and tokens-saved counters for this process plus shared usage."""
+        entries, size = self._usage()
+        with self._stats_lock:
+            hits, misses, bypassed, tokens_saved = self.hits, self.misses, self.bypassed, self.tokens_saved
+        lookups = hits + misses
+        return {
+            "enabled": settings.llm_cache_enabled,
+            "hits": hits,
+            "misses": misses,
+            "bypassed": bypassed,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "tokens_saved": tokens_saved,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+llm_cache = LLMResponseCache()
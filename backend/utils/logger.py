@@ -1,52 +1,216 @@
 """Logging configuration for the application."""
+import atexit
+import contextlib
+import json
 import logging
+import queue
 import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional, Tuple
 from backend.config import settings
 
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+TEXT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Correlation fields (request_id, job_id) stamped onto every record
+_log_context: ContextVar[Dict[str, str]] = ContextVar("log_context", default={})
+
+
+@contextlib.contextmanager
+def log_context(**fields: Optional[str]):
+    """Add correlation fields to records logged in this context; None values are skipped."""
+    merged = {**_log_context.get(), **{key: value for key, value in fields.items() if value is not None}}
+    token = _log_context.set(merged)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> Dict[str, str]:
+    return _log_context.get()
+
+
+class ContextFilter(logging.Filter):
+    """Copies the correlation fields onto the record on the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+
+class _SharedFormatMixin:
+    """
+    Formats each record once: the console, file and error sinks share one
+    formatter, so the listener thread would otherwise format it per sink.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        cached = getattr(record, "_formatted", None)
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        formatted = self._format(record)
+        record._formatted = (self, formatted)
+        return formatted
+
+
+class JsonFormatter(_SharedFormatMixin, logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, correlation fields."""
+
+    def _format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "context", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(_SharedFormatMixin, logging.Formatter):
+    """The classic text format with correlation fields appended as [key=value]."""
+
+    def __init__(self):
+        super().__init__(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+
+    def _format(self, record: logging.LogRecord) -> str:
+        return logging.Formatter.format(self, record)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        context = getattr(record, "context", None)
+        if context:
+            message += " [" + " ".join(f"{key}={value}" for key, value in context.items()) + "]"
+        return message
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without blocking. When the
+    bounded queue is full the record is dropped and counted instead of
+    stalling the request (or the event loop) on slow console or disk I/O.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and tracebacks here, but leave formatting to the sinks
+        # so JSON and text output both get the raw message
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Blocking put: stop() must get through even if the queue is full
+        self.queue.put(self._sentinel)
+
+
+def create_formatter() -> logging.Formatter:
+    """JsonFormatter or TextFormatter according to settings.log_format."""
+    if settings.log_format.lower() == "json":
+        return JsonFormatter()
+    return TextFormatter()
+
+
+def create_handlers(log_dir: str = "logs") -> List[logging.Handler]:
+    """Console, rotating file and rotating error-file sinks."""
+    formatter = create_formatter()
 
-def setup_logger(name: str = "onboardai") -> logging.Logger:
-    """Set up and configure application logger."""
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.log_level.upper()))
-    
-    if logger.handlers:
-        return logger
-    
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
+
+    log_path = Path(log_dir)
+    log_path.mkdir(exist_ok=True)
+
     file_handler = RotatingFileHandler(
-        log_dir / "onboardai.log",
+        log_path / "onboardai.log",
         maxBytes=10 * 1024 * 1024,
         backupCount=5
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+
     error_handler = RotatingFileHandler(
-        log_dir / "onboardai_errors.log",
+        log_path / "onboardai_errors.log",
         maxBytes=10 * 1024 * 1024,
         backupCount=5
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
-    
+
+    return [console_handler, file_handler, error_handler]
+
+
+def attach_queue_handler(
+    logger: logging.Logger, handlers: List[logging.Handler], queue_size: int = None
+) -> Tuple[DroppingQueueHandler, QueueListener]:
+    """Route ``logger`` through a bounded queue drained into ``handlers`` by a listener thread."""
+    log_queue = queue.Queue(maxsize=queue_size or settings.log_queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(queue_handler)
+    return queue_handler, listener
+
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def setup_logger(name: str = "onboardai") -> logging.Logger:
+    """Set up and configure application logger."""
+    global _queue_handler
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, settings.log_level.upper()))
+
+    if logger.handlers:
+        return logger
+
+    queue_handler, listener = attach_queue_handler(logger, create_handlers())
+    # Drain what is still queued when the process exits
+    atexit.register(listener.stop)
+    if name == "onboardai":
+        _queue_handler = queue_handler
+
     return logger
 
 
-logger = setup_logger()
+def log_queue_stats() -> Dict[str, int]:
+    """Backlog and dropped-record count of the application log queue."""
+    if _queue_handler is None:
+        return {"queued": 0, "capacity": 0, "dropped": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
+
 
+logger = setup_logger()
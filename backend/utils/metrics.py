@@ -0,0 +1,251 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms are plain dicts keyed by label values and
+guarded by one lock each, so recording a sample costs a dict lookup and an
+addition. Values that already live elsewhere (queue occupancy, cache hit
+counters) are read by collectors at scrape time instead of being mirrored.
+"""
+import bisect
+import contextlib
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from backend.utils.logger import logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond cache hits up to multi-minute crews
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.labelnames and self.kind != "histogram":
+            # Unlabelled series are exported as 0 before the first update
+            self._values[()] = 0
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterable[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", self.labelnames, key, value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative buckets on render)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (last is +Inf), sum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block in seconds, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = [(key, list(state[0]), state[1]) for key, state in self._values.items()]
+        bucket_names = self.labelnames + ("le",)
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", bucket_names, key + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, key, total
+            yield "_count", self.labelnames, key, cumulative
+
+
+Collector = Callable[[], Iterable[_Metric]]
+
+
+class MetricsRegistry:
+    """Metrics recorded in this process plus collectors evaluated per scrape."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector):
+        """Register a callable returning freshly populated metrics on each scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                for metric in collector():
+                    lines.extend(metric.render())
+            except Exception as e:
+                # One broken collector must not take down the whole scrape
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+def cache_metrics(counters: Dict[str, Tuple[int, int]]) -> List[_Metric]:
+    """Hit/miss totals and hit ratio per cache from {cache: (hits, misses)}."""
+    hits = Counter("onboardai_cache_hits_total", "Cache lookups served from the cache", ("cache",))
+    misses = Counter("onboardai_cache_misses_total", "Cache lookups that missed", ("cache",))
+    ratio = Gauge("onboardai_cache_hit_ratio", "Hits over lookups since process start", ("cache",))
+    for cache, (cache_hits, cache_misses) in counters.items():
+        lookups = cache_hits + cache_misses
+        hits.inc(cache_hits, cache=cache)
+        misses.inc(cache_misses, cache=cache)
+        ratio.set(cache_hits / lookups if lookups else 0.0, cache=cache)
+    return [hits, misses, ratio]
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "onboardai_http_requests_total", "HTTP requests by route template, method and status",
+    ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "onboardai_http_request_duration_seconds", "Time to produce the HTTP response (streams: until headers)",
+    ("method", "route")
+)
+stage_duration = registry.histogram(
+    "onboardai_stage_duration_seconds", "Onboarding pipeline stage latency (researcher, search, writer)",
+    ("stage",)
+)
+crews_in_flight = registry.gauge(
+    "onboardai_crews_in_flight", "Crews currently executing in this process"
+)
+llm_requests = registry.counter(
+    "onboardai_llm_requests_total", "LLM calls by model and source (api, cache or error)",
+    ("model", "source")
+)
+llm_request_duration = registry.histogram(
+    "onboardai_llm_request_duration_seconds", "LLM call latency including streaming", ("model",)
+)
+llm_tokens = registry.counter(
+    "onboardai_llm_tokens_total", "Tokens billed by the LLM API (cache hits excluded)", ("model", "kind")
+)
+llm_cost = registry.counter(
+    "onboardai_llm_cost_usd_total", "Estimated LLM spend from the configured per-token prices", ("model",)
+)
+embedding_duration = registry.histogram(
+    "onboardai_embedding_duration_seconds", "Embedding model encode calls (query or ingest batches)", ("kind",)
+)
+embedded_texts = registry.counter(
+    "onboardai_embedded_texts_total", "Texts passed to the embedding model", ("kind",)
+)
+search_duration = registry.histogram(
+    "onboardai_kb_search_duration_seconds", "Knowledge base retrieval latency, cache misses only", ("mode",)
+)
+files_cleaned = registry.counter(
+    "onboardai_files_cleaned_total", "Output files removed by the retention cleanup"
+)
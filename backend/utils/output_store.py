@@ -0,0 +1,89 @@
+"""Content-addressed, gzip-compressed storage for generated onboarding packages."""
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+from typing import NamedTuple, Optional
+from backend.config import settings
+from backend.utils.file_cleanup import OutputRetentionIndex, output_index
+
+# 128 bits of SHA-256: unique across any realistic number of packages
+ID_LENGTH = 32
+_ID_PATTERN = re.compile(rf"^[0-9a-f]{{{ID_LENGTH}}}$")
+SUFFIX = ".md.gz"
+
+
+class StoredOutput(NamedTuple):
+    output_id: str
+    path: str
+    size: int
+    stored_size: int
+
+
+class OutputStore:
+    """
+    Packages are stored once per distinct content as ``{id}.md.gz``, where
+    the ID is derived from a hash of the Markdown. Two employees with the
+    same name no longer overwrite each other, concurrent writers of the same
+    content produce the same file, and the bytes behind an ID never change,
+    so the ID doubles as an HTTP ETag. Files are written with a fixed gzip
+    header so the stored bytes are reproducible too.
+    """
+
+    def __init__(self, directory: str = None, index: OutputRetentionIndex = None, compress_level: int = None):
+        self.directory = directory or settings.outputs_directory
+        self.index = index or output_index
+        self.compress_level = compress_level or settings.output_compress_level
+
+    @staticmethod
+    def make_id(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()[:ID_LENGTH]
+
+    @staticmethod
+    def is_valid_id(output_id: str) -> bool:
+        return bool(_ID_PATTERN.match(output_id))
+
+    def path_for(self, output_id: str) -> str:
+        return os.path.join(self.directory, output_id + SUFFIX)
+
+    def put(self, content: str) -> StoredOutput:
+        """Store a package (a no-op write if identical content is already stored) and return its ID."""
+        data = content.encode('utf-8')
+        output_id = self.make_id(data)
+        path = self.path_for(output_id)
+        # Register first: re-registering restarts the retention clock, so
+        # existing content cannot expire between the check and the return
+        self.index.register(output_id + SUFFIX)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            compressed = gzip.compress(data, compresslevel=self.compress_level, mtime=0)
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{output_id}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return StoredOutput(output_id, path, len(data), os.path.getsize(path))
+
+    def locate(self, output_id: str) -> Optional[str]:
+        """Path of the compressed package, or None for an unknown or malformed ID."""
+        if not self.is_valid_id(output_id):
+            return None
+        path = self.path_for(output_id)
+        return path if os.path.exists(path) else None
+
+    def read(self, output_id: str) -> Optional[str]:
+        """Decompressed Markdown of a stored package."""
+        path = self.locate(output_id)
+        if path is None:
+            return None
+        with gzip.open(path, 'rb') as f:
+            return f.read().decode('utf-8')
+
+
+output_store = OutputStore()
@@ -0,0 +1,40 @@
+"""Progress events published from inside a running onboarding job."""
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+Publisher = Callable[[str, Dict[str, Any]], None]
+
+_publisher: ContextVar[Optional[Publisher]] = ContextVar("progress_publisher", default=None)
+
+
+@contextlib.contextmanager
+def publishing_to(publisher: Publisher):
+    """Route events emitted in this context to ``publisher``."""
+    token = _publisher.set(publisher)
+    try:
+        yield
+    finally:
+        _publisher.reset(token)
+
+
+def current_publisher() -> Optional[Publisher]:
+    """Publisher bound to the current context, if any."""
+    return _publisher.get()
+
+
+def emit(event: str, **data: Any):
+    """
+    Publish a progress event to the job running in this context.
+
+    A no-op outside a job (CLI runs, setup scripts), so instrumented code
+    never needs to know whether anyone is listening.
+    """
+    publisher = _publisher.get()
+    if publisher is None:
+        return
+    try:
+        publisher(event, data)
+    except Exception:
+        # Progress reporting must never break the onboarding itself.
+        pass
@@ -0,0 +1,271 @@
+"""Request and token budgets for the OpenAI API, shared across threads and worker processes."""
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+from backend.config import settings
+from backend.utils.exceptions import RateLimitedError
+from backend.utils.logger import logger
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# Priority lane of the LLM calls made in this context
+_lane: ContextVar[str] = ContextVar("rate_limit_lane", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def rate_limit_lane(lane: str):
+    """Draw LLM calls made in this context from ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown rate limit lane {lane!r}; expected one of {LANES}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+class SharedRateLimiter:
+    """
+    Token buckets for API requests and tokens, stored in SQLite so every
+    thread and uvicorn worker draws from the same budget.
+
+    Each bucket refills at its per-minute rate up to a burst of a tenth of
+    a minute. Interactive calls take their share at once and may drive a
+    bucket into debt: the debt is the queue. Each caller sleeps until its
+    share has refilled, so waits are first come, first served across
+    processes, and debt / rate is the wait a new call would face. Batch
+    calls never queue. They only take capacity that leaves
+    ``batch_reserve`` of the burst free, so they always go after waiting
+    interactive calls and poll until the budget frees up.
+    """
+
+    def __init__(self, path: str = None, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 batch_reserve: float = None, max_wait_seconds: float = None):
+        self.path = path or settings.llm_rate_limit_path
+        requests_per_minute = requests_per_minute or settings.openai_max_rpm
+        tokens_per_minute = tokens_per_minute or settings.openai_max_tpm
+        if requests_per_minute <= 0 or tokens_per_minute <= 0:
+            raise ValueError("Rate limits must be positive")
+        # name -> (refill per second, burst)
+        self.buckets = {
+            "requests": (requests_per_minute / 60.0, max(1.0, requests_per_minute / 10.0)),
+            "tokens": (tokens_per_minute / 60.0, max(1.0, tokens_per_minute / 10.0)),
+        }
+        self.batch_reserve = settings.llm_rate_limit_batch_reserve if batch_reserve is None else batch_reserve
+        self.max_wait_seconds = (
+            settings.llm_rate_limit_max_wait_seconds if max_wait_seconds is None else max_wait_seconds
+        )
+        self.waited_seconds = {lane: 0.0 for lane in LANES}
+        self.acquired = {lane: 0 for lane in LANES}
+        self.rejected = 0
+        self._stats_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    name TEXT PRIMARY KEY,
+                    level REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+            self._initialized = True
+        return conn
+
+    def _levels(self, conn: sqlite3.Connection, now: float) -> Dict[str, float]:
+        """Current level of every bucket after refilling; new buckets start full."""
+        stored = {name: (level, updated) for name, level, updated in conn.execute(
+            "SELECT name, level, updated FROM rate_buckets"
+        )}
+        levels = {}
+        for name, (rate, burst) in self.buckets.items():
+            level, updated = stored.get(name, (burst, now))
+            levels[name] = min(burst, level + max(0.0, now - updated) * rate)
+        return levels
+
+    def _store(self, conn: sqlite3.Connection, levels: Dict[str, float], now: float):
+        conn.executemany(
+            "INSERT OR REPLACE INTO rate_buckets (name, level, updated) VALUES (?, ?, ?)",
+            [(name, level, now) for name, level in levels.items()]
+        )
+
+    def _costs(self, requests: float, tokens: float, lane: str) -> Dict[str, float]:
+        """
+        One call's charge per bucket. It is clamped to what the lane can ever
+        be admitted with: the burst, or for batch calls the part of the burst
+        outside the reserve, since levels never refill past the burst.
+        """
+        share = 1.0 if lane != BATCH else max(0.0, 1.0 - self.batch_reserve)
+        return {
+            "requests": min(requests, share * self.buckets["requests"][1]),
+            "tokens": min(tokens, share * self.buckets["tokens"][1]),
+        }
+
+    def token_charge(self, tokens: float, lane: str = None) -> float:
+        """The tokens acquire() actually takes for a call estimated at ``tokens``."""
+        return self._costs(0, tokens, lane or current_lane())["tokens"]
+
+    def _take(self, lane: str, costs: Dict[str, float], max_wait: float) -> Tuple[bool, float]:
+        """
+        One attempt to draw ``costs`` from the buckets.
+
+        Returns:
+            (taken, seconds): for a taken interactive share, how long to sleep
+            before using it; otherwise how long until it is worth trying again.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = self._levels(conn, now)
+                if lane == BATCH:
+                    wait = max(
+                        (costs[name] + self.batch_reserve * burst - levels[name]) / rate
+                        for name, (rate, burst) in self.buckets.items()
+                    )
+                    if wait > 0:
+                        return False, wait
+                    wait = 0.0
+                else:
+                    wait = max(
+                        (costs[name] - levels[name]) / rate for name, (rate, _) in self.buckets.items()
+                    )
+                    wait = max(0.0, wait)
+                    if wait > max_wait:
+                        return False, wait
+                self._store(conn, {name: levels[name] - costs[name] for name in levels}, now)
+                return True, wait
+            finally:
+                conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def acquire(self, requests: float = 1, tokens: float = 0, lane: str = None, max_wait: float = None) -> float:
+        """
+        Block until one call's share of the budget is available and take it.
+
+        Interactive calls that would wait longer than ``max_wait`` (default
+        LLM_RATE_LIMIT_MAX_WAIT_SECONDS) raise RateLimitedError instead;
+        batch calls wait as long as it takes.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        lane = lane or current_lane()
+        max_wait = self.max_wait_seconds if max_wait is None else max_wait
+        costs = self._costs(requests, tokens, lane)
+        waited = 0.0
+        while True:
+            try:
+                taken, wait = self._take(lane, costs, max_wait)
+            except sqlite3.Error as e:
+                # Fail open: an unreadable budget must not stop every LLM call
+                logger.warning(f"LLM rate limiter unavailable, not limiting: {e}")
+                return waited
+            if taken:
+                if wait > 0:
+                    time.sleep(wait)
+                    waited += wait
+                break
+            if lane != BATCH:
+                with self._stats_lock:
+                    self.rejected += 1
+                raise RateLimitedError(wait)
+            # Interactive calls may have drained the budget meanwhile; re-check at least once a second
+            time.sleep(min(wait, 1.0))
+            waited += min(wait, 1.0)
+        with self._stats_lock:
+            self.acquired[lane] += 1
+            self.waited_seconds[lane] += waited
+        return waited
+
+    def try_acquire(self, requests: float = 1, tokens: float = 0, lane: str = None) -> bool:
+        """Take a share only if no waiting is needed."""
+        lane = lane or current_lane()
+        taken, _ = self._take(lane, self._costs(requests, tokens, lane), 0.0)
+        return taken
+
+    def refund_tokens(self, tokens: float):
+        """Return (or, when negative, further charge) tokens once a call's real usage is known."""
+        if not tokens:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    now = time.time()
+                    levels = self._levels(conn, now)
+                    levels["tokens"] = min(self.buckets["tokens"][1], levels["tokens"] + tokens)
+                    self._store(conn, levels, now)
+                finally:
+                    conn.execute("COMMIT")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM rate limiter token adjustment failed: {e}")
+
+    def backlog_seconds(self) -> float:
+        """How long a new interactive call would wait for the work already queued."""
+        try:
+            conn = self._connect()
+            try:
+                levels = self._levels(conn, time.time())
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM rate limiter backlog check failed: {e}")
+            return 0.0
+        return max(0.0, max(-levels[name] / rate for name, (rate, _) in self.buckets.items()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Shared bucket levels plus this process's acquisitions, waits and rejections."""
+        try:
+            conn = self._connect()
+            try:
+                levels = self._levels(conn, time.time())
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM rate limiter stats failed: {e}")
+            levels = {}
+        with self._stats_lock:
+            return {
+                "buckets": {
+                    name: {
+                        "level": round(levels[name], 3) if name in levels else None,
+                        "burst": burst,
+                        "per_minute": rate * 60,
+                    }
+                    for name, (rate, burst) in self.buckets.items()
+                },
+                "acquired": dict(self.acquired),
+                "waited_seconds": {lane: round(value, 3) for lane, value in self.waited_seconds.items()},
+                "rejected": self.rejected,
+            }
+
+
+llm_rate_limiter: Optional[SharedRateLimiter] = (
+    SharedRateLimiter() if settings.llm_rate_limit_enabled else None
+)
@@ -0,0 +1,160 @@
+"""Persistent cache of policy research briefs keyed by profile facets."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+from backend.config import settings
+from backend.utils.logger import logger
+
+
+class ResearchBriefCache:
+    """
+    SQLite-backed brief cache with TTL expiry and LRU eviction.
+
+    Entries are keyed by the normalized facet tuple plus the knowledge base
+    version stamp, so re-ingesting policies naturally invalidates them.
+    SQLite handles locking, making the cache safe to share between workers.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_entries: int = None):
+        self.path = path or settings.research_cache_path
+        self.ttl_seconds = settings.research_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_entries = settings.research_cache_max_entries if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS research_briefs (
+                    key TEXT PRIMARY KEY,
+                    facets TEXT NOT NULL,
+                    kb_version TEXT NOT NULL,
+                    brief TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_research_briefs_last_access "
+                "ON research_briefs (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def make_key(facets: Sequence[str], kb_version: str) -> str:
+        payload = json.dumps([list(facets), kb_version])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, facets: Sequence[str], kb_version: str) -> Optional[str]:
+        """Return the cached brief, or None on a miss or expired entry."""
+        key = self.make_key(facets, kb_version)
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT brief, created_at FROM research_briefs WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] < now - self.ttl_seconds:
+                    if row is not None:
+                        conn.execute("DELETE FROM research_briefs WHERE key = ?", (key,))
+                        conn.commit()
+                    self._count(hit=False)
+                    return None
+                conn.execute(
+                    "UPDATE research_briefs SET last_access = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Research cache lookup failed: {e}")
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return row[0]
+
+    def put(self, facets: Sequence[str], kb_version: str, brief: str):
+        """Store a brief, evicting least recently used entries beyond max_entries."""
+        if not brief:
+            return
+        key = self.make_key(facets, kb_version)
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO research_briefs "
+                    "(key, facets, kb_version, brief, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, json.dumps(list(facets)), kb_version, brief, now, now)
+                )
+                conn.execute(
+                    "DELETE FROM research_briefs WHERE key IN ("
+                    "SELECT key FROM research_briefs ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Research cache store failed: {e}")
+
+    def clear(self):
+        """Remove every cached brief."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM research_briefs")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the shared entry count."""
+        try:
+            conn = self._connect()
+            try:
+                entries = conn.execute("SELECT COUNT(*) FROM research_briefs").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            entries = None
+
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+research_cache = ResearchBriefCache()
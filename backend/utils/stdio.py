@@ -0,0 +1,50 @@
+"""Thread-safe suppression of stdout/stderr for noisy third-party code."""
+import contextlib
+import sys
+import threading
+
+_local = threading.local()
+_install_lock = threading.Lock()
+
+
+class _ThreadAwareStream:
+    """Proxy stream that drops writes from threads that asked to be silenced."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data):
+        if getattr(_local, "silenced", 0):
+            return len(data)
+        return self._stream.write(data)
+
+    def flush(self):
+        if not getattr(_local, "silenced", 0):
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _install():
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadAwareStream):
+            sys.stdout = _ThreadAwareStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadAwareStream):
+            sys.stderr = _ThreadAwareStream(sys.stderr)
+
+
+@contextlib.contextmanager
+def silence_output():
+    """
+    Silence stdout/stderr for the current thread only.
+
+    contextlib.redirect_stdout swaps the process-wide stream, which corrupts
+    sys.stdout when several worker threads enter and exit it concurrently.
+    """
+    _install()
+    _local.silenced = getattr(_local, "silenced", 0) + 1
+    try:
+        yield
+    finally:
+        _local.silenced -= 1
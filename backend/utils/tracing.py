@@ -0,0 +1,237 @@
+"""
+Per-request traces of nested, timed spans.
+
+A trace is opened around each job (keyed by the job ID) and bound to the
+current context, like the progress publisher. Code anywhere below it opens
+spans with ``span(...)``; outside a trace that is a no-op. Finished traces
+are appended as one JSON line each to a size-rotated file and the most
+recent ones are kept in memory for /api/jobs/{id}/trace.
+"""
+import contextlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+from backend.config import settings
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+
+
+class Span:
+    """One timed operation inside a trace; attributes hold sizes, counts and tokens."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "_start", "duration_ms")
+
+    def __init__(self, trace: "Trace", span_id: int, parent_id: Optional[int], name: str,
+                 start: float, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self._start = start
+        self.duration_ms: Optional[float] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, error: BaseException = None):
+        """Close the span; later calls are ignored."""
+        if self.duration_ms is not None:
+            return
+        if error is not None:
+            self.attributes["error"] = f"{type(error).__name__}: {str(error)[:200]}"
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self._start - self.trace._start) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned when no trace is active, so callers never need to check."""
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error: BaseException = None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, trace_id: str, kind: str):
+        self.trace_id = trace_id
+        self.kind = kind
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.spans: List[Span] = []
+        self._start = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, start: float = None, **attributes) -> Span:
+        """Open a span; ``start`` (a perf_counter value) backdates it."""
+        with self._lock:
+            span = Span(
+                self, next(self._ids), parent.span_id if parent is not None else None, name,
+                time.perf_counter() if start is None else start, attributes
+            )
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        # Per-name totals answer "where did the time go" without a trace viewer
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            entry = summary.setdefault(span["name"], {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + (span["duration_ms"] or 0.0), 3)
+        return {
+            "trace_id": self.trace_id,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": round((self.finished_at - self.started_at) * 1000, 3) if self.finished_at else None,
+            "summary": summary,
+            "spans": spans,
+        }
+
+
+_recent: "OrderedDict[str, Trace]" = OrderedDict()
+_recent_lock = threading.Lock()
+_trace_log: Optional[logging.Logger] = None
+_trace_log_lock = threading.Lock()
+
+
+def _trace_logger() -> logging.Logger:
+    """Dedicated logger writing bare JSON lines, created on the first finished trace."""
+    global _trace_log
+    with _trace_log_lock:
+        if _trace_log is None:
+            directory = os.path.dirname(settings.trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(
+                settings.trace_path,
+                maxBytes=settings.trace_max_bytes,
+                backupCount=settings.trace_backup_count,
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            trace_log = logging.getLogger("onboardai.traces")
+            trace_log.setLevel(logging.INFO)
+            trace_log.propagate = False
+            trace_log.addHandler(handler)
+            _trace_log = trace_log
+    return _trace_log
+
+
+def _remember(trace: Trace):
+    with _recent_lock:
+        _recent[trace.trace_id] = trace
+        _recent.move_to_end(trace.trace_id)
+        while len(_recent) > settings.trace_memory_entries:
+            _recent.popitem(last=False)
+
+
+@contextlib.contextmanager
+def tracing(trace_id: str, kind: str):
+    """Record spans opened in this context under ``trace_id``, inside a root span named ``kind``."""
+    if not settings.tracing_enabled:
+        yield None
+        return
+    trace = Trace(trace_id, kind)
+    _remember(trace)
+    trace_token = _trace.set(trace)
+    root = trace.start_span(kind)
+    span_token = _span.set(root)
+    try:
+        yield trace
+    except BaseException as e:
+        root.end(error=e)
+        raise
+    finally:
+        root.end()
+        _span.reset(span_token)
+        _trace.reset(trace_token)
+        trace.finished_at = time.time()
+        try:
+            _trace_logger().info(json.dumps(trace.to_dict(), default=str))
+        except Exception:
+            # Losing a trace must never fail the request it describes
+            pass
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Time the block as a child of the current span; a no-op outside a trace."""
+    trace = _trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    current = trace.start_span(name, parent=_span.get(), **attributes)
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        current.end()
+        _span.reset(token)
+
+
+def start_span(name: str, start: float = None, **attributes):
+    """
+    Open a child of the current span without entering it, for work whose
+    start and end arrive as separate callbacks; the caller must end() it.
+    """
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return trace.start_span(name, parent=_span.get(), start=start, **attributes)
+
+
+def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
+    """A trace from memory (including ones still running), else from the JSONL files."""
+    with _recent_lock:
+        trace = _recent.get(trace_id)
+    if trace is not None:
+        return trace.to_dict()
+
+    needle = f'"trace_id": "{trace_id}"'
+    paths = [settings.trace_path] + [
+        f"{settings.trace_path}.{index}" for index in range(1, settings.trace_backup_count + 1)
+    ]
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if needle in line:
+                    return json.loads(line)
+    return None
@@ -0,0 +1,90 @@
+"""Knowledge base warm-up at API startup, gating /api/ready."""
+import os
+import threading
+import time
+from typing import Any, Dict
+from backend.config import settings
+from backend.utils.logger import logger
+from tools.knowledge_base import get_knowledge_base
+
+WARMUP_QUERY = "Code of Conduct, information security, benefits enrollment"
+
+
+class WarmupState:
+    """Progress of the background warm-up, shared with the readiness probe."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.error = None
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "skipped")
+
+    def set(self, status: str, error: str = None):
+        with self._lock:
+            self.status = status
+            self.error = error
+
+    def record(self, step: str, seconds: float):
+        with self._lock:
+            self.timings[step] = round(seconds, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"status": self.status, "error": self.error, "timings": dict(self.timings)}
+
+
+warmup_state = WarmupState()
+
+
+def warm_up(state: WarmupState = warmup_state):
+    """
+    Pay one-time costs before the first request does: import the crew
+    stack (deferred at API import so startup stays fast), load the
+    embedding model, open the vector store and lexical index, then run a
+    dummy encode and query so lazy initialization and page faults happen now.
+    """
+    # Opening the vector store creates persist_directory, which would make a
+    # missing knowledge base look ready to /api/health and check_onboarding_ready
+    if not os.path.exists(settings.persist_directory):
+        logger.error(f"Warm-up failed: knowledge base not found at {settings.persist_directory}")
+        state.set("failed", "Knowledge base not found. Please run setup_pdfs.py first.")
+        return
+    state.set("running")
+    start = time.perf_counter()
+    try:
+        step_start = time.perf_counter()
+        import backend.main  # noqa: F401
+        state.record("import_pipeline", time.perf_counter() - step_start)
+
+        step_start = time.perf_counter()
+        kb = get_knowledge_base()
+        state.record("load_knowledge_base", time.perf_counter() - step_start)
+
+        step_start = time.perf_counter()
+        kb.get_embedding(WARMUP_QUERY)
+        state.record("encode", time.perf_counter() - step_start)
+
+        step_start = time.perf_counter()
+        kb.retrieve([WARMUP_QUERY], n_results=1)
+        state.record("query", time.perf_counter() - step_start)
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}", exc_info=True)
+        state.set("failed", str(e))
+        return
+
+    state.record("total", time.perf_counter() - start)
+    state.set("ready")
+    timings = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in state.timings.items())
+    logger.info(f"Warm-up complete: {timings}")
+
+
+def start_warmup(state: WarmupState = warmup_state):
+    """Run warm_up in a background thread so startup is not blocked."""
+    if not settings.warmup_enabled:
+        state.set("skipped")
+        return
+    threading.Thread(target=warm_up, args=(state,), name="kb-warmup", daemon=True).start()
@@ -12,6 +12,7 @@ function App() {
     currentStep,
     steps,
     result,
+    partialContent,
     error,
     healthStatus,
     startOnboarding,
@@ -128,6 +129,14 @@ function App() {
                 steps={steps}
                 executionTime={undefined}
               />
+              {partialContent && (
+                <div className="bg-white rounded-lg shadow-md p-6 border border-[#F5F7FA]">
+                  <h3 className="text-sm font-semibold text-[#022043] mb-2">Drafting your package...</h3>
+                  <pre className="text-sm text-[#4A5568] whitespace-pre-wrap break-words max-h-96 overflow-y-auto">
+                    {partialContent}
+                  </pre>
+                </div>
+              )}
               <div className="bg-white border border-[#F5F7FA] rounded-lg p-4">
                 <p className="text-sm text-[#4A5568]">
                   ⏱️ <strong>Note:</strong> This may take 30-90 seconds. Please wait while the AI agents process the onboarding package.
@@ -146,6 +155,7 @@ function App() {
               />
               <ResultsDisplay
                 packageContent={result.package_content || 'No content available'}
+                outputId={result.output_id}
                 outputFile={result.output_file}
                 employeeName={result.message.match(/for (.+?)$/)?.[1] || 'Employee'}
                 executionTime={result.execution_time}
@@ -3,6 +3,7 @@ import { downloadPackage } from '../services/api';
 
 interface ResultsDisplayProps {
   packageContent: string;
+  outputId: string;
   outputFile: string;
   employeeName: string;
   executionTime: number;
@@ -11,6 +12,7 @@ interface ResultsDisplayProps {
 
 export default function ResultsDisplay({
   packageContent,
+  outputId,
   outputFile,
   employeeName,
   executionTime,
@@ -27,7 +29,7 @@ export default function ResultsDisplay({
 
   const handleDownload = async () => {
     try {
-      await downloadPackage(outputFile);
+      await downloadPackage(outputId, outputFile);
     } catch (error) {
       console.error('Download failed:', error);
       alert('Failed to download package. Please try again.');
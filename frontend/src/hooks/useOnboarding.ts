@@ -1,7 +1,7 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import { submitOnboarding, checkHealth } from '../services/api';
 import type { EmployeeProfile } from '../components/EmployeeForm';
-import type { OnboardingResponse } from '../services/api';
+import type { JobEvent, OnboardingResponse } from '../services/api';
 
 type StepStatus = 'pending' | 'in_progress' | 'completed' | 'error';
 
@@ -15,6 +15,7 @@ interface OnboardingState {
     status: StepStatus;
   }>;
   result: OnboardingResponse | null;
+  partialContent: string;
   error: string | null;
   healthStatus: {
     knowledgeBase: boolean;
@@ -43,6 +44,7 @@ export function useOnboarding() {
     currentStep: 0,
     steps: INITIAL_STEPS,
     result: null,
+    partialContent: '',
     error: null,
     healthStatus: null
   });
@@ -64,18 +66,71 @@ export function useOnboarding() {
     }
   }, []);
 
+  // Whether the writer's tokens are streaming; if not, fall back to its sections
+  const tokensStreamed = useRef(false);
+
+  const handleJobEvent = useCallback((jobEvent: JobEvent) => {
+    const { event, data } = jobEvent;
+    const stepIndex = data.stage === 'writer' ? 1 : 0;
+
+    setState(prev => {
+      switch (event) {
+        case 'stage':
+          return {
+            ...prev,
+            currentStep: stepIndex + 1,
+            steps: prev.steps.map((step, index) =>
+              index === stepIndex
+                ? {
+                    ...step,
+                    status: (data.status === 'started' ? 'in_progress' : 'completed') as StepStatus,
+                    description: data.status === 'completed' && data.duration_s
+                      ? `Finished in ${data.duration_s.toFixed(1)}s`
+                      : step.description
+                  }
+                : step
+            )
+          };
+        case 'tool_call': {
+          const query = Array.isArray(data.query) ? data.query.join('" + "') : data.query;
+          return {
+            ...prev,
+            steps: prev.steps.map((step, index) =>
+              index === 0
+                ? { ...step, description: `Searched "${query}" (${data.latency_ms} ms)` }
+                : step
+            )
+          };
+        }
+        case 'token':
+          if (prev.currentStep !== 2) {
+            return prev;
+          }
+          tokensStreamed.current = true;
+          return { ...prev, partialContent: prev.partialContent + (data.text || '') };
+        case 'section':
+          return tokensStreamed.current
+            ? prev
+            : { ...prev, partialContent: `${prev.partialContent}## ${data.title}\n\n${data.content}\n\n` };
+        default:
+          return prev;
+      }
+    });
+  }, []);
+
   const startOnboarding = useCallback(async (profile: EmployeeProfile) => {
+    tokensStreamed.current = false;
     setState({
       isProcessing: true,
       currentStep: 0,
       steps: INITIAL_STEPS.map(step => ({ ...step, status: 'pending' })),
       result: null,
+      partialContent: '',
       error: null,
       healthStatus: state.healthStatus
     });
 
     try {
-      // Step 1: Research (simulate with progress)
       setState(prev => ({
         ...prev,
         currentStep: 1,
@@ -86,21 +141,8 @@ export function useOnboarding() {
         )
       }));
 
-      // Step 2: Writing
-      await new Promise(resolve => setTimeout(resolve, 500)); // Small delay for UI feedback
-      setState(prev => ({
-        ...prev,
-        steps: prev.steps.map((step, index) =>
-          index === 0
-            ? { ...step, status: 'completed' as StepStatus }
-            : index === 1
-            ? { ...step, status: 'in_progress' as StepStatus, description: 'Generating personalized content...' }
-            : step
-        )
-      }));
-
-      // Actual API call
-      const result = await submitOnboarding(profile);
+      // Progress is driven by the job's event stream
+      const result = await submitOnboarding(profile, handleJobEvent);
 
       // Mark all steps as completed
       setState(prev => ({
@@ -130,7 +172,7 @@ export function useOnboarding() {
 
       throw error;
     }
-  }, [state.healthStatus]);
+  }, [state.healthStatus, handleJobEvent]);
 
   const reset = useCallback(() => {
     setState({
@@ -138,6 +180,7 @@ export function useOnboarding() {
       currentStep: 0,
       steps: INITIAL_STEPS,
       result: null,
+      partialContent: '',
       error: null,
       healthStatus: state.healthStatus
     });
@@ -6,10 +6,53 @@ export interface OnboardingResponse {
   success: boolean;
   message: string;
   execution_time: number;
+  output_id: string;
   output_file: string;
   package_content: string | null;
 }
 
+export interface JobSubmittedResponse {
+  job_id: string;
+  status: string;
+  status_url: string;
+  events_url: string;
+}
+
+export interface JobEventData {
+  status?: string;
+  error?: string | null;
+  result?: OnboardingResponse | null;
+  stage?: 'researcher' | 'writer';
+  duration_s?: number | null;
+  tool?: string;
+  query?: string | string[];
+  latency_ms?: number;
+  output?: string;
+  text?: string;
+  title?: string;
+  content?: string;
+}
+
+export interface JobEvent {
+  event: string;
+  data: JobEventData;
+}
+
+const JOB_EVENT_TYPES = ['job', 'stage', 'tool_call', 'agent_step', 'token', 'section'];
+
+export interface JobStatusResponse {
+  job_id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  created_at: number;
+  started_at: number | null;
+  finished_at: number | null;
+  result: OnboardingResponse | null;
+  error: string | null;
+}
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
 export interface HealthCheckResponse {
   status: string;
   knowledge_base: string;
@@ -33,7 +76,63 @@ export async function checkHealth(): Promise<HealthCheckResponse> {
   }
 }
 
-export async function submitOnboarding(profile: EmployeeProfile): Promise<OnboardingResponse> {
+export async function getJob(jobId: string): Promise<JobStatusResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/jobs/${jobId}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'An error occurred' }));
+    throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+}
+
+async function waitForJob(jobId: string): Promise<OnboardingResponse> {
+  while (true) {
+    const job = await getJob(jobId);
+
+    if (job.status === 'completed' && job.result) {
+      return job.result;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Onboarding failed');
+    }
+
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+}
+
+function streamJob(job: JobSubmittedResponse, onEvent: (event: JobEvent) => void): Promise<OnboardingResponse> {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}${job.events_url}`);
+
+    JOB_EVENT_TYPES.forEach(type => {
+      source.addEventListener(type, (message: MessageEvent) => {
+        const data: JobEventData = JSON.parse(message.data);
+        onEvent({ event: type, data });
+
+        if (type === 'job' && data.status === 'completed') {
+          source.close();
+          resolve(data.result as OnboardingResponse);
+        } else if (type === 'job' && data.status === 'failed') {
+          source.close();
+          reject(new Error(data.error || 'Onboarding failed'));
+        }
+      });
+    });
+
+    // Fall back to polling if the stream cannot be kept open (e.g. proxies).
+    source.onerror = () => {
+      source.close();
+      waitForJob(job.job_id).then(resolve, reject);
+    };
+  });
+}
+
+export async function submitOnboarding(
+  profile: EmployeeProfile,
+  onEvent?: (event: JobEvent) => void
+): Promise<OnboardingResponse> {
   try {
     const response = await fetch(`${API_BASE_URL}/api/onboard`, {
       method: 'POST',
@@ -48,7 +147,11 @@ export async function submitOnboarding(profile: EmployeeProfile): Promise<Onboar
       throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
     }
 
-    return response.json();
+    const job: JobSubmittedResponse = await response.json();
+    if (onEvent && typeof EventSource !== 'undefined') {
+      return streamJob(job, onEvent);
+    }
+    return waitForJob(job.job_id);
   } catch (error) {
     if (error instanceof TypeError && error.message.includes('fetch')) {
       throw new Error(`Cannot connect to backend API at ${API_BASE_URL}. Please make sure the backend server is running. Start it with: cd backend && python -m uvicorn api:app --reload --port 8000`);
@@ -57,8 +160,8 @@ export async function submitOnboarding(profile: EmployeeProfile): Promise<Onboar
   }
 }
 
-export async function downloadPackage(filename: string): Promise<void> {
-  const response = await fetch(`${API_BASE_URL}/api/output/${filename}`);
+export async function downloadPackage(outputId: string, filename: string): Promise<void> {
+  const response = await fetch(`${API_BASE_URL}/api/output/${encodeURIComponent(outputId)}`);
   
   if (!response.ok) {
     throw new Error('Failed to download package');